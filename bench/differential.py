@@ -0,0 +1,285 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "part2" / "src"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+import reference_blocklist  # noqa: E402
+import reference_rules  # noqa: E402
+import synth  # noqa: E402
+import rules  # noqa: E402
+from blocklist import DEFAULT_BLOCKLIST, BlocklistMatcher, is_blocked, load_blocklist  # noqa: E402
+from language_id import get_identifier  # noqa: E402
+from rule_pipeline import RulePipeline  # noqa: E402
+from rules import decision_rules  # noqa: E402
+
+# Differential check: the optimized label/blocklist paths against frozen
+# reference copies (reference_rules.py, reference_blocklist.py).
+#
+# The corpus is seeded: synthetic comments from synth.py plus adversarial
+# variants aimed at the rule boundaries (emoji runs and ZWJ sequences, bullet
+# and inline dashes, Finnish and mixed Finnish/English text, chain and hotel
+# name variants, typos, odd whitespace, lengths right at the char cutoffs).
+# Every path must return the same label, confidence and reason codes as the
+# reference; the report also times each path against it. Language ID (the
+# vectorized identify_batch and per-comment identify) is checked on its own
+# against the reference's scalar scorer, code and margin exactly.
+#
+#   python bench/differential.py                # 20k rows, exit 1 on any mismatch
+#   python bench/differential.py --rows 100000 --seed 3
+#   python bench/differential.py --known-words part2/output/known_words_en.txt.gz
+
+Row = Tuple[str, str, str, str]
+
+EMOJIS = [
+    "🍕", "🍷", "🔥", "😍", "🤤", "👌", "❤️", "⭐", "✨", "☕", "🍜🍣", "👨‍🍳", "👍🏽", "🇫🇮", "🫶", "✌️", "♥", "🥲",
+]
+DASHES = ["- ", "– ", "— ", "-", " - ", "• ", "* "]
+FINNISH = [
+    "tosi hyvä ruoka ja palvelu oli ihan mahtava",
+    "suosittelen tätä ravintolaa, annos oli kiva mutta kallis",
+    "ravintola on ihan ok, se on tosi lähellä",
+    "Söin täällä pizzaa ja se oli hyvää, kun on nälkä",
+    "Äänekäs mutta hyvä, ölut ja åland-juusto",
+]
+ENGLISH_GLUE = ["and the food is great", "but this place is really good", "try the menu", "the service was fine"]
+HOTEL_NAMES = ["Hotel Kämp", "hotel Haven restaurant", "Scandic Simonkenttä", "HOTEL ST. GEORGE", "Hotelli Helka"]
+CUTOFFS = (
+    reference_rules.MIN_CHARS,
+    reference_rules.SHORT_HYPE_CHARS,
+    reference_rules.LOW_SPECIFICITY_CHARS,
+    reference_rules.MARKETING_MIN_CHARS,
+)
+WHITESPACE = [" ", "  ", "\t", "\u00a0", "\u200b", "\n", "\r\n", "\n\n\n"]
+IMAGES = ["yes", "no", "no", "Yes", " NO ", "", "nan", "y"]
+
+
+def typo(rng: random.Random, s: str) -> str:
+    """
+    One random edit: drop, swap, double or triple a letter.
+    """
+    if len(s) < 2:
+        return s
+    i = rng.randrange(len(s) - 1)
+    op = rng.randrange(4)
+    if op == 0:
+        return s[:i] + s[i + 1:]
+    if op == 1:
+        return s[:i] + s[i + 1] + s[i] + s[i + 2:]
+    if op == 2:
+        return s[:i] + s[i] + s[i:]
+    return s[:i] + s[i] * 3 + s[i + 1:]
+
+
+def name_variant(rng: random.Random, name: str) -> str:
+    """
+    Case, punctuation, apostrophe, suffix and typo variants of a name.
+    """
+    r = rng.random()
+    if r < 0.15:
+        name = name.upper()
+    elif r < 0.3:
+        name = name.lower()
+    if rng.random() < 0.3:
+        name = name.replace("'", rng.choice(["’", "", " ", "`"]))
+    if rng.random() < 0.2:
+        name = typo(rng, name)
+    suffix = rng.choice(["", "", " Kamppi", "-Kallio", "’s", "s", "i", ",", "!", " (Itäkeskus)", " Töölö", " 2"])
+    prefix = rng.choice(["", "", "", " ", "the ", "Ravintola ", "“"])
+    return prefix + name + suffix
+
+
+def venue_name(rng: random.Random, blocked: Sequence[str]) -> str:
+    r = rng.random()
+    if r < 0.3:
+        return name_variant(rng, rng.choice(reference_rules.CHAIN_PREFIXES))
+    if r < 0.5:
+        return name_variant(rng, rng.choice(blocked))
+    if r < 0.58:
+        return name_variant(rng, rng.choice(HOTEL_NAMES))
+    if r < 0.62:
+        return rng.choice(["", " ", "nan", "-", "’", "🍕"])
+    return synth.venue_names(rng, 1)[0]
+
+
+def mutate_comment(rng: random.Random, text: str) -> str:
+    """
+    Stack a few adversarial edits on a synthetic comment.
+    """
+    for _ in range(rng.randint(1, 3)):
+        op = rng.randrange(9)
+        if op == 0:  # emoji runs, sometimes glued together
+            sep = rng.choice(["", " "])
+            text += " " + sep.join(rng.choice(EMOJIS) for _ in range(rng.randint(1, 5)))
+        elif op == 1:  # bullets / inline dashes
+            parts = [p for p in text.replace("\n", ". ").split(". ") if p]
+            dash = rng.choice(DASHES)
+            text = dash.join(parts) if dash.startswith(" ") else ("\n" + dash).join(parts)
+            if rng.random() < 0.5:
+                text = dash + text
+        elif op == 2:  # Finnish, alone or mixed with English
+            fi = rng.choice(FINNISH)
+            text = fi if rng.random() < 0.4 else f"{text} {fi} {rng.choice(ENGLISH_GLUE)}"
+        elif op == 3:  # typos
+            words = text.split(" ")
+            for _ in range(rng.randint(1, 4)):
+                j = rng.randrange(len(words))
+                words[j] = typo(rng, words[j])
+            text = " ".join(words)
+        elif op == 4:  # cut right at a length threshold
+            cut = rng.choice(CUTOFFS) + rng.randint(-2, 2)
+            text = text[:max(cut, 0)]
+        elif op == 5:  # whitespace / invisible characters
+            words = text.split(" ")
+            text = "".join(w + rng.choice(WHITESPACE) for w in words)
+            text = rng.choice(["", " ", "\n", "\u00a0"]) + text
+        elif op == 6:  # shouting and exclamation marks
+            text = text.upper() if rng.random() < 0.5 else text + "!" * rng.randint(1, 4)
+        elif op == 7:  # lexicon phrases stitched in
+            lexicon = rng.choice(
+                [
+                    reference_rules.AI_HYPE_PHRASES,
+                    reference_rules.MARKETING_WORDS,
+                    reference_rules.HYPE_WORDS,
+                    reference_rules.GENERIC_PHRASES,
+                    reference_rules.STRONG_NEGATIVE,
+                ]
+            )
+            text += " " + ", ".join(rng.sample(lexicon, k=min(len(lexicon), rng.randint(1, 3))))
+        else:  # degenerate comments
+            text = rng.choice(["", " ", "nan", "!!!", "😍😍😍", "-\n-\n-", "...", "ok", text * 3])
+    return text
+
+
+def corpus(rng: random.Random, n: int, blocked: Sequence[str]) -> List[Row]:
+    """
+    n rows: about a third plain synth.comments, the rest adversarial.
+    """
+    rows = []
+    for name, comment, image, tags in synth.comments(rng, n):
+        if rng.random() < 0.65:
+            comment = mutate_comment(rng, comment)
+            image = rng.choice(IMAGES)
+        if rng.random() < 0.5:
+            name = venue_name(rng, blocked)
+        rows.append((name, comment, image, tags))
+    return rows
+
+
+def adversarial_blocklist(rng: random.Random, blocked: Sequence[str]) -> List[str]:
+    """
+    The real blocklist plus entries that normalize oddly (empty, punctuation only,
+    prefixes of other entries, odd spacing and case).
+    """
+    extra = ["", "   ", "—", "'", "&", "R", "Sub way", "  rax  ", "JOE & THE", "Kot.", "Café", "Hesburger!"]
+    extra += [name_variant(rng, b) for b in rng.sample(list(blocked), k=min(10, len(blocked)))]
+    return list(blocked) + synth.blocklist(rng, 60) + extra
+
+
+def timed(fn: Callable[[], list]) -> Tuple[list, float]:
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def compare(name: str, rows: list, expected: list, t_ref: float, fn: Callable[[], list], show: int) -> int:
+    got, seconds = timed(fn)
+    bad = [(r, e, g) for r, e, g in zip(rows, expected, got) if _key(e) != _key(g)]
+    bad += [(None, None, None)] * abs(len(got) - len(expected))
+    n = len(rows)
+    print(
+        f"{name:<28} {len(bad):6d} mismatches | {seconds / n * 1e6:9.2f} us/row "
+        f"| {t_ref / seconds if seconds else float('inf'):6.2f}x vs reference"
+    )
+    for r, e, g in bad[:show]:
+        print(f"    row      {r!r}")
+        print(f"    expected {e!r}")
+        print(f"    got      {g!r}")
+    return len(bad)
+
+
+def _key(decision):
+    if isinstance(decision, tuple) and len(decision) == 3:
+        label, confidence, reasons = decision
+        return label, confidence, tuple(reasons)
+    return decision
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the fast rule/blocklist paths against the frozen reference.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--show", type=int, default=5, help="mismatches to print per path")
+    parser.add_argument(
+        "--known-words",
+        type=Path,
+        help="load this known-word list into rules.py (the reference keeps pyspellchecker)",
+    )
+    args = parser.parse_args()
+
+    if args.known_words:
+        print(f"Known words: {rules.load_known_words(args.known_words)} from {args.known_words}")
+
+    rng = random.Random(args.seed)
+    real_blocklist = load_blocklist(DEFAULT_BLOCKLIST)
+    rows = corpus(rng, args.rows, real_blocklist)
+    blocked = adversarial_blocklist(rng, real_blocklist)
+    names = [r[0] for r in rows]
+    pipeline = RulePipeline.from_file()
+
+    # warm dictionaries, language model and word caches outside the timed runs
+    for r in rows[:200]:
+        reference_rules.decision_rules(*r)
+        decision_rules(*r)
+    pipeline.decide_batch(rows[:200])
+
+    print(f"Rows: {len(rows)} (seed {args.seed}) | blocklist entries: {len(blocked)}")
+    mismatches = 0
+
+    print("\nLanguage ID (code, margin):")
+    texts = [(r[1] or "").strip() for r in rows]
+    identifier = get_identifier()
+    expected, t_ref = timed(lambda: [reference_rules.detect_language(t) for t in texts])
+    print(f"{'reference detect_language':<28} {'':6} {'':11}| {t_ref / len(rows) * 1e6:9.2f} us/row")
+
+    def batch():
+        langs, margins = identifier.identify_batch(texts)
+        return [(code, float(m)) for code, m in zip(langs, margins)]
+
+    mismatches += compare("identify_batch", texts, expected, t_ref, batch, args.show)
+    mismatches += compare("identify", texts, expected, t_ref, lambda: [identifier.identify(t) for t in texts], args.show)
+
+    print("\nLabels (label, confidence, reason codes):")
+    expected, t_ref = timed(lambda: [reference_rules.decision_rules(*r) for r in rows])
+    print(f"{'reference decision_rules':<28} {'':6} {'':11}| {t_ref / len(rows) * 1e6:9.2f} us/row")
+    mismatches += compare("rules.decision_rules", rows, expected, t_ref,
+                          lambda: [decision_rules(*r) for r in rows], args.show)
+    mismatches += compare("RulePipeline.decide", rows, expected, t_ref,
+                          lambda: [pipeline.decide(*r) for r in rows], args.show)
+    mismatches += compare("RulePipeline.decide_batch", rows, expected, t_ref,
+                          lambda: pipeline.decide_batch(rows), args.show)
+
+    print("\nBlocklist:")
+    expected, t_ref = timed(lambda: [reference_blocklist.is_blocked(v, blocked) for v in names])
+    print(f"{'reference is_blocked':<28} {'':6} {'':11}| {t_ref / len(rows) * 1e6:9.2f} us/row "
+          f"| {sum(expected)} blocked")
+    mismatches += compare("blocklist.is_blocked", names, expected, t_ref,
+                          lambda: [is_blocked(v, blocked) for v in names], args.show)
+    matcher = BlocklistMatcher(blocked)
+    mismatches += compare("BlocklistMatcher", names, expected, t_ref,
+                          lambda: [matcher(v) for v in names], args.show)
+
+    if mismatches:
+        print(f"\n{mismatches} mismatches against the frozen reference")
+        sys.exit(1)
+    print("\n✅ All fast paths match the frozen reference")
+
+
+if __name__ == "__main__":
+    main()
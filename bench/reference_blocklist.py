@@ -0,0 +1,23 @@
+# bench/reference_blocklist.py
+#
+# FROZEN reference copy of src/blocklist.py norm() and is_blocked(), checked
+# against the live versions by bench/differential.py. Do not edit.
+import re
+
+
+def norm(s: str) -> str:
+    s = (s or "").lower()
+    s = re.sub(r"[^\w\s]", " ", s)  # remove punctuation
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def is_blocked(venue_name: str, blocked_list: list[str]) -> bool:
+    v = norm(venue_name)
+    for b in blocked_list:
+        bn = norm(b)
+        if not bn:
+            continue
+        if v == bn or v.startswith(bn + " ") or v.startswith(bn):
+            return True
+    return False
@@ -0,0 +1,624 @@
+# bench/reference_rules.py
+#
+# FROZEN reference copy of part2/src/rules.py decision_rules() and the checks,
+# lexicons and thresholds it uses, as of the user-040 commit 106be53
+# (RULES_VERSION 1).
+# bench/differential.py compares every fast path (the live cascade, the rule
+# table, its batch path) against this file, so speed-ups can't quietly change
+# labels. Do not optimize or "fix" anything here. When a label change is
+# intended, make it in rules.py, bump RULES_VERSION, and re-copy this file in
+# the same commit.
+#
+# Language ID is frozen too: detect_language() below is a scalar, one comment
+# at a time copy of language_id.py's scoring, reading its own copy of the model
+# table (bench/reference_langid_model.npz). Spelling always uses the
+# pyspellchecker dictionary, never the known-word list shortcut, so a fast
+# spelling path is checked against the original lookups.
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+LABEL_KEEP = "Keep"
+LABEL_REMOVE = "Remove"
+LABEL_NEEDS_INFO = "Needs more information"
+LABEL_NEEDS_EDIT = "Recommendation needs editing"
+
+RULES_VERSION = 1  # rules.RULES_VERSION this copy was taken at
+
+MIN_CHARS = 42  # WoM app minimum
+MAX_EMOJIS = 2
+
+# Length cutoffs used by the softer quality rules
+SHORT_HYPE_CHARS = 60
+LOW_SPECIFICITY_CHARS = 120
+
+# Marketing / AI copy: long, impersonal, phrase-heavy
+MARKETING_MIN_CHARS = 140
+MARKETING_MIN_HITS = 2
+
+# Hard threshold: if emoji spam + hype template/format spam -> remove
+HARD_EMOJI_REMOVE = 3
+
+# Common UK spellings we don't want to flag as "misspelled"
+UK_OK_WORDS = {
+    "favourite", "colour", "flavour", "neighbourhood", "theatre", "centre",
+    "travelling", "traveller", "apologise", "organise", "realise", "behaviour",
+    "cheque", "grey", "cheers",
+}
+
+# Common food/restaurant-related typos we *do* want to flag for editing
+COMMON_FOOD_TYPOS = {
+    "napoletan",  # likely intended "neapolitan" / "napoletana/o"
+}
+
+# AI-ish hype template phrases (not perfect, but catches the vibe)
+AI_HYPE_PHRASES = [
+    "culinary gem",
+    "perfect harmony",
+    "work of art",
+    "beautifully crafted",
+    "unforgettable flavors",
+    "unforgettable flavours",
+    "thoughtful presentation",
+    "highly recommended",
+    "must-try",
+    "must try",
+]
+
+
+# --- spelling / typo detection (lightweight) ---
+# The pyspellchecker dictionary is big, so it is loaded on first use instead of
+# at import time. Word lookups are cached across comments.
+SPELL_CACHE_SIZE = 50_000
+
+_SPELL = None
+_SPELL_LOADED = False
+
+
+def _get_spell():
+    global _SPELL, _SPELL_LOADED
+    if not _SPELL_LOADED:
+        _SPELL_LOADED = True
+        try:
+            from spellchecker import SpellChecker
+            _SPELL = SpellChecker(language="en")
+        except Exception:
+            _SPELL = None
+    return _SPELL
+
+
+def spellcheck_available() -> bool:
+    return _get_spell() is not None
+
+
+@lru_cache(maxsize=SPELL_CACHE_SIZE)
+def _is_unknown_word(word: str) -> bool:
+    spell = _get_spell()
+    if spell is None:
+        return False
+    return bool(spell.unknown([word]))
+
+
+def norm(s: str) -> str:
+    s = (s or "").strip().lower()
+    s = re.sub(r"\s+", " ", s)
+    return s
+
+
+def startswith_any(name: str, prefixes: List[str]) -> bool:
+    n = norm(name)
+    for p in prefixes:
+        pn = norm(p)
+        if not pn:
+            continue
+        if (
+            n == pn
+            or n.startswith(pn + " ")
+            or n.startswith(pn + "-")
+            or n.startswith(pn + "’")
+            or n.startswith(pn + "'")
+        ):
+            return True
+    return False
+
+
+def has_obvious_typos(text: str) -> bool:
+    """
+    Catch super obvious typos without a dictionary:
+    - 3+ same letter in a row (ex: 'excelllent')
+    - long word with no vowels (rare but good signal)
+    Also flags COMMON_FOOD_TYPOS immediately.
+    """
+    if not text:
+        return False
+    words = re.findall(r"[A-Za-z']+", text)
+    for w in words:
+        wl = w.lower()
+        if wl in COMMON_FOOD_TYPOS:
+            return True
+        if re.search(r"(.)\1\1", wl):  # triple letter
+            return True
+        if len(wl) >= 8 and not re.search(r"[aeiouy]", wl):
+            return True
+    return False
+
+
+def has_spelling_issues(text: str) -> bool:
+    """
+    Soft English spellcheck:
+    - ignores short words
+    - ignores words with non-ascii chars (ä/ö/å etc)
+    - ignores capitalized words (often names)
+    - ignores common UK spellings in UK_OK_WORDS
+    Flags only when there are multiple likely mistakes.
+    Also flags COMMON_FOOD_TYPOS immediately (editing).
+    """
+    if not text:
+        return False
+
+    if has_obvious_typos(text):
+        return True
+
+    if not spellcheck_available():
+        return False
+
+    tokens = re.findall(r"[A-Za-z']+", text)
+    cleaned = []
+    for w in tokens:
+        if len(w) < 4:
+            continue
+        wl = w.lower()
+
+        if wl in UK_OK_WORDS:
+            continue
+
+        if wl in COMMON_FOOD_TYPOS:
+            return True
+
+        if any(ord(ch) > 127 for ch in w):
+            continue
+
+        if w[0].isupper():
+            continue
+
+        cleaned.append(wl)
+
+    if len(cleaned) < 8:
+        return False
+
+    misspelled = {w for w in set(cleaned) if _is_unknown_word(w)}
+    return len(misspelled) >= 2
+
+
+# --- guardrail rules (chains / hotel / language / AI-ish tone) ---
+
+CHAIN_PREFIXES = [
+    # minimal set for Part 2 (extend anytime)
+    "hesburger",
+    "mcdonald",
+    "mcdonald's",
+    "subway",
+    "burger king",
+    "kfc",
+    "taco bell",
+    "pizza hut",
+    "starbucks",
+    "espresso house",
+    "fazer cafe",
+]
+
+
+def is_chain_or_franchise(restaurant_name: str) -> bool:
+    return startswith_any(restaurant_name, CHAIN_PREFIXES)
+
+
+def is_hotel(restaurant_name: str) -> bool:
+    n = norm(restaurant_name)
+    return "hotel" in n
+
+
+FINISH_MARKERS = [
+    "ja", "on", "se", "että", "mutta", "kun", "tämä", "tosi", "hyvä", "ihan",
+    "suosittelen", "ravintola", "kiva", "mahtava", "ruoka", "palvelu", "annos",
+]
+
+ENGLISH_MARKERS = [
+    "and", "the", "is", "was", "are", "but", "this", "that", "really", "great",
+    "recommend", "food", "service", "place", "try", "dish", "menu",
+]
+
+
+# Language guardrail (language_id.py): comments confidently identified as
+# another language are removed too, not only Finnish caught by the markers.
+LANGID_ALLOWED = ["en"]
+LANGID_MIN_LETTERS = 20  # too little text to call the language reliably
+LANGID_MIN_MARGIN = 0.3  # mean log-prob margin over the runner-up language
+
+
+LANGID_MODEL = Path(__file__).resolve().parent / "reference_langid_model.npz"
+LANGID_BUCKETS = 4096
+LANGID_NGRAM_MAX = 3
+_U64 = (1 << 64) - 1
+_LANGID = None  # (langs, per-bucket log-prob rows), loaded on first use
+
+
+def _langid_table():
+    global _LANGID
+    if _LANGID is None:
+        import numpy as np
+
+        with np.load(LANGID_MODEL) as data:
+            langs = [str(x) for x in data["langs"]]
+            rows = data["logprobs"].astype(np.float32).tolist()
+        _LANGID = (langs, rows)
+    return _LANGID
+
+
+def _langid_normalize(text: str) -> str:
+    t = (text or "").lower()
+    t = re.sub(r"[\W\d_]+", " ", t)
+    return f" {t.strip()} "
+
+
+def _langid_buckets(text: str) -> List[int]:
+    """
+    Hashed 1-3 character n-gram buckets of one text, 1-grams first, then
+    2-grams, then 3-grams (lone spaces skipped).
+    """
+    codes = [ord(ch) for ch in _langid_normalize(text)]
+    out = []
+    for n in range(1, LANGID_NGRAM_MAX + 1):
+        for i in range(len(codes) - n + 1):
+            if n == 1 and codes[i] == ord(" "):
+                continue
+            h = 0
+            for c in codes[i:i + n]:
+                h = (h * 1_000_003 + c) & _U64
+            out.append(((((h + n) & _U64) * 0x9E3779B97F4A7C15 & _U64) >> 40) % LANGID_BUCKETS)
+    return out
+
+
+def detect_language(comment: str) -> Tuple[str, float]:
+    """
+    (language code, margin) from the character n-gram identifier: mean
+    log-prob per n-gram for each language, best language and its margin over
+    the runner-up. ("", 0.0) when the text has no n-grams.
+    """
+    import numpy as np
+
+    langs, rows = _langid_table()
+    buckets = _langid_buckets(comment)
+    if not buckets:
+        return "", 0.0
+    sums = [0.0] * len(langs)
+    for b in buckets:
+        for j, v in enumerate(rows[b]):
+            sums[j] += v
+    scores = [np.float32(np.float32(x) / np.float32(len(buckets))) for x in sums]
+    order = sorted(range(len(langs)), key=lambda j: -scores[j])
+    margin = scores[order[0]] - scores[order[1]] if len(langs) > 1 else np.float32(1.0)
+    return langs[order[0]], float(margin)
+
+
+def is_foreign_language(comment: str, lang: Optional[Tuple[str, float]] = None) -> bool:
+    """
+    True if the identifier confidently says the comment isn't in LANGID_ALLOWED.
+    `lang` can be passed in when it was already computed for a whole batch.
+    """
+    if sum(ch.isalpha() for ch in comment or "") < LANGID_MIN_LETTERS:
+        return False
+    code, margin = lang if lang is not None else detect_language(comment)
+    return bool(code) and code not in LANGID_ALLOWED and margin >= LANGID_MIN_MARGIN
+
+
+def is_non_english(comment: str, lang: Optional[Tuple[str, float]] = None) -> bool:
+    """
+    Flags if Finnish markers strongly outweigh English markers, or if the
+    language identifier is confident the comment is in another language.
+    """
+    t = norm(comment)
+    if not t:
+        return False
+
+    # whole-word marker hits (same as matching \bword\b for each marker)
+    words = set(re.findall(r"\w+", t))
+    fin_hits = len(words.intersection(FINISH_MARKERS))
+    eng_hits = len(words.intersection(ENGLISH_MARKERS))
+
+    if fin_hits >= 3 and fin_hits >= eng_hits + 2:
+        return True
+
+    if sum(t.count(ch) for ch in ["ä", "ö", "å"]) >= 3 and eng_hits == 0:
+        return True
+
+    return is_foreign_language(comment, lang)
+
+
+MARKETING_WORDS = [
+    "culinary landscape", "philosophy", "time and place", "bounty", "showcase",
+    "evolved", "shaped", "experience", "once in a lifetime", "truly", "daring",
+    "concept", "vision", "period", "themes", "throughout the year", "region",
+]
+
+FIRST_PERSON = [" i ", " i'", " i'm", " my ", " we ", " our ", " us "]
+
+
+DISH_WORDS = [
+    "pizza", "pasta", "ramen", "sushi", "tartar", "herring", "steak",
+    "pancake", "dessert", "coffee", "wine", "beer", "cocktail", "cheese",
+    "bread", "dumpling", "noodle", "schnapps", "vorschmack",
+]
+
+
+def has_concrete_food(comment: str) -> bool:
+    t = norm(comment)
+    return any(re.search(rf"\b{re.escape(w)}\b", t) for w in DISH_WORDS)
+
+
+def has_first_person(tn: str) -> bool:
+    return any(fp in f" {tn} " for fp in FIRST_PERSON)
+
+
+def count_marketing_phrases(tn: str) -> int:
+    return sum(1 for w in MARKETING_WORDS if w in tn)
+
+
+def is_marketing_or_ai_copy(comment: str) -> bool:
+    """
+    Heuristic: long + no first-person voice + marketing phrases + low concrete food detail.
+    """
+    t = (comment or "").strip()
+    tn = norm(t)
+    if not tn:
+        return False
+
+    first_person = has_first_person(tn)
+    marketing_hits = count_marketing_phrases(tn)
+
+    if (
+        len(tn) >= MARKETING_MIN_CHARS
+        and (not first_person)
+        and marketing_hits >= MARKETING_MIN_HITS
+        and (not has_concrete_food(tn))
+    ):
+        return True
+
+    return False
+
+
+# --- style / content heuristics ---
+
+def count_emojis(text: str) -> int:
+    """
+    Rough emoji counter using Unicode ranges. Not perfect, but good enough.
+    """
+    if not text:
+        return 0
+    emoji_re = re.compile(
+        "["
+        "\U0001F300-\U0001F5FF"
+        "\U0001F600-\U0001F64F"
+        "\U0001F680-\U0001F6FF"
+        "\U0001F700-\U0001F77F"
+        "\U0001F780-\U0001F7FF"
+        "\U0001F800-\U0001F8FF"
+        "\U0001F900-\U0001F9FF"
+        "\U0001FA00-\U0001FA6F"
+        "\U0001FA70-\U0001FAFF"
+        "\u2600-\u26FF"
+        "\u2700-\u27BF"
+        "]+",
+        flags=re.UNICODE
+    )
+    return len(emoji_re.findall(text))
+
+
+def uses_dashy_style(text: str) -> bool:
+    if not text:
+        return False
+    bullet_dashes = len(re.findall(r"(?m)^\s*-\s+", text))
+    inline_dashes = text.count(" - ")
+    return bullet_dashes >= 2 or inline_dashes >= 3
+
+
+GENERIC_PHRASES = [
+    "great place", "really good", "so good", "nice place", "love it",
+    "highly recommend", "amazing", "awesome", "pretty good", "must try",
+]
+
+
+def is_generic_comment(text: str) -> bool:
+    tn = norm(text)
+    if len(tn) < MIN_CHARS and any(p in tn for p in GENERIC_PHRASES):
+        return True
+    return False
+
+
+HYPE_WORDS = [
+    "best", "incredible", "perfect", "unreal", "life changing",
+    "insane", "mind blowing", "never had better", "10/10"
+]
+
+
+def overly_positive_hype(text: str) -> bool:
+    tn = norm(text)
+    exclamations = text.count("!")
+    hype_hits = sum(1 for w in HYPE_WORDS if w in tn)
+    return (hype_hits >= 2) or (exclamations >= 3)
+
+
+STRONG_NEGATIVE = [
+    "avoid", "don't go", "do not go", "never again", "waste of money",
+    "terrible", "awful", "horrible", "worst", "disgusting", "bad service",
+    "overpriced and bad", "not worth", "would not recommend"
+]
+
+POSITIVE_MARKERS = [
+    "recommend", "worth", "love", "great", "amazing", "must", "try",
+    "good", "favorite", "solid"
+]
+
+
+def is_negative_recommendation(text: str) -> bool:
+    """
+    WoM guideline: negative recommendations get deleted.
+    """
+    tn = norm(text)
+
+    has_strong_neg = any(p in tn for p in STRONG_NEGATIVE)
+    has_pos = any(p in tn for p in POSITIVE_MARKERS)
+
+    if "avoid" in tn or "don't go" in tn or "do not go" in tn or "would not recommend" in tn:
+        return True
+
+    return has_strong_neg and not has_pos
+
+
+def looks_like_needs_edit(text: str) -> bool:
+    if not text:
+        return False
+    if re.search(r"[!?.,]{3,}", text):
+        return True
+    if text.count("\n") >= 6:
+        return True
+    return False
+
+
+SPECIFIC_SIGNALS = [
+    "dish", "menu", "wine", "beer", "cocktail", "tasting", "chef",
+    "atmosphere", "service", "interior", "music", "book", "walk in",
+    "order", "try",
+    "ramen", "pizza", "pasta", "tartar", "herring", "schnapps",
+    "steak", "dessert", "cheese", "bread", "coffee",
+]
+
+
+def has_specifics(text: str) -> bool:
+    tn = norm(text)
+    return any(s in tn for s in SPECIFIC_SIGNALS)
+
+
+def is_ai_hype_template(text: str) -> bool:
+    tn = norm(text)
+    hits = sum(1 for p in AI_HYPE_PHRASES if p in tn)
+    return hits >= 3
+
+
+# --- main decision function ---
+
+def decision_rules(
+    restaurant_name: str,
+    comment: str,
+    image_yes_no: str,
+    tags: str,
+) -> Tuple[str, str, List[str]]:
+    """
+    Returns: (label, confidence, reason_codes)
+    confidence: high / medium / low
+    """
+    reasons: List[str] = []
+
+    name = (restaurant_name or "").strip()
+    text = (comment or "").strip()
+    tn = norm(text)
+    img = norm(image_yes_no)
+    _ = tags  # intentionally ignored
+
+    # Guardrails first
+    if is_chain_or_franchise(name):
+        reasons.append("chain_or_franchise")
+        return (LABEL_REMOVE, "high", reasons)
+
+    if is_hotel(name):
+        reasons.append("hotel_not_target")
+        return (LABEL_REMOVE, "high", reasons)
+
+    if not tn:
+        reasons.append("empty_comment")
+        return (LABEL_REMOVE, "high", reasons)
+
+    if is_non_english(text):
+        reasons.append("non_english_comment")
+        return (LABEL_REMOVE, "high", reasons)
+
+    if is_marketing_or_ai_copy(text):
+        reasons.append("marketing_or_ai_tone")
+        return (LABEL_REMOVE, "high", reasons)
+
+    if is_negative_recommendation(text):
+        reasons.append("negative_recommendation")
+        return (LABEL_REMOVE, "high", reasons)
+
+    # Compute format/hype flags BEFORE returning early
+    emoji_n = count_emojis(text)
+    dashy = uses_dashy_style(text)
+    hype_template = is_ai_hype_template(text) or overly_positive_hype(text)
+
+    emoji_spam = emoji_n >= HARD_EMOJI_REMOVE
+
+    # If hype + dash spam or hype + emoji spam -> Remove
+    if hype_template and (dashy or emoji_spam):
+        reasons.append("hype_plus_format_spam")
+        if dashy:
+            reasons.append("dashy_formatting")
+        if emoji_spam:
+            reasons.append(f"emoji_spam({emoji_n})")
+        return (LABEL_REMOVE, "high", reasons)
+
+    # Dashy formatting handling
+    if dashy:
+        reasons.append("dashy_formatting")
+        if has_specifics(text):
+            return (LABEL_NEEDS_EDIT, "medium", reasons)
+        return (LABEL_NEEDS_INFO, "medium", reasons)
+
+    # Emoji cap handling
+    if emoji_n > MAX_EMOJIS:
+        reasons.append(f"too_many_emojis({emoji_n})")
+        if is_generic_comment(text):
+            reasons.append("generic_hype_with_emojis")
+            return (LABEL_REMOVE, "high", reasons)
+        return (LABEL_NEEDS_EDIT, "medium", reasons)
+
+    # Below platform min chars: low-signal unless it still contains specifics
+    if len(tn) < MIN_CHARS and not has_specifics(text):
+        reasons.append(f"below_min_chars(<{MIN_CHARS})")
+        return (LABEL_REMOVE, "high", reasons)
+
+    # Short + generic hype
+    if is_generic_comment(text):
+        reasons.append("generic_short_comment")
+        return (LABEL_REMOVE, "high", reasons)
+
+    # Overly positive hype without specifics (softer case)
+    if overly_positive_hype(text) and not has_specifics(text):
+        reasons.append("overly_positive_without_specifics")
+        if len(tn) < SHORT_HYPE_CHARS:
+            reasons.append("short_hype")
+            return (LABEL_REMOVE, "high", reasons)
+        return (LABEL_NEEDS_INFO, "medium", reasons)
+
+    # No image raises the bar
+    if img == "no" and len(tn) < SHORT_HYPE_CHARS and not has_specifics(text):
+        reasons.append("no_image_weak_text")
+        return (LABEL_NEEDS_INFO, "medium", reasons)
+
+    # Messy but salvageable
+    if looks_like_needs_edit(text) and has_specifics(text):
+        reasons.append("messy_but_salvageable")
+        return (LABEL_NEEDS_EDIT, "medium", reasons)
+
+    # Medium length but low specificity
+    if len(tn) < LOW_SPECIFICITY_CHARS and not has_specifics(text):
+        reasons.append("low_specificity")
+        return (LABEL_NEEDS_INFO, "medium", reasons)
+
+    # Spelling issues: if it's otherwise a good rec, flag for editing
+    if has_spelling_issues(text):
+        reasons.append("spelling_issues")
+        return (LABEL_NEEDS_EDIT, "medium", reasons)
+
+    # Otherwise keep
+    reasons.append("specific_helpful")
+    return (LABEL_KEEP, "high" if has_specifics(text) else "medium", reasons)
@@ -0,0 +1,146 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parents[1]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "part2" / "src"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+import synth  # noqa: E402
+from main import is_blocked  # noqa: E402
+from places_enrich import _infer_tags, has_tags, infer_tag_mask, tags_to_mask  # noqa: E402
+from wolt_venue_page import _pick_address, _walk_find_strings  # noqa: E402
+from rules import decision_rules  # noqa: E402
+from rule_pipeline import RulePipeline  # noqa: E402
+from label_recommendations import label_dataframe  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000]
+ADDRESS_KEYS = {"address", "streetaddress", "formatted_address", "venueaddress", "deliveryaddress"}
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run(sizes: List[int], seed: int, repeat: int) -> List[dict]:
+    results = []
+
+    def record(bench: str, n: int, fn: Callable[[], object]) -> None:
+        seconds = _best_of(fn, repeat)
+        results.append({"bench": bench, "n": n, "seconds": seconds, "per_item_us": seconds / n * 1e6})
+        print(f"{bench:<34} n={n:<7} {seconds * 1000:10.2f} ms  {seconds / n * 1e6:9.2f} us/item")
+
+    # warm lazy state (spellchecker, regex caches) outside the timed runs
+    warm = synth.comments(random.Random(seed), 50)
+    for r in warm:
+        decision_rules(*r)
+    pipeline = RulePipeline.from_file()
+
+    for n in sizes:
+        rng = random.Random(seed + n)
+
+        names = synth.venue_names(rng, n)
+        blocked = synth.blocklist(rng, 200)
+        record("is_blocked", n, lambda: [is_blocked(v, blocked) for v in names])
+
+        details = synth.places_details(rng, n)
+        record("_infer_tags", n, lambda: [_infer_tags(d["name"], d["types"]) for d in details])
+        masks = [infer_tag_mask(d["name"], d["types"]) for d in details]
+        wanted = tags_to_mask(["asian", "Take away"])
+        record("tag_mask_filter", n, lambda: [m for m in masks if has_tags(m, wanted)])
+
+        payload = synth.next_data_payload(rng, n)
+        record(
+            "_walk_find_strings+_pick_address",
+            n,
+            lambda: _pick_address(_walk_find_strings(payload, ADDRESS_KEYS)),
+        )
+
+        rows = synth.comments(rng, n)
+        record("decision_rules", n, lambda: [decision_rules(*r) for r in rows])
+        record("rule_pipeline.decide", n, lambda: [pipeline.decide(*r) for r in rows])
+
+        df = synth.recommendations_frame(rng, n)
+
+        def label_file():
+            out_df, _, _ = label_dataframe(df, pipeline.decide)
+            with tempfile.TemporaryDirectory() as tmp:
+                out_df.to_csv(Path(tmp) / "labeled.csv", index=False, encoding="utf-8")
+
+        record("label_file", n, label_file)
+
+    return results
+
+
+def compare(current: List[dict], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    old = {(r["bench"], r["n"]): r["seconds"] for r in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit')}):")
+    for r in current:
+        prev = old.get((r["bench"], r["n"]))
+        if not prev:
+            continue
+        ratio = r["seconds"] / prev
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        print(f"{r['bench']:<34} n={r['n']:<7} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the discovery and curation hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the best time is kept")
+    parser.add_argument("--out", type=Path, help="results JSON (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    results = run(args.sizes, args.seed, args.repeat)
+
+    out_path = args.out or ROOT / "bench" / "results" / f"{commit}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "sizes": args.sizes,
+        },
+        "results": results,
+    }
+    out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"✅ Wrote {len(results)} results -> {out_path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+CLI = ROOT / "cli.py"
+
+# (cli arguments, import budget in ms). Import time comes from -X importtime
+# (cumulative time of top-level imports). Modules a bare `python -c pass` also
+# imports (site, encodings, io, ...) are interpreter startup and are left out,
+# as is the command's own work.
+BUDGETS: List[Tuple[List[str], float]] = [
+    (["--help"], 25),
+    (["blocked", "Hesburger Kamppi"], 25),
+    (["queue", "--help"], 100),
+    (["peek"], 400),
+    (["label-one", "--comment", "Great carbonara and tiramisu, friendly staff, lovely natural wine list."], 250),
+]
+_IMPORT_RE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)")
+
+
+def import_times(stderr: str, exclude: Set[str] = frozenset()) -> Dict[str, float]:
+    """
+    {top-level module: cumulative import ms} from -X importtime output,
+    without the modules in `exclude`.
+    """
+    out = {}
+    for line in stderr.splitlines():
+        m = _IMPORT_RE.match(line)
+        if m and len(m.group(3)) == 1 and m.group(4) not in exclude:  # one space = a top-level import
+            out[m.group(4)] = int(m.group(2)) / 1000
+    return out
+
+
+def startup_modules() -> Set[str]:
+    """
+    Top-level modules the interpreter imports before running any script.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+    return set(import_times(proc.stderr))
+
+
+def measure(args: List[str], startup: Set[str]) -> Tuple[float, float, Dict[str, float], int]:
+    """
+    (wall ms, import ms, per-module import ms, exit code) for one cli.py run.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(CLI), *args],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    wall = (time.perf_counter() - t0) * 1000
+    mods = import_times(proc.stderr, exclude=startup)
+    return wall, sum(mods.values()), mods, proc.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cli.py import time against per-command budgets.")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per command (best is reported)")
+    parser.add_argument("--top", type=int, default=3, help="heaviest imports to list per command")
+    args = parser.parse_args()
+
+    startup = startup_modules()
+    over = 0
+    for cli_args, budget in BUDGETS:
+        runs = [measure(cli_args, startup) for _ in range(args.repeat)]
+        wall, imports, mods, _ = min(runs, key=lambda r: r[1])
+        ok = imports <= budget
+        over += not ok
+        label = " ".join(cli_args)[:40]
+        print(
+            f"{'ok  ' if ok else 'OVER'} {label:<42} imports {imports:7.1f} ms (budget {budget:.0f}) | wall {wall:6.0f} ms"
+        )
+        heaviest = sorted(mods.items(), key=lambda kv: kv[1], reverse=True)[: args.top]
+        print("       " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in heaviest))
+
+    if over:
+        sys.exit(1)
+    print("✅ All commands within their import budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# Seeded synthetic data for the benchmarks.
+# Every generator takes a random.Random, so a given seed always produces the
+# same corpus and runs stay comparable between commits.
+import random
+from typing import List, Tuple
+
+import pandas as pd
+
+# column names as in part2/input
+COL_NAME = "Restaurant → Name"
+COL_COMMENT = "Comment"
+COL_IMAGE = "Image yes/no"
+COL_CREATED = "Created At"
+COL_TAGS = "Tags"
+
+_PREFIXES = ["Ravintola", "Restaurant", "Bistro", "Cafe", "Kahvila", "Trattoria", "Osteria", "Izakaya", ""]
+_WORDS = [
+    "Kallio", "Töölö", "Punavuori", "Helmi", "Sininen", "Lammas", "Kosmos", "Nolita", "Basso", "Grön",
+    "Sakura", "Seoul", "Roma", "Napoli", "Saigon", "Tandoor", "Aurora", "Kuu", "Meri", "Kettu",
+]
+_KINDS = ["Pizza", "Sushi", "Ramen", "Kebab", "Burger", "Taco", "Bakery", "Wine Bar", "Dumplings", "BBQ", "Deli", ""]
+_BRANDS = [
+    "Hesburger", "McDonald's", "Subway", "Rax", "Kotipizza", "Burger King", "Taco Bell", "KFC",
+    "Fafa's", "Espresso House", "Starbucks", "Social Burgerjoint", "Pancho Villa", "Picnic",
+]
+_STREETS = ["Mannerheimintie", "Fredrikinkatu", "Helsinginkatu", "Aleksanterinkatu", "Bulevardi", "Kaisaniemenkatu"]
+_PLACE_TYPES = [
+    "restaurant", "bar", "cafe", "bakery", "meal_takeaway", "food", "point_of_interest", "establishment",
+]
+
+_DISHES = [
+    "pizza", "pasta", "ramen", "steak tartar", "Baltic herring", "vorschmack", "dumplings", "cheese plate",
+    "natural wine", "craft beer", "cocktails", "dessert", "sourdough bread", "coffee",
+]
+_GOOD_TEMPLATES = [
+    "Cozy neighbourhood spot. Order the {d1} and the {d2}, and ask the chef about the {d3}. Walk in after 9 PM.",
+    "I come here for the {d1} every week. The service is relaxed and the {d2} is the best in Kallio.",
+    "Small menu but everything is done well: {d1}, {d2} and a short list of {d3}. Book ahead on weekends.",
+    "We had the tasting menu with {d1} and {d2}. Great atmosphere, friendly staff and a good wine list.",
+]
+_MESSY_TEMPLATES = [
+    "The {d1} is exelent!!! Chef kind and always in happy mood... Love this plase and the {d2}.",
+    "- {d1}\n- {d2}\n- {d3}\n- nice service",
+    "Great place - good {d1} - friendly staff - cheap {d2}",
+]
+_HYPE_TEMPLATES = [
+    "A Culinary Gem! 🍕🍷🔥 Perfect harmony of flavours, a true work of art. Highly recommended, must-try! "
+    "Unforgettable flavors and thoughtful presentation.",
+    "Best {d1} ever!!! Incredible, insane, 10/10 😍😍😍",
+]
+_MARKETING_TEMPLATES = [
+    "This restaurant shaped the culinary landscape of the region. Standing by its philosophy of time and place, "
+    "it has evolved to showcase the bounty of every season. A truly once in a lifetime experience and vision.",
+]
+_FINNISH_TEMPLATES = [
+    "tosi hyvää ja kans oli ranskalaisia, suosittelen ihan kaikille",
+    "Ravintola on mahtava ja ruoka on hyvä, mutta palvelu oli hidas. Tämä annos oli tosi kiva.",
+]
+_SHORT_TEMPLATES = ["So good!", "Nice place, love it", "Amazing", "Great place!!"]
+_NEGATIVE_TEMPLATES = ["Avoid this place, terrible service and awful {d1}. Never again."]
+_TAG_SETS = ["", "{}", '{Burger,Casual}', '{"Wine bar","Date night",Walk-in}', '{"Fine dining",Dinner,Korean}']
+
+
+def venue_names(rng: random.Random, n: int) -> List[str]:
+    out = []
+    for _ in range(n):
+        if rng.random() < 0.2:
+            brand = rng.choice(_BRANDS)
+            out.append(f"{brand} {rng.choice(_WORDS)}")
+            continue
+        parts = [rng.choice(_PREFIXES), rng.choice(_WORDS), rng.choice(_KINDS)]
+        out.append(" ".join(p for p in parts if p))
+    return out
+
+
+def blocklist(rng: random.Random, n: int) -> List[str]:
+    base = list(_BRANDS)
+    while len(base) < n:
+        base.append(f"{rng.choice(_WORDS)} {rng.choice(_KINDS) or 'Grill'} {rng.randint(1, 999)}")
+    return base[:n]
+
+
+def _address(rng: random.Random) -> str:
+    return f"{rng.choice(_STREETS)} {rng.randint(1, 120)}, 00{rng.randint(100, 990)} Helsinki, Finland"
+
+
+def places_details(rng: random.Random, n: int) -> List[dict]:
+    """
+    Google Places "details" results (the `result` object).
+    """
+    out = []
+    for name in venue_names(rng, n):
+        d = {
+            "name": name,
+            "formatted_address": _address(rng),
+            "types": rng.sample(_PLACE_TYPES, k=rng.randint(1, 4)),
+            "user_ratings_total": rng.randint(0, 400),
+            "geometry": {"location": {"lat": 60.15 + rng.random() * 0.1, "lng": 24.85 + rng.random() * 0.2}},
+        }
+        if rng.random() < 0.5:
+            d["editorial_summary"] = {"overview": f"{name} serves {rng.choice(_DISHES)} in Helsinki."}
+        out.append(d)
+    return out
+
+
+def next_data_payload(rng: random.Random, n_venues: int) -> dict:
+    """
+    Wolt-style Next.js __NEXT_DATA__ blob: deeply nested, lots of noise strings,
+    with the address/description buried inside.
+    """
+    venues = []
+    for name in venue_names(rng, n_venues):
+        venues.append(
+            {
+                "id": f"{rng.getrandbits(48):012x}",
+                "name": [{"lang": "en", "value": name}],
+                "image": {"url": f"https://imageproxy.wolt.com/venue/{rng.getrandbits(32):08x}.jpg"},
+                "opening_times": [f"Mo {rng.randint(8, 11)}:00-22:00", "Sa 12:00-23:00"],
+                "rating": {"score": round(rng.uniform(6, 10), 1), "volume": str(rng.randint(0, 500))},
+                "venue": {
+                    "address": rng.choice(["0", _address(rng)]),
+                    "streetAddress": _address(rng),
+                    "shortDescription": rng.choice(["", f"Fresh {rng.choice(_DISHES)} made daily in the city."]),
+                },
+                "tags": rng.sample(_KINDS, k=3),
+            }
+        )
+    return {
+        "props": {
+            "pageProps": {
+                "dehydratedState": {"queries": [{"state": {"data": {"sections": [{"items": venues}]}}}]},
+                "i18n": {"locale": "en", "strings": {f"key{i}": f"UI text {i}" for i in range(50)}},
+            }
+        },
+        "page": "/[country]/[city]/restaurant/[slug]",
+        "buildId": "synthetic",
+    }
+
+
+def comment_text(rng: random.Random) -> str:
+    r = rng.random()
+    if r < 0.45:
+        templates = _GOOD_TEMPLATES
+    elif r < 0.60:
+        templates = _MESSY_TEMPLATES
+    elif r < 0.70:
+        templates = _HYPE_TEMPLATES
+    elif r < 0.75:
+        templates = _MARKETING_TEMPLATES
+    elif r < 0.83:
+        templates = _FINNISH_TEMPLATES
+    elif r < 0.95:
+        templates = _SHORT_TEMPLATES
+    else:
+        templates = _NEGATIVE_TEMPLATES
+    d1, d2, d3 = rng.sample(_DISHES, 3)
+    text = rng.choice(templates).format(d1=d1, d2=d2, d3=d3)
+    if rng.random() < 0.3:
+        text += "\n\n" + rng.choice(_GOOD_TEMPLATES).format(d1=d2, d2=d3, d3=d1)
+    return text
+
+
+def comments(rng: random.Random, n: int) -> List[Tuple[str, str, str, str]]:
+    """
+    (restaurant_name, comment, image_yes_no, tags) tuples, decision_rules argument order.
+    """
+    names = venue_names(rng, n)
+    return [
+        (name, comment_text(rng), rng.choice(["yes", "no", "no"]), rng.choice(_TAG_SETS))
+        for name in names
+    ]
+
+
+def recommendations_frame(rng: random.Random, n: int) -> pd.DataFrame:
+    """
+    DataFrame with the same columns as the part2/input spreadsheet.
+    """
+    rows = comments(rng, n)
+    created = pd.Timestamp("2024-01-01") + pd.to_timedelta([rng.randint(0, 700 * 86400) for _ in rows], unit="s")
+    return pd.DataFrame(
+        {
+            COL_NAME: [r[0] for r in rows],
+            COL_COMMENT: [r[1] for r in rows],
+            COL_IMAGE: [r[2] for r in rows],
+            COL_CREATED: created,
+            COL_TAGS: [r[3] for r in rows],
+        }
+    )
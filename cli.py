@@ -0,0 +1,105 @@
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+# One entry point for both parts of the pipeline.
+#
+#   python cli.py discover                 # part 1: Wolt -> Places -> CSV
+#   python cli.py blocked "Hesburger Kamppi"
+#   python cli.py peek                     # look at the part2 input sheet
+#   python cli.py label [--triage ...]     # part 2: label the sheet
+#   python cli.py label-one --comment "..."
+#
+# Only this file and the standard library are imported up front. Each command
+# names the module it needs, and that module (and with it pandas, requests,
+# BeautifulSoup, the spellchecker, ...) is imported only when the command runs.
+# bench/startup_budget.py measures this with -X importtime.
+
+ROOT = Path(__file__).resolve().parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "part2" / "src")]
+
+# command -> (module whose main() runs it, help); extra arguments are passed through
+MODULE_COMMANDS = {
+    "discover": ("main", "discover new venues and write data/helsinki_new_openings.csv"),
+    "venues": ("venue_index", "proximity queries over discovered venues"),
+    "catalog": ("catalog", "query discovered venues and labeled recommendations"),
+    "check-discovery": ("check_discovery_fixtures", "run the discovery backends against fixtures"),
+    "check-pipeline": ("check_discovery_pipeline", "run the async discovery pipeline against fixtures"),
+    "growth": ("review_history", "venues whose Google review count grows fastest"),
+    "peek": ("peek_input", "show the columns and first rows of the part2 input sheet"),
+    "label": ("label_recommendations", "label the part2 input sheet"),
+    "serve": ("label_service", "serve the rule table over HTTP"),
+    "queue": ("review_queue", "page through the SQLite review queue"),
+    "train-triage": ("train_triage_model", "train the triage model"),
+    "check-rules": ("check_rule_table", "check the rule table against decision_rules"),
+}
+
+
+def run_module(command: str, args: list) -> None:
+    module_name = MODULE_COMMANDS[command][0]
+    module = importlib.import_module(module_name)
+    sys.argv = [f"cli.py {command}", *args]
+    module.main()
+
+
+def cmd_blocked(args: argparse.Namespace) -> int:
+    from blocklist import DEFAULT_BLOCKLIST, is_blocked, load_blocklist
+
+    blocked = load_blocklist(args.blocklist or DEFAULT_BLOCKLIST)
+    hits = 0
+    for name in args.names:
+        flag = is_blocked(name, blocked)
+        hits += flag
+        print(f"{'blocked' if flag else 'ok     '}  {name}")
+    return 1 if hits else 0
+
+
+def cmd_label_one(args: argparse.Namespace) -> int:
+    if args.reference_rules:
+        from rules import decision_rules as decide
+    else:
+        from rule_pipeline import RulePipeline
+
+        decide = RulePipeline.from_file(args.rules_config).decide
+
+    label, confidence, reason_codes = decide(args.name, args.comment, args.image, args.tags)
+    print(f"{label} ({confidence}) | {', '.join(reason_codes)}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Curated restaurant discovery pipeline.")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    sub.required = True
+
+    for name, (_, help_text) in MODULE_COMMANDS.items():
+        sub.add_parser(name, help=help_text)  # listed in --help; dispatched in main()
+
+    p = sub.add_parser("blocked", help="check venue names against config/blocklist.txt")
+    p.add_argument("names", nargs="+")
+    p.add_argument("--blocklist", type=Path)
+    p.set_defaults(func=cmd_blocked)
+
+    p = sub.add_parser("label-one", help="label a single comment")
+    p.add_argument("--comment", required=True)
+    p.add_argument("--name", default="")
+    p.add_argument("--image", default="no", help="yes/no")
+    p.add_argument("--tags", default="")
+    p.add_argument("--rules-config", type=Path)
+    p.add_argument("--reference-rules", action="store_true")
+    p.set_defaults(func=cmd_label_one)
+    return parser
+
+
+def main() -> int:
+    # module commands hand everything after the command name to the module's own parser
+    if len(sys.argv) > 1 and sys.argv[1] in MODULE_COMMANDS:
+        run_module(sys.argv[1], sys.argv[2:])
+        return 0
+    args = build_parser().parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from rules import KNOWN_WORDS_ENV, dump_known_words
+
+
+def main():
+    root = Path(__file__).resolve().parents[2]  # repo root
+    out_path = root / "part2" / "output" / "known_words_en.txt.gz"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    n = dump_known_words(out_path)
+    print(f"✅ Wrote {n} known words -> {out_path}")
+    print(f"Set {KNOWN_WORDS_ENV}={out_path} to preload it instead of pyspellchecker.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from language_id import LANGID_CORPUS, LANGID_MODEL, load_corpora, train
+
+
+def main():
+    corpora = load_corpora(LANGID_CORPUS)
+    if not corpora:
+        raise FileNotFoundError(f"No <lang>.txt files found in {LANGID_CORPUS}")
+
+    model = train(corpora)
+    model.save(LANGID_MODEL)
+
+    sizes = ", ".join(f"{lang}: {len(lines)} lines" for lang, lines in corpora.items())
+    print(f"Trained on {sizes}")
+    print(f"✅ Wrote {LANGID_MODEL} ({LANGID_MODEL.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import json
+import re
+import socket
+import sys
+import threading
+from typing import List, Optional
+
+import label_service
+from label_service import make_server
+
+# Talks raw HTTP to an in-process label service and checks the error paths:
+# a rejected request must close the keep-alive connection, so whatever is left
+# of its body can't be parsed as a second request.
+
+SMALL_BODY_LIMIT = 100
+
+
+def exchange(port: int, raw: bytes, timeout: float = 5.0) -> bytes:
+    """
+    Send raw bytes on a fresh connection, read until the server closes it (or times out).
+    """
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as s:
+        s.sendall(raw)
+        out = b""
+        try:
+            while True:
+                chunk = s.recv(65536)
+                if not chunk:
+                    break
+                out += chunk
+        except socket.timeout:
+            pass
+    return out
+
+
+def post(path: str, body: bytes, length: Optional[str] = None, keep_alive: bool = True) -> bytes:
+    headers = [
+        f"POST {path} HTTP/1.1",
+        "Host: localhost",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body) if length is None else length}",
+    ]
+    if not keep_alive:
+        headers.append("Connection: close")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("utf-8") + body
+
+
+def statuses(reply: bytes) -> List[int]:
+    # responses follow each other's bodies directly, so match status lines anywhere
+    return [int(code) for code in re.findall(rb"HTTP/1\.1 (\d{3}) ", reply)]
+
+
+def main():
+    failures = []
+
+    def check(ok: bool, what: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    server = make_server(port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    label_service.MAX_BODY_BYTES = SMALL_BODY_LIMIT
+
+    try:
+        smuggled = b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n"
+        body = smuggled + b" " * (SMALL_BODY_LIMIT + 1 - len(smuggled))
+        got = statuses(exchange(port, post("/label", body)))
+        check(got == [413], f"oversized body: one 413, nothing parsed from the body ({got})")
+
+        got = statuses(exchange(port, post("/label", smuggled, length="-1")))
+        check(got == [400], f"negative Content-Length: one 400, connection closed ({got})")
+
+        got = statuses(exchange(port, post("/label", b"{not json")))
+        check(got == [400], f"invalid JSON: one 400 ({got})")
+
+        item = json.dumps({"restaurant_name": "Bistro", "comment": "ok"}).encode("utf-8")
+        got = statuses(exchange(port, post("/label", item) + post("/label", item, keep_alive=False)))
+        check(got == [200, 200], f"keep-alive: two good requests on one connection ({got})")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if failures:
+        sys.exit(1)
+    print("✅ Label service closes the connection on rejected requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+from rules import decision_rules
+from rule_pipeline import RulePipeline
+
+
+def sample_rows(xlsx_path: Path) -> list[tuple[str, str, str, str]]:
+    df = pd.read_excel(xlsx_path)
+    rows = []
+    for _, row in df.iterrows():
+        name = str(row.get("Restaurant → Name", ""))
+        comment = str(row.get("Comment", ""))
+        image = str(row.get("Image yes/no", ""))
+        tags = str(row.get("Tags", ""))
+        rows.append((name, comment, image, tags))
+
+        # simple variants so more branches of the cascade get exercised
+        flipped = "yes" if image.strip().lower() == "no" else "no"
+        rows.append((name, comment, flipped, tags))
+        rows.append((name, comment[:50], flipped, tags))
+        rows.append((name, comment[:100], image, tags))
+    return rows
+
+
+def main():
+    root = Path(__file__).resolve().parents[2]  # repo root
+    files = list((root / "part2" / "input").glob("*.xlsx"))
+    if not files:
+        raise FileNotFoundError("No .xlsx found in part2/input")
+
+    rows = sample_rows(files[0])
+    pipeline = RulePipeline.from_file()
+
+    # one untimed pass so dictionary loading and word caches don't skew either side
+    expected = [decision_rules(*r) for r in rows]
+
+    t0 = time.perf_counter()
+    expected = [decision_rules(*r) for r in rows]
+    t_cascade = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = [pipeline.decide(*r) for r in rows]
+    t_table = time.perf_counter() - t0
+
+    mismatches = [(r, e, g) for r, e, g in zip(rows, expected, got) if tuple(e) != tuple(g)]
+    for (name, comment, image, _), e, g in mismatches[:20]:
+        print(f"MISMATCH {name!r} image={image!r}: cascade={e} table={g}")
+        print(f"  comment: {comment[:120]!r}")
+
+    print(f"Rows checked: {len(rows)} | mismatches: {len(mismatches)}")
+    print(
+        f"Cascade: {t_cascade / len(rows) * 1e6:.1f} us/row | "
+        f"Rule table: {t_table / len(rows) * 1e6:.1f} us/row"
+    )
+    if mismatches:
+        sys.exit(1)
+    print("✅ Rule table matches decision_rules on the sample dataset")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,234 @@
 # part2/src/label_recommendations.py
+import argparse
+import hashlib
+import json
 from pathlib import Path
+from typing import Callable, Optional, Tuple
 import pandas as pd
 
-from rules import decision_rules
+import rules
+from rules import decision_rules, rules_fingerprint
+from rule_pipeline import DEFAULT_RULES_CONFIG, RulePipeline
+from near_duplicates import MinHashLSH
+from review_queue import DEFAULT_DB, ReviewQueue
+from triage_model import TriagePipeline
+
+
+# expected columns (from your peek)
+COL_NAME = "Restaurant → Name"
+COL_COMMENT = "Comment"
+COL_IMAGE = "Image yes/no"
+COL_CREATED = "Created At"
+COL_TAGS = "Tags"
+
+
+def row_key(name: str, comment: str, image: str, tags: str) -> str:
+    """
+    Content hash of the decision_rules inputs for one row.
+    """
+    blob = json.dumps([name, comment, image, tags], ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load_label_cache(path: Path, fingerprint: str) -> dict:
+    """
+    Cached {row_key: [label, confidence, reason_codes]} from a previous run.
+    Empty if there is no cache, it was written under different rules, or it
+    isn't a cache file we can read (truncated, hand-edited); malformed entries
+    are dropped and just get relabeled.
+    """
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get("rules_fingerprint") != fingerprint:
+        return {}
+    rows = data.get("rows")
+    if not isinstance(rows, dict):
+        return {}
+    return {k: v for k, v in rows.items() if isinstance(v, list) and len(v) == 3}
+
+
+def save_label_cache(path: Path, fingerprint: str, rows: dict) -> None:
+    payload = {"rules_fingerprint": fingerprint, "rows": rows}
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+
+def flag_near_duplicates(out_df: pd.DataFrame, index: MinHashLSH) -> int:
+    """
+    Add this sheet's comments to the near-duplicate index, then append
+    near_duplicate_comment(<n>) to the reason codes of rows whose comment is
+    near-identical to n comments posted for other restaurants (this run or
+    earlier runs). Labels are left as they are. Returns the number of rows flagged.
+    """
+    keys = []
+    items = []
+    for _, row in out_df.iterrows():
+        inputs = [str(row.get(c, "")) for c in (COL_NAME, COL_COMMENT, COL_IMAGE, COL_TAGS)]
+        key = row_key(*inputs)
+        keys.append(key)
+        items.append((key, rules.norm(inputs[0]), inputs[1]))
+    index.add_many(items)
+
+    near = index.cross_group_counts(keys)
+    flagged = 0
+    reasons = list(out_df["Reason codes"])
+    for i, key in enumerate(keys):
+        n = near.get(key, 0)
+        if n:
+            reasons[i] = f"{reasons[i]}, near_duplicate_comment({n})" if reasons[i] else f"near_duplicate_comment({n})"
+            flagged += 1
+    out_df["Reason codes"] = reasons
+    return flagged
+
+
+def write_review_queue(out_df: pd.DataFrame, db_path: Path, fingerprint: str) -> int:
+    """
+    Upsert the labeled sheet into the SQLite review queue (see review_queue.py).
+    """
+    rows = []
+    for _, row in out_df.iterrows():
+        inputs = [str(row.get(c, "")) for c in (COL_NAME, COL_COMMENT, COL_IMAGE, COL_TAGS)]
+        created = row.get(COL_CREATED, "")
+        rows.append(
+            {
+                "row_key": row_key(*inputs),
+                "restaurant": inputs[0],
+                "comment": inputs[1],
+                "image": inputs[2],
+                "tags": inputs[3],
+                "created_at": "" if pd.isna(created) else str(created),
+                "label": row["Predicted decision"],
+                "confidence": row["Confidence"],
+                "reason_codes": row["Reason codes"],
+            }
+        )
+    with ReviewQueue(db_path) as queue:
+        return queue.write(rows, fingerprint)
+
+
+def write_rule_stats(path: Path, n_rows: int) -> None:
+    stats = rules.rule_stats()
+    total = sum(st.seconds for st in stats) or 1.0
+    out = pd.DataFrame(
+        [
+            {
+                "rule": st.name,
+                "calls": st.calls,
+                "fired": st.fired,
+                "fire_rate": round(st.fired / st.calls, 3) if st.calls else 0.0,
+                "total_ms": round(st.seconds * 1000, 3),
+                "mean_us": round(st.seconds / st.calls * 1e6, 1) if st.calls else 0.0,
+                "share_of_check_time": round(st.seconds / total, 3),
+                "rows": n_rows,
+            }
+            for st in stats
+        ]
+    )
+    out.to_csv(path, index=False, encoding="utf-8")
+
+
+def label_dataframe(
+    df: pd.DataFrame,
+    decide: Callable = decision_rules,
+    cache: Optional[dict] = None,
+    decide_batch: Optional[Callable] = None,
+) -> Tuple[pd.DataFrame, dict, int]:
+    """
+    Label every row of an input sheet.
+    Returns (labeled copy of df, cache entries for these rows, number of rows actually relabeled).
+    Rows found in `cache` (see row_key) are reused instead of relabeled.
+    If `decide_batch` is given, all rows that need labeling go through it in one call.
+    """
+    missing = [c for c in [COL_NAME, COL_COMMENT, COL_IMAGE, COL_CREATED, COL_TAGS] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns in input: {missing}. Found: {list(df.columns)}")
+
+    cache = cache or {}
+    keys = []
+    todo = {}  # row_key -> decision_rules inputs, for rows not in the cache
+
+    for _, row in df.iterrows():
+        name = row.get(COL_NAME, "")
+        comment = row.get(COL_COMMENT, "")
+        image = row.get(COL_IMAGE, "")
+        tags = row.get(COL_TAGS, "")
+
+        inputs = (
+            str(name) if name is not None else "",
+            str(comment) if comment is not None else "",
+            str(image) if image is not None else "",
+            str(tags) if tags is not None else "",
+        )
+        key = row_key(*inputs)
+        keys.append(key)
+        if key not in cache:
+            todo[key] = inputs
+
+    if decide_batch is not None:
+        fresh = dict(zip(todo, decide_batch(list(todo.values()))))
+    else:
+        fresh = {key: decide(*inputs) for key, inputs in todo.items()}
+
+    new_cache = {}
+    preds = []
+    confs = []
+    reasons = []
+    for key in keys:
+        label, confidence, reason_codes = fresh[key] if key in fresh else cache[key]
+        new_cache[key] = [label, confidence, list(reason_codes)]
+
+        preds.append(label)
+        confs.append(confidence)
+        reasons.append(", ".join(reason_codes))
+
+    out_df = df.copy()
+    out_df["Predicted decision"] = preds
+    out_df["Confidence"] = confs
+    out_df["Reason codes"] = reasons
+    return out_df, new_cache, len(todo)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Label restaurant recommendations.")
+    parser.add_argument("--no-cache", action="store_true", help="relabel every row, ignoring the label cache")
+    parser.add_argument(
+        "--profile-rules",
+        action="store_true",
+        help="record per-rule calls / fires / time and write a report next to the CSV (implies --no-cache)",
+    )
+    parser.add_argument(
+        "--rules-config",
+        type=Path,
+        default=DEFAULT_RULES_CONFIG,
+        help="declarative rule table to label with (default: part2/config/decision_rules.json)",
+    )
+    parser.add_argument(
+        "--reference-rules",
+        action="store_true",
+        help="use the hardcoded rules.decision_rules cascade instead of the rule table",
+    )
+    parser.add_argument(
+        "--triage",
+        action="store_true",
+        help="let the trained triage model label comments it is confident about (see train_triage_model.py)",
+    )
+    parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="skip near-duplicate comment detection",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["csv", "sqlite", "both"],
+        default="csv",
+        help="write the labeled CSV, the SQLite review queue, or both",
+    )
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="review queue database for --output sqlite/both")
+    args = parser.parse_args()
+
     root = Path(__file__).resolve().parents[2]  # repo root
     inp_dir = root / "part2" / "input"
     out_dir = root / "part2" / "output"
@@ -21,46 +244,54 @@ def main():
 
     df = pd.read_excel(xlsx_path)
 
-    # expected columns (from your peek)
-    col_name = "Restaurant → Name"
-    col_comment = "Comment"
-    col_image = "Image yes/no"
-    col_created = "Created At"
-    col_tags = "Tags"
+    # incremental relabeling: rows whose inputs and rules are unchanged reuse the cached result
+    cache_path = out_dir / "label_cache.json"
+    decide_batch = None
+    if args.reference_rules:
+        decide = decision_rules
+        fingerprint = rules_fingerprint()
+    elif args.triage:
+        triage = TriagePipeline.from_files(args.rules_config)
+        decide = triage.pipeline.decide
+        decide_batch = triage.decide_batch
+        fingerprint = triage.fingerprint
+    else:
+        pipeline = RulePipeline.from_file(args.rules_config)
+        decide = pipeline.decide
+        decide_batch = pipeline.decide_batch
+        fingerprint = pipeline.fingerprint
+    use_cache = not (args.no_cache or args.profile_rules)
+    cache = load_label_cache(cache_path, fingerprint) if use_cache else {}
 
-    missing = [c for c in [col_name, col_comment, col_image, col_created, col_tags] if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns in input: {missing}. Found: {list(df.columns)}")
+    if args.profile_rules:
+        rules.enable_rule_profiling()
 
-    preds = []
-    confs = []
-    reasons = []
+    out_df, new_cache, relabeled = label_dataframe(df, decide, cache, decide_batch=decide_batch)
 
-    for _, row in df.iterrows():
-        name = row.get(col_name, "")
-        comment = row.get(col_comment, "")
-        image = row.get(col_image, "")
-        tags = row.get(col_tags, "")
-
-        label, confidence, reason_codes = decision_rules(
-            restaurant_name=str(name) if name is not None else "",
-            comment=str(comment) if comment is not None else "",
-            image_yes_no=str(image) if image is not None else "",
-            tags=str(tags) if tags is not None else "",
-        )
+    save_label_cache(cache_path, fingerprint, new_cache)
 
-        preds.append(label)
-        confs.append(confidence)
-        reasons.append(", ".join(reason_codes))
+    if args.profile_rules:
+        rules.disable_rule_profiling()
 
-    out_df = df.copy()
-    out_df["Predicted decision"] = preds
-    out_df["Confidence"] = confs
-    out_df["Reason codes"] = reasons
+    if not args.no_dedupe:
+        # comment history across runs, so templates reposted later are still caught
+        with MinHashLSH(out_dir / "comment_minhash.sqlite") as index:
+            flagged = flag_near_duplicates(out_df, index)
+            print(f"Near-duplicate comments: {flagged} rows flagged ({len(index)} comments indexed)")
+
+    print(f"Relabeled {relabeled} rows, reused {len(df) - relabeled} from cache (rules {fingerprint})")
+    if args.output in ("csv", "both"):
+        out_path = out_dir / "recommendations_labeled.csv"
+        out_df.to_csv(out_path, index=False, encoding="utf-8")
+        print(f"✅ Wrote {len(out_df)} rows -> {out_path}")
+    if args.output in ("sqlite", "both"):
+        written = write_review_queue(out_df, args.db, fingerprint)
+        print(f"✅ Wrote {written} rows -> review queue {args.db}")
 
-    out_path = out_dir / "recommendations_labeled.csv"
-    out_df.to_csv(out_path, index=False, encoding="utf-8")
-    print(f"✅ Wrote {len(out_df)} rows -> {out_path}")
+    if args.profile_rules:
+        stats_path = out_dir / "recommendations_labeled_rule_stats.csv"
+        write_rule_stats(stats_path, n_rows=len(out_df))
+        print(f"Rule stats -> {stats_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import rules
+from rule_pipeline import DEFAULT_RULES_CONFIG, RulePipeline
+
+# Local labeling service for the moderation UI.
+#
+#   GET  /health        -> {"status": "ok", "rules": <fingerprint>}
+#   POST /label         {"restaurant_name", "comment", "image_yes_no", "tags"}
+#                       -> {"label", "confidence", "reason_codes"}
+#   POST /label/batch   {"items": [<same objects as /label>, ...]}
+#                       -> {"results": [<same objects as /label returns>, ...]}
+#
+# The rule table and spellchecker are loaded once at startup and stay warm.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH = 1000
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+INPUT_FIELDS = ("restaurant_name", "comment", "image_yes_no", "tags")
+
+
+def _inputs(item: dict) -> Tuple[str, str, str, str]:
+    if not isinstance(item, dict):
+        raise ValueError("each item must be a JSON object")
+    return tuple(str(item.get(f) or "") for f in INPUT_FIELDS)
+
+
+def label_one(pipeline: RulePipeline, item: dict) -> dict:
+    label, confidence, reason_codes = pipeline.decide(*_inputs(item))
+    return {"label": label, "confidence": confidence, "reason_codes": reason_codes}
+
+
+def label_batch(pipeline: RulePipeline, items: List[dict]) -> List[dict]:
+    return [label_one(pipeline, item) for item in items]
+
+
+def warm_up(pipeline: RulePipeline) -> None:
+    """
+    Load the spellchecker dictionary and regex caches before the first request.
+    """
+    rules.spellcheck_available()
+    pipeline.decide(
+        "Warm Up Bistro",
+        "We ordered the pasta and a bottle of wine, the service was friendly and the dessert was lovely.",
+        "yes",
+        "",
+    )
+
+
+class BadContentLength(ValueError):
+    pass
+
+
+class LabelHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients don't reconnect per request
+    disable_nagle_algorithm = True  # headers and body go out in separate writes; don't wait on delayed ACKs
+    server_version = "LabelService/1.0"
+
+    pipeline: Optional[RulePipeline] = None  # set by make_server
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, close: bool = False) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            # the request body wasn't (fully) read; whatever is left of it must
+            # not be parsed as the next request on this keep-alive connection
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # read(-1) would block this handler thread until the client hangs up
+            raise BadContentLength("invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise OverflowError(f"body larger than {MAX_BODY_BYTES} bytes")
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw.decode("utf-8") or "{}")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "rules": self.pipeline.fingerprint})
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        try:
+            data = self._read_json()
+        except OverflowError as e:
+            self._send_json(413, {"error": str(e)}, close=True)
+            return
+        except BadContentLength as e:
+            self._send_json(400, {"error": str(e)}, close=True)
+            return
+        except Exception:
+            self._send_json(400, {"error": "invalid JSON body"}, close=True)
+            return
+
+        try:
+            if self.path == "/label":
+                self._send_json(200, label_one(self.pipeline, data))
+            elif self.path == "/label/batch":
+                items = data.get("items") if isinstance(data, dict) else None
+                if not isinstance(items, list):
+                    self._send_json(400, {"error": "expected {\"items\": [...]}"})
+                elif len(items) > MAX_BATCH:
+                    self._send_json(413, {"error": f"batch larger than {MAX_BATCH} items"})
+                else:
+                    self._send_json(200, {"results": label_batch(self.pipeline, items)})
+            else:
+                self._send_json(404, {"error": "not found"})
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+
+
+def make_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    rules_config: Optional[Path] = None,
+    quiet: bool = True,
+) -> ThreadingHTTPServer:
+    pipeline = RulePipeline.from_file(rules_config)
+    warm_up(pipeline)
+
+    handler = type("BoundLabelHandler", (LabelHandler,), {"pipeline": pipeline, "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve decision rules over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--rules-config", type=Path, default=DEFAULT_RULES_CONFIG)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.rules_config, quiet=not args.verbose)
+    print(f"Label service on http://{args.host}:{args.port} (rules {server.RequestHandlerClass.pipeline.fingerprint})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
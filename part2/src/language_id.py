@@ -0,0 +1,153 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Compact character n-gram language identifier (hashed naive Bayes).
+#
+# The model is a small table of per-language log-probabilities for hashed
+# 1-3 character n-grams (part2/config/langid_model.npz, built from
+# part2/config/langid_corpus by build_langid_model.py). Scoring a batch
+# hashes every n-gram of every comment in one NumPy pass and sums the table
+# rows per comment, so thousands of comments cost a handful of array ops.
+
+LANGID_MODEL = Path(__file__).resolve().parents[1] / "config" / "langid_model.npz"
+LANGID_CORPUS = Path(__file__).resolve().parents[1] / "config" / "langid_corpus"
+
+BUCKETS = 4096
+NGRAM_MAX = 3
+SMOOTHING = 0.5
+
+_HASH_MULT = np.uint64(1_000_003)
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+_SEP = "\x00"
+
+
+def _normalize(text: str) -> str:
+    t = (text or "").lower()
+    t = re.sub(r"[\W\d_]+", " ", t)  # keep letters only (incl. ä/ö/å/é ...)
+    return f" {t.strip()} "
+
+
+def _ngram_ids(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed n-gram bucket ids for all texts, plus the text index of each id.
+    """
+    norm = [_normalize(t) for t in texts]
+    joined = _SEP.join(norm)
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+    starts = np.zeros(len(norm), dtype=np.int64)
+    if len(norm) > 1:
+        starts[1:] = np.cumsum([len(t) + 1 for t in norm[:-1]])
+
+    ids = []
+    pos = []
+    h = np.zeros(len(codes), dtype=np.uint64)
+    valid = np.ones(len(codes), dtype=bool)
+    for n in range(1, NGRAM_MAX + 1):
+        m = len(codes) - n + 1
+        if m <= 0:
+            break
+        # extend each n-1 gram at i by the character at i+n-1
+        h = h[:m] * _HASH_MULT + codes[n - 1:n - 1 + m]
+        valid = valid[:m] & (codes[n - 1:n - 1 + m] != 0)
+        bucket = ((h + np.uint64(n)) * _HASH_MIX >> np.uint64(40)) % np.uint64(BUCKETS)
+        keep = valid.copy()
+        if n == 1:
+            keep &= codes[:m] != ord(" ")  # lone spaces carry no signal
+        ids.append(bucket[keep].astype(np.int64))
+        pos.append(np.nonzero(keep)[0])
+
+    ids_all = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+    pos_all = np.concatenate(pos) if pos else np.empty(0, dtype=np.int64)
+    doc = np.searchsorted(starts, pos_all, side="right") - 1
+    return ids_all, doc
+
+
+class LanguageIdentifier:
+    def __init__(self, langs: List[str], logprobs: np.ndarray):
+        self.langs = list(langs)
+        self.logprobs = logprobs.astype(np.float32)  # (BUCKETS, n_langs)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "LanguageIdentifier":
+        data = np.load(path or LANGID_MODEL)
+        return cls([str(x) for x in data["langs"]], data["logprobs"])
+
+    def save(self, path: Optional[Path] = None) -> None:
+        np.savez_compressed(
+            path or LANGID_MODEL,
+            langs=np.array(self.langs, dtype=str),
+            logprobs=self.logprobs.astype(np.float16),
+        )
+
+    def scores(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mean log-probability per n-gram for each (text, language), and the
+        number of n-grams seen per text.
+        """
+        n = len(texts)
+        ids, doc = _ngram_ids(texts)
+        counts = np.bincount(doc, minlength=n).astype(np.float32)
+        rows = self.logprobs[ids]
+        out = np.empty((n, len(self.langs)), dtype=np.float32)
+        for j in range(len(self.langs)):
+            out[:, j] = np.bincount(doc, weights=rows[:, j], minlength=n)
+        out /= np.maximum(counts, 1.0)[:, None]
+        return out, counts
+
+    def identify_batch(self, texts: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Best language per text and its margin over the runner-up (mean log-prob
+        per n-gram; ~0.3+ is a confident call). Empty texts get ("", 0.0).
+        """
+        if not texts:
+            return [], np.empty(0, dtype=np.float32)
+        s, counts = self.scores(texts)
+        order = np.argsort(-s, axis=1)
+        best = order[:, 0]
+        idx = np.arange(len(texts))
+        margin = s[idx, best] - s[idx, order[:, 1]] if s.shape[1] > 1 else np.ones(len(texts), np.float32)
+        margin = np.where(counts > 0, margin, 0.0)
+        langs = [self.langs[b] if c > 0 else "" for b, c in zip(best, counts)]
+        return langs, margin
+
+    def identify(self, text: str) -> Tuple[str, float]:
+        langs, margin = self.identify_batch([text])
+        return langs[0], float(margin[0])
+
+
+def train(corpora: Dict[str, Sequence[str]]) -> LanguageIdentifier:
+    """
+    Fit the n-gram table from {lang: [lines]}.
+    """
+    langs = sorted(corpora)
+    counts = np.zeros((BUCKETS, len(langs)), dtype=np.float64)
+    for j, lang in enumerate(langs):
+        ids, _ = _ngram_ids(list(corpora[lang]))
+        counts[:, j] = np.bincount(ids, minlength=BUCKETS)
+    probs = (counts + SMOOTHING) / (counts.sum(axis=0) + SMOOTHING * BUCKETS)
+    return LanguageIdentifier(langs, np.log(probs))
+
+
+def load_corpora(corpus_dir: Path = LANGID_CORPUS) -> Dict[str, List[str]]:
+    out = {}
+    for path in sorted(corpus_dir.glob("*.txt")):
+        lines = [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
+        out[path.stem] = lines
+    return out
+
+
+_DEFAULT: Optional[LanguageIdentifier] = None
+
+
+def get_identifier() -> LanguageIdentifier:
+    """
+    Shared identifier, loaded from LANGID_MODEL on first use.
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = LanguageIdentifier.load()
+    return _DEFAULT
@@ -0,0 +1,161 @@
+import argparse
+import http.client
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from label_service import DEFAULT_HOST, DEFAULT_PORT
+
+
+def load_comments() -> List[dict]:
+    root = Path(__file__).resolve().parents[2]  # repo root
+    files = list((root / "part2" / "input").glob("*.xlsx"))
+    if not files:
+        raise FileNotFoundError("No .xlsx found in part2/input")
+
+    df = pd.read_excel(files[0])
+    items = []
+    for _, row in df.iterrows():
+        items.append(
+            {
+                "restaurant_name": str(row.get("Restaurant → Name", "")),
+                "comment": str(row.get("Comment", "")),
+                "image_yes_no": str(row.get("Image yes/no", "")),
+                "tags": str(row.get("Tags", "")),
+            }
+        )
+    return items
+
+
+def wait_until_up(host: str, port: int, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        conn = http.client.HTTPConnection(host, port, timeout=2)
+        try:
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.1)  # not up yet, or not healthy yet
+    raise RuntimeError(f"Service on {host}:{port} did not come up within {timeout}s")
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_load(host: str, port: int, items: List[dict], requests: int, concurrency: int, batch_size: int) -> dict:
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(worker_id: int, n: int) -> None:
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local: List[float] = []
+        local_errors = 0
+        for i in range(n):
+            start = (worker_id * 7919 + i * batch_size) % len(items)
+            batch = [items[(start + j) % len(items)] for j in range(batch_size)]
+            if batch_size == 1:
+                path, body = "/label", batch[0]
+            else:
+                path, body = "/label/batch", {"items": batch}
+            payload = json.dumps(body).encode("utf-8")
+
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", path, body=payload, headers={"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                # count it and reconnect, so one dropped connection doesn't end the worker
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                continue
+            local.append(time.perf_counter() - t0)
+            if resp.status != 200:
+                local_errors += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(i, n)) for i, n in enumerate(per_worker)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "comments": len(latencies) * batch_size,
+        "errors": errors[0],
+        "wall_s": wall,
+        "requests_per_s": len(latencies) / wall if wall else 0.0,
+        "comments_per_s": len(latencies) * batch_size / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the label service.")
+    parser.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1, help="1 = POST /label, >1 = POST /label/batch")
+    parser.add_argument("--spawn", action="store_true", help="start label_service.py in a subprocess first")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    host, port = url.hostname or DEFAULT_HOST, url.port or DEFAULT_PORT
+
+    proc = None
+    if args.spawn:
+        service = Path(__file__).resolve().parent / "label_service.py"
+        proc = subprocess.Popen([sys.executable, str(service), "--host", host, "--port", str(port)])
+    try:
+        wait_until_up(host, port)
+        items = load_comments()
+        # one untimed pass so the server's per-word caches are warm
+        run_load(host, port, items, requests=len(items), concurrency=1, batch_size=1)
+
+        stats = run_load(host, port, items, args.requests, args.concurrency, args.batch_size)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(
+        f"{stats['requests']} requests ({stats['comments']} comments) in {stats['wall_s']:.2f}s "
+        f"| concurrency {args.concurrency} | batch {args.batch_size} | errors {stats['errors']}"
+    )
+    print(f"Throughput: {stats['requests_per_s']:.0f} req/s, {stats['comments_per_s']:.0f} comments/s")
+    print(
+        f"Latency: p50 {stats['p50_ms']:.2f} ms | p95 {stats['p95_ms']:.2f} ms | "
+        f"p99 {stats['p99_ms']:.2f} ms | max {stats['max_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
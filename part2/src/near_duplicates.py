@@ -0,0 +1,244 @@
+import re
+import sqlite3
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from rules import MIN_CHARS
+
+# MinHash + LSH index for near-duplicate / template comments.
+#
+# Each comment becomes a set of character shingles, hashed into a short MinHash
+# signature. Signatures are split into bands; comments that share any band land
+# in the same bucket and become candidates, and only candidates are compared
+# (each one against the threshold, so similarity never chains through a third
+# comment). There is no all-pairs comparison.
+#
+# The index lives in SQLite (indexed band buckets), so a run only reads the
+# buckets of the comments it adds: its cost follows the size of the sheet, not
+# of the history. Identical signatures (a template pasted verbatim) are stored
+# once with a per-restaurant count, so a bucket holds distinct texts only.
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows -> candidates from ~0.5 Jaccard similarity
+SHINGLE_CHARS = 5
+MIN_SIMILARITY = 0.6  # estimated Jaccard needed to count as a near-duplicate
+MIN_INDEX_CHARS = MIN_CHARS  # shorter comments ("So good!") repeat naturally; don't index them
+SQL_CHUNK = 500  # ids per "IN (...)" query, under SQLite's bound-parameter limit
+
+_PRIME = (1 << 31) - 1
+_MAX_HASH = np.uint64(_PRIME)
+
+
+def shingles(text: str, k: int = SHINGLE_CHARS) -> List[str]:
+    t = re.sub(r"[^\w\s]", " ", (text or "").lower())
+    t = re.sub(r"\s+", " ", t).strip()
+    if len(t) <= k:
+        return [t] if t else []
+    return [t[i:i + k] for i in range(len(t) - k + 1)]
+
+
+def _select_in(conn: sqlite3.Connection, sql: str, values: Sequence) -> List[tuple]:
+    """
+    Run `sql` (with one "IN ({})" placeholder list) over `values` in chunks.
+    """
+    out = []
+    for start in range(0, len(values), SQL_CHUNK):
+        chunk = list(values[start:start + SQL_CHUNK])
+        out.extend(conn.execute(sql.format(",".join("?" * len(chunk))), chunk))
+    return out
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (
+    num_perm INTEGER NOT NULL,
+    bands INTEGER NOT NULL,
+    seed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS signatures (
+    id INTEGER PRIMARY KEY,
+    sig BLOB NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS docs (
+    key TEXT PRIMARY KEY,
+    grp TEXT NOT NULL,
+    sig_id INTEGER NOT NULL REFERENCES signatures(id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_docs_sig ON docs(sig_id, grp);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket BLOB NOT NULL,
+    sig_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, sig_id)
+) WITHOUT ROWID;
+"""
+
+
+class MinHashLSH:
+    """
+    Incremental near-duplicate index. Documents are added with a key (unique id,
+    e.g. a row hash) and a group (e.g. the restaurant), so matches within the
+    same group can be ignored. `path` is the SQLite file the index is kept in
+    (default: in memory); an existing file keeps its own MinHash parameters.
+    """
+
+    def __init__(self, path=":memory:", num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = 1):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        stored = self.conn.execute("SELECT num_perm, bands, seed FROM params").fetchone()
+        if stored:
+            num_perm, bands, seed = stored
+        elif num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        else:
+            with self.conn:
+                self.conn.execute("INSERT INTO params VALUES (?, ?, ?)", (num_perm, bands, seed))
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "MinHashLSH":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM docs WHERE key = ?", (key,)).fetchone() is not None
+
+    def signature(self, text: str) -> np.ndarray:
+        sh = shingles(text)
+        if not sh:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in sh), dtype=np.uint64, count=len(sh))
+        # (a * x + b) mod p for every permutation at once; a, x < 2^32 so no uint64 overflow
+        hv = (self._a[:, None] * x[None, :] + self._b[:, None]) % _MAX_HASH
+        return hv.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _sig_id(self, sig: np.ndarray) -> int:
+        """
+        Id of a stored signature, inserting it and its band buckets if it is new.
+        """
+        blob = sig.tobytes()
+        row = self.conn.execute("SELECT id FROM signatures WHERE sig = ?", (blob,)).fetchone()
+        if row:
+            return row[0]
+        sig_id = self.conn.execute("INSERT INTO signatures (sig) VALUES (?)", (blob,)).lastrowid
+        self.conn.executemany(
+            "INSERT INTO bands (band, bucket, sig_id) VALUES (?, ?, ?)",
+            [(b, bk, sig_id) for b, bk in enumerate(self._band_keys(sig))],
+        )
+        return sig_id
+
+    def add_many(self, items: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Add (key, group, text) items. Keys already in the index and texts that
+        are too short are skipped. Returns the number of documents added.
+        """
+        added = 0
+        with self.conn:
+            for key, group, text in items:
+                if len((text or "").strip()) < MIN_INDEX_CHARS or key in self:
+                    continue
+                sig_id = self._sig_id(self.signature(text))
+                self.conn.execute("INSERT INTO docs (key, grp, sig_id) VALUES (?, ?, ?)", (key, group, sig_id))
+                added += 1
+        return added
+
+    def _similar(self, sigs: Sequence[np.ndarray], min_similarity: float) -> List[List[Tuple[int, float]]]:
+        """
+        For each query signature, [(stored signature id, estimated Jaccard)] of
+        the stored signatures in its buckets that reach min_similarity.
+        """
+        bucket_rows = [(q, b, bk) for q, sig in enumerate(sigs) for b, bk in enumerate(self._band_keys(sig))]
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS query_buckets (q INTEGER, band INTEGER, bucket BLOB)")
+        self.conn.execute("DELETE FROM query_buckets")
+        self.conn.executemany("INSERT INTO query_buckets VALUES (?, ?, ?)", bucket_rows)
+        pairs = self.conn.execute(
+            """
+            SELECT DISTINCT q.q, b.sig_id
+            FROM query_buckets q
+            JOIN bands b ON b.band = q.band AND b.bucket = q.bucket
+            """
+        ).fetchall()
+        self.conn.execute("DELETE FROM query_buckets")
+
+        out: List[List[Tuple[int, float]]] = [[] for _ in sigs]
+        if not pairs:
+            return out
+        q, cand = np.array(pairs, dtype=np.int64).T
+        ids, at = np.unique(cand, return_inverse=True)  # fetch each candidate signature once
+        blobs = dict(_select_in(self.conn, "SELECT id, sig FROM signatures WHERE id IN ({})", ids.tolist()))
+        stored = np.frombuffer(b"".join(blobs[i] for i in ids.tolist()), dtype=np.uint32).reshape(len(ids), -1)
+        sims = (stored[at] == np.vstack(sigs)[q]).mean(axis=1)
+        for i in np.flatnonzero(sims >= min_similarity):
+            out[q[i]].append((int(cand[i]), float(sims[i])))
+        return out
+
+    def _group_counts(self, sig_ids: Iterable[int]) -> Dict[int, Counter]:
+        """
+        {signature id: Counter(group -> documents with that signature)}.
+        """
+        out: Dict[int, Counter] = defaultdict(Counter)
+        sql = "SELECT sig_id, grp, COUNT(*) FROM docs WHERE sig_id IN ({}) GROUP BY sig_id, grp"
+        for sig_id, grp, n in _select_in(self.conn, sql, sorted(set(sig_ids))):
+            out[sig_id][grp] = n
+        return out
+
+    def query(self, text: str, min_similarity: float = MIN_SIMILARITY) -> List[Tuple[str, float]]:
+        """
+        Indexed documents similar to `text`, as (key, estimated Jaccard), best first.
+        """
+        matches = self._similar([self.signature(text)], min_similarity)[0]
+        out = []
+        for sig_id, s in matches:
+            out.extend((k, s) for (k,) in self.conn.execute("SELECT key FROM docs WHERE sig_id = ?", (sig_id,)))
+        out.sort(key=lambda ks: ks[1], reverse=True)
+        return out
+
+    def cross_group_counts(self, keys: Sequence[str], min_similarity: float = MIN_SIMILARITY) -> Dict[str, int]:
+        """
+        {key: indexed documents from other groups whose similarity to it is at
+        least min_similarity}, for the given indexed keys (keys with no such
+        documents are left out). Only the buckets of these keys are read.
+        """
+        docs = {
+            key: (grp, sig_id)
+            for key, grp, sig_id in _select_in(self.conn, "SELECT key, grp, sig_id FROM docs WHERE key IN ({})", keys)
+        }
+        if not docs:
+            return {}
+
+        query_ids = sorted({sig_id for _, sig_id in docs.values()})
+        sig_rows = dict(_select_in(self.conn, "SELECT id, sig FROM signatures WHERE id IN ({})", query_ids))
+        sigs = [np.frombuffer(sig_rows[i], dtype=np.uint32) for i in query_ids]
+        similar = dict(zip(query_ids, self._similar(sigs, min_similarity)))
+        counts = self._group_counts(sig_id for matches in similar.values() for sig_id, _ in matches)
+
+        out = {}
+        for key, (grp, sig_id) in docs.items():
+            n = sum(
+                total - per_group[grp]
+                for per_group, total in ((counts[m], sum(counts[m].values())) for m, _ in similar[sig_id])
+            )
+            if n:
+                out[key] = n
+        return out
@@ -1,25 +1,59 @@
 # part2/src/peek_input.py
 from pathlib import Path
-import pandas as pd
+from typing import List, Tuple
+
+# openpyxl in read-only mode (what pandas uses under the hood for .xlsx), so a
+# quick look at the sheet doesn't pay for importing pandas.
 
-def main():
-    root = Path(__file__).resolve().parents[2]  # repo root
-    inp = root / "part2" / "input"
 
+def find_input(inp: Path) -> Path:
     # grab the first .xlsx in input folder
     files = list(inp.glob("*.xlsx"))
     if not files:
         raise FileNotFoundError(f"No .xlsx found in {inp}")
+    return files[0]
+
+
+def peek(xlsx_path: Path, n: int = 3) -> Tuple[List[str], List[tuple], int]:
+    """
+    (column names, first n rows, total data rows) of the first sheet.
+    """
+    from openpyxl import load_workbook
 
-    xlsx_path = files[0]
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        columns = [str(c) if c is not None else "" for c in next(rows, ())]
+        while columns and not columns[-1]:  # formatting can stretch the sheet past the last real column
+            columns.pop()
+        sample = []
+        total = 0
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            if total < n:
+                sample.append(row)
+            total += 1
+    finally:
+        wb.close()
+    return columns, sample, total
+
+
+def main():
+    root = Path(__file__).resolve().parents[2]  # repo root
+    xlsx_path = find_input(root / "part2" / "input")
     print("Reading:", xlsx_path)
 
-    df = pd.read_excel(xlsx_path)
-    print("\nRows:", len(df))
-    print("Columns:", list(df.columns))
+    columns, sample, total = peek(xlsx_path)
+    print("\nRows:", total)
+    print("Columns:", columns)
 
-    print("\nSample rows (first 3):")
-    print(df.head(3).to_string(index=False))
+    print(f"\nSample rows (first {len(sample)}):")
+    for row in sample:
+        print()
+        for col, value in zip(columns, row):
+            text = "" if value is None else " ".join(str(value).split())
+            print(f"  {col}: {text[:100]}{'...' if len(text) > 100 else ''}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,283 @@
+import argparse
+import re
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rules import LABEL_KEEP, LABEL_NEEDS_EDIT, LABEL_NEEDS_INFO, LABEL_REMOVE
+
+# SQLite moderation queue for labeled recommendations.
+#
+# One row per labeled comment (keyed by row_key, so relabeling updates in place)
+# plus one row per reason code. Label, confidence and reason code indexes are
+# ordered by review priority, created-at has its own index, and the pending
+# queue has a partial index in review order, so next_batch() reads one page
+# straight off an index instead of loading and sorting the whole sheet.
+
+DEFAULT_DB = Path(__file__).resolve().parents[1] / "output" / "review_queue.sqlite"
+DEFAULT_BATCH = 50
+
+# lower = reviewed first; anything not listed is PRIORITY_CONFIDENT
+REVIEW_PRIORITY = {
+    (LABEL_NEEDS_INFO, "medium"): 0,
+    (LABEL_NEEDS_INFO, "low"): 0,
+    (LABEL_NEEDS_EDIT, "medium"): 1,
+    (LABEL_NEEDS_EDIT, "low"): 1,
+    (LABEL_KEEP, "medium"): 2,
+    (LABEL_KEEP, "low"): 2,
+    (LABEL_REMOVE, "medium"): 3,
+    (LABEL_REMOVE, "low"): 3,
+}
+PRIORITY_CONFIDENT = 9
+PRIORITY_NEAR_DUPLICATE = 2  # template suspects jump ahead of confident labels
+ANALYSIS_LIMIT = 1000  # rows per index sampled when planner statistics are refreshed
+STATS_GROWTH = 2  # refresh them once the queue has grown this many times since the last refresh
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    row_key TEXT NOT NULL UNIQUE,
+    restaurant TEXT NOT NULL,
+    comment TEXT NOT NULL,
+    image TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    label TEXT NOT NULL,
+    confidence TEXT NOT NULL,
+    reason_codes TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    rules_fingerprint TEXT NOT NULL,
+    labeled_at TEXT NOT NULL,
+    reviewed_at TEXT,
+    review_decision TEXT
+);
+-- priority/created_at are copied from labels so a reason filter can page in review order
+CREATE TABLE IF NOT EXISTS label_reasons (
+    label_id INTEGER NOT NULL REFERENCES labels(id) ON DELETE CASCADE,
+    code TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (label_id, detail)
+);
+CREATE TABLE IF NOT EXISTS queue_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_labels_pending
+    ON labels(priority, created_at, id) WHERE reviewed_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_labels_label ON labels(label, priority, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_labels_confidence ON labels(confidence, priority, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_labels_created_at ON labels(created_at);
+CREATE INDEX IF NOT EXISTS idx_label_reasons_code ON label_reasons(code, priority, created_at, label_id);
+"""
+
+Cursor = Tuple[int, str, int]  # (priority, created_at, id) of the last row served
+
+
+def reason_code(detail: str) -> str:
+    """
+    "emoji_spam(7)" -> "emoji_spam"
+    """
+    return re.sub(r"\(.*\)$", "", detail.strip())
+
+
+def split_reasons(reason_codes: str) -> List[str]:
+    return [r.strip() for r in (reason_codes or "").split(",") if r.strip()]
+
+
+def review_priority(label: str, confidence: str, reasons: Iterable[str] = ()) -> int:
+    p = REVIEW_PRIORITY.get((label, confidence), PRIORITY_CONFIDENT)
+    if any(reason_code(r) == "near_duplicate_comment" for r in reasons):
+        p = min(p, PRIORITY_NEAR_DUPLICATE)
+    return p
+
+
+def encode_cursor(c: Cursor) -> str:
+    return f"{c[0]}|{c[1]}|{c[2]}"
+
+
+def decode_cursor(s: str) -> Cursor:
+    p, created, rid = s.split("|")
+    return int(p), created, int(rid)
+
+
+class ReviewQueue:
+    def __init__(self, path: Path = DEFAULT_DB):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ReviewQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, rows: Iterable[Dict[str, str]], fingerprint: str) -> int:
+        """
+        Upsert labeled rows (dicts with row_key, restaurant, comment, image, tags,
+        created_at, label, confidence, reason_codes). A row whose label changes
+        goes back into the queue; an unchanged row keeps its review state.
+        Returns the number of rows written.
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        n = 0
+        with self.conn:
+            for r in rows:
+                reasons = split_reasons(r["reason_codes"])
+                created_at = str(r.get("created_at", "") or "")
+                priority = review_priority(r["label"], r["confidence"], reasons)
+                self.conn.execute(
+                    """
+                    INSERT INTO labels (row_key, restaurant, comment, image, tags, created_at, label,
+                                        confidence, reason_codes, priority, rules_fingerprint, labeled_at)
+                    VALUES (:row_key, :restaurant, :comment, :image, :tags, :created_at, :label,
+                            :confidence, :reason_codes, :priority, :fingerprint, :now)
+                    ON CONFLICT(row_key) DO UPDATE SET
+                        reviewed_at = CASE WHEN labels.label = excluded.label
+                                           AND labels.confidence = excluded.confidence
+                                      THEN labels.reviewed_at END,
+                        review_decision = CASE WHEN labels.label = excluded.label
+                                               AND labels.confidence = excluded.confidence
+                                          THEN labels.review_decision END,
+                        label = excluded.label,
+                        confidence = excluded.confidence,
+                        reason_codes = excluded.reason_codes,
+                        priority = excluded.priority,
+                        rules_fingerprint = excluded.rules_fingerprint,
+                        labeled_at = excluded.labeled_at
+                    """,
+                    {
+                        **{k: str(r.get(k, "") or "") for k in ("row_key", "restaurant", "comment", "image", "tags")},
+                        "created_at": created_at,
+                        "label": r["label"],
+                        "confidence": r["confidence"],
+                        "reason_codes": ", ".join(reasons),
+                        "priority": priority,
+                        "fingerprint": fingerprint,
+                        "now": now,
+                    },
+                )
+                label_id = self.conn.execute("SELECT id FROM labels WHERE row_key = ?", (r["row_key"],)).fetchone()[0]
+                self.conn.execute("DELETE FROM label_reasons WHERE label_id = ?", (label_id,))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO label_reasons (label_id, code, detail, priority, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(label_id, reason_code(d), d, priority, created_at) for d in reasons],
+                )
+                n += 1
+        self._refresh_stats()
+        return n
+
+    def _refresh_stats(self) -> None:
+        """
+        Sampled ANALYZE (ANALYSIS_LIMIT rows per index) when the planner has no
+        statistics yet or the queue has grown STATS_GROWTH-fold since they were
+        taken. A full ANALYZE after every write would scan the whole queue each time.
+        """
+        rows = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM labels").fetchone()[0]  # rows are never deleted
+        last = self.conn.execute("SELECT value FROM queue_meta WHERE key = 'analyzed_rows'").fetchone()
+        if last is not None and rows < last[0] * STATS_GROWTH:
+            return
+        with self.conn:
+            self.conn.execute("ANALYZE")
+            self.conn.execute("INSERT OR REPLACE INTO queue_meta (key, value) VALUES ('analyzed_rows', ?)", (rows,))
+
+    def next_batch(
+        self,
+        size: int = DEFAULT_BATCH,
+        after: Optional[Cursor] = None,
+        label: Optional[str] = None,
+        confidence: Optional[str] = None,
+        reason: Optional[str] = None,
+    ) -> Tuple[List[sqlite3.Row], Optional[Cursor]]:
+        """
+        Next `size` unreviewed rows in priority order (then oldest first), starting
+        after `after`. Returns (rows, cursor for the following page or None).
+        Keyset paging on the pending index: each page costs O(size), not O(queue).
+        """
+        # with a reason filter, walk that reason's index in review order instead
+        src = "label_reasons r JOIN labels l ON l.id = r.label_id" if reason else "labels l"
+        key = "r.priority, r.created_at, r.label_id" if reason else "l.priority, l.created_at, l.id"
+
+        where = ["l.reviewed_at IS NULL"]
+        params: List[object] = []
+        if reason:
+            where.append("r.code = ?")
+            params.append(reason)
+        if after is not None:
+            where.append(f"({key}) > (?, ?, ?)")
+            params.extend(after)
+        if label:
+            where.append("l.label = ?")
+            params.append(label)
+        if confidence:
+            where.append("l.confidence = ?")
+            params.append(confidence)
+
+        sql = f"SELECT l.* FROM {src} WHERE {' AND '.join(where)} ORDER BY {key} LIMIT ?"
+        rows = self.conn.execute(sql, params + [size]).fetchall()
+        cursor = (rows[-1]["priority"], rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == size else None
+        return rows, cursor
+
+    def mark_reviewed(self, row_keys: Iterable[str], decision: str) -> int:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.conn:
+            cur = self.conn.executemany(
+                "UPDATE labels SET reviewed_at = ?, review_decision = ? WHERE row_key = ?",
+                [(now, decision, k) for k in row_keys],
+            )
+        return cur.rowcount
+
+    def counts(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """
+            SELECT label, confidence, COUNT(*) AS total, SUM(reviewed_at IS NULL) AS pending
+            FROM labels GROUP BY label, confidence ORDER BY MIN(priority), label, confidence
+            """
+        ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page through the moderation queue.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--after", help="cursor printed at the end of the previous page")
+    parser.add_argument("--label")
+    parser.add_argument("--confidence")
+    parser.add_argument("--reason", help='reason code without arguments, e.g. "spelling_issues"')
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        raise FileNotFoundError(f"{args.db} not found; run label_recommendations.py --output sqlite first")
+
+    with ReviewQueue(args.db) as queue:
+        for c in queue.counts():
+            print(f"{c['label']} / {c['confidence']}: {c['pending']} pending of {c['total']}")
+
+        rows, cursor = queue.next_batch(
+            size=args.size,
+            after=decode_cursor(args.after) if args.after else None,
+            label=args.label,
+            confidence=args.confidence,
+            reason=args.reason,
+        )
+    print()
+    for r in rows:
+        print(f"[p{r['priority']}] {r['restaurant']} | {r['label']} ({r['confidence']}) | {r['reason_codes']}")
+        print(f"      {r['comment'][:100]!r}")
+    if cursor:
+        print(f"\nNext page: --after '{encode_cursor(cursor)}'")
+
+
+if __name__ == "__main__":
+    main()
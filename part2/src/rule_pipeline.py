@@ -0,0 +1,233 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import rules
+
+# Default rule table (same decisions as rules.decision_rules, in declarative form)
+DEFAULT_RULES_CONFIG = Path(__file__).resolve().parents[1] / "config" / "decision_rules.json"
+
+LABELS = {rules.LABEL_KEEP, rules.LABEL_REMOVE, rules.LABEL_NEEDS_INFO, rules.LABEL_NEEDS_EDIT}
+
+
+# --- features ---
+# Named signals a rule can test. Each is computed at most once per comment.
+# Checks are looked up on the rules module at call time, so rule profiling
+# (rules.enable_rule_profiling) sees them.
+
+FEATURES: Dict[str, Callable[["RuleContext"], object]] = {
+    "chain": lambda c: rules.is_chain_or_franchise(c.name),
+    "hotel": lambda c: rules.is_hotel(c.name),
+    "empty": lambda c: not c.tn,
+    "non_english": lambda c: rules.is_non_english(c.text, lang=c.lang),
+    "marketing_long": lambda c: len(c.tn) >= rules.MARKETING_MIN_CHARS,
+    "first_person": lambda c: rules.has_first_person(c.tn),
+    "marketing_phrases": lambda c: rules.count_marketing_phrases(c.tn) >= rules.MARKETING_MIN_HITS,
+    "concrete_food": lambda c: rules.has_concrete_food(c.tn),
+    "negative": lambda c: rules.is_negative_recommendation(c.text),
+    "emoji_n": lambda c: rules.count_emojis(c.text),
+    "emoji_spam": lambda c: c["emoji_n"] >= rules.HARD_EMOJI_REMOVE,
+    "emoji_over_cap": lambda c: c["emoji_n"] > rules.MAX_EMOJIS,
+    "dashy": lambda c: rules.uses_dashy_style(c.text),
+    "ai_hype_template": lambda c: rules.is_ai_hype_template(c.text),
+    "overly_positive": lambda c: rules.overly_positive_hype(c.text),
+    "hype_template": lambda c: c["ai_hype_template"] or c["overly_positive"],
+    "specifics": lambda c: rules.has_specifics(c.text),
+    "generic": lambda c: rules.is_generic_comment(c.text),
+    "below_min_chars": lambda c: len(c.tn) < rules.MIN_CHARS,
+    "short_text": lambda c: len(c.tn) < rules.SHORT_HYPE_CHARS,
+    "low_specificity_length": lambda c: len(c.tn) < rules.LOW_SPECIFICITY_CHARS,
+    "no_image": lambda c: c.img == "no",
+    "messy": lambda c: rules.looks_like_needs_edit(c.text),
+    "spelling": lambda c: rules.has_spelling_issues(c.text),
+}
+
+
+class RuleContext:
+    """
+    One comment's inputs plus lazily computed, memoized feature values.
+    Also resolves rules thresholds (e.g. MIN_CHARS) for reason templates.
+    """
+
+    __slots__ = ("name", "text", "tn", "img", "lang", "_values")
+
+    def __init__(
+        self,
+        restaurant_name: str,
+        comment: str,
+        image_yes_no: str,
+        lang: Optional[Tuple[str, float]] = None,
+    ):
+        self.name = (restaurant_name or "").strip()
+        self.text = (comment or "").strip()
+        self.tn = rules.norm(self.text)
+        self.img = rules.norm(image_yes_no)
+        self.lang = lang  # (code, margin) when language ID already ran for the batch
+        self._values: Dict[str, object] = {}
+
+    def __getitem__(self, key: str):
+        if key in self._values:
+            return self._values[key]
+        if key in FEATURES:
+            v = FEATURES[key](self)
+            self._values[key] = v
+            return v
+        if key.isupper() and hasattr(rules, key):
+            return getattr(rules, key)
+        raise KeyError(key)
+
+
+# --- rule table ---
+
+@dataclass
+class Rule:
+    name: str
+    precedence: int
+    when: List[Tuple[str, bool]]  # (feature, expected truthiness), cheapest first
+    label: str
+    confidence: str
+    reasons: List[str]  # str.format templates over features/thresholds
+    cost: float  # upper-bound cost estimate: sum of its feature costs
+
+    def matches(self, ctx: RuleContext) -> bool:
+        for feature, expected in self.when:
+            if bool(ctx[feature]) != expected:
+                return False
+        return True
+
+    def outcome(self, ctx: RuleContext) -> Tuple[str, str, List[str]]:
+        return (self.label, self.confidence, [r.format_map(ctx) for r in self.reasons])
+
+
+def _parse_condition(cond: str) -> Tuple[str, bool]:
+    cond = cond.strip()
+    if cond.startswith("!"):
+        return cond[1:].strip(), False
+    return cond, True
+
+
+def compile_rules(config: dict) -> List[Rule]:
+    """
+    Validate a rule table. Returns the rules in precedence order, each with its
+    conditions sorted cheapest first.
+    """
+    costs = {k: float(v.get("cost", 1.0)) for k, v in (config.get("features") or {}).items()}
+    unknown = sorted(set(costs) - set(FEATURES))
+    if unknown:
+        raise ValueError(f"Unknown features in rule config: {unknown}")
+
+    compiled: List[Rule] = []
+    seen_precedence: Dict[int, str] = {}
+    for raw in config.get("rules") or []:
+        name = raw["name"]
+        precedence = int(raw["precedence"])
+        if precedence in seen_precedence:
+            raise ValueError(f"Rules {seen_precedence[precedence]!r} and {name!r} share precedence {precedence}")
+        seen_precedence[precedence] = name
+
+        if raw["label"] not in LABELS:
+            raise ValueError(f"Rule {name!r} has unknown label {raw['label']!r}")
+
+        when = [_parse_condition(c) for c in raw.get("when") or []]
+        for feature, _ in when:
+            if feature not in FEATURES:
+                raise ValueError(f"Rule {name!r} uses unknown feature {feature!r}")
+        when.sort(key=lambda fe: costs.get(fe[0], 1.0))
+
+        compiled.append(
+            Rule(
+                name=name,
+                precedence=precedence,
+                when=when,
+                label=raw["label"],
+                confidence=raw["confidence"],
+                reasons=list(raw.get("reasons") or []),
+                cost=sum(costs.get(f, 1.0) for f, _ in when),
+            )
+        )
+
+    if not compiled:
+        raise ValueError("Rule config has no rules")
+    if not any(not r.when for r in compiled):
+        raise ValueError("Rule config needs at least one unconditional fallback rule")
+
+    compiled.sort(key=lambda r: r.precedence)
+    return compiled
+
+
+class RulePipeline:
+    """
+    Compiled rule table. The result is always the matching rule with the
+    lowest precedence, exactly like the if/return cascade in decision_rules.
+
+    Evaluation order:
+    1) cheap rules (cost <= cheap_cost), cheapest first, to find an early bound
+    2) the remaining rules in precedence order, stopping at that bound
+    so an expensive check (spelling, language) only runs when no cheaper rule
+    with a lower precedence has already decided the comment.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.rules = compile_rules(config)
+        cheap_cost = float(config.get("cheap_cost", 0.0))
+        self.cheap = sorted((r for r in self.rules if r.cost <= cheap_cost), key=lambda r: (r.cost, r.precedence))
+        self.rest = [r for r in self.rules if r.cost > cheap_cost]
+
+        blob = json.dumps(config, sort_keys=True, ensure_ascii=False)
+        table_hash = hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+        self.fingerprint = f"{rules.rules_fingerprint()}-{table_hash}"
+
+    @classmethod
+    def from_file(cls, path: Optional[Path] = None) -> "RulePipeline":
+        path = Path(path) if path else DEFAULT_RULES_CONFIG
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    def match(self, ctx: RuleContext) -> Rule:
+        best: Optional[Rule] = None
+        for rule in self.cheap:
+            if best is not None and rule.precedence >= best.precedence:
+                continue
+            if rule.matches(ctx):
+                best = rule
+
+        for rule in self.rest:
+            if best is not None and rule.precedence >= best.precedence:
+                break
+            if rule.matches(ctx):
+                best = rule
+                break
+
+        return best
+
+    def decide(
+        self,
+        restaurant_name: str,
+        comment: str,
+        image_yes_no: str,
+        tags: str,
+    ) -> Tuple[str, str, List[str]]:
+        """
+        Same signature and return value as rules.decision_rules.
+        """
+        _ = tags  # intentionally ignored
+        ctx = RuleContext(restaurant_name, comment, image_yes_no)
+        return self.match(ctx).outcome(ctx)
+
+    def decide_batch(self, rows: Sequence[Tuple[str, str, str, str]]) -> List[Tuple[str, str, List[str]]]:
+        """
+        decide() for many (restaurant_name, comment, image_yes_no, tags) rows.
+        Language ID runs once for the whole batch instead of once per comment.
+        """
+        from language_id import get_identifier
+
+        texts = [(r[1] or "").strip() for r in rows]
+        langs, margins = get_identifier().identify_batch(texts)
+
+        out = []
+        for (name, comment, image, _), code, margin in zip(rows, langs, margins):
+            ctx = RuleContext(name, comment, image, lang=(code, float(margin)))
+            out.append(self.match(ctx).outcome(ctx))
+        return out
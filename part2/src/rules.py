@@ -1,15 +1,36 @@
 # part2/src/rules.py
+import gzip
+import hashlib
+import json
+import os
 import re
-from typing import List, Tuple
+import threading
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
 
 LABEL_KEEP = "Keep"
 LABEL_REMOVE = "Remove"
 LABEL_NEEDS_INFO = "Needs more information"
 LABEL_NEEDS_EDIT = "Recommendation needs editing"
 
+# Bump when decision logic changes in a way the lexicons/thresholds below don't
+# capture; it is part of rules_fingerprint() (used by the relabeling cache).
+RULES_VERSION = 1
+
 MIN_CHARS = 42  # WoM app minimum
 MAX_EMOJIS = 2
 
+# Length cutoffs used by the softer quality rules
+SHORT_HYPE_CHARS = 60
+LOW_SPECIFICITY_CHARS = 120
+
+# Marketing / AI copy: long, impersonal, phrase-heavy
+MARKETING_MIN_CHARS = 140
+MARKETING_MIN_HITS = 2
+
 # Hard threshold: if emoji spam + hype template/format spam -> remove
 HARD_EMOJI_REMOVE = 3
 
@@ -41,11 +62,85 @@ AI_HYPE_PHRASES = [
 
 
 # --- spelling / typo detection (lightweight) ---
-try:
+# The pyspellchecker dictionary is big, so it is loaded on first use instead of
+# at import time. Word lookups are cached across comments.
+SPELL_CACHE_SIZE = 50_000
+
+# Optional: path to a compact known-word file (see dump_known_words) that is
+# loaded instead of pyspellchecker, for fast worker startup.
+KNOWN_WORDS_ENV = "SPELL_KNOWN_WORDS"
+
+_SPELL = None
+_SPELL_LOADED = False  # set only once loading has finished, under _SPELL_LOCK
+_SPELL_LOCK = threading.Lock()  # label_service handles requests on several threads
+_KNOWN_WORDS: Optional[frozenset] = None
+_KNOWN_WORDS_PATH: Optional[Path] = None  # file _KNOWN_WORDS came from, for rules_fingerprint()
+_LONGEST_KNOWN = 0
+
+
+def _get_spell():
+    global _SPELL, _SPELL_LOADED
+    if _SPELL_LOADED:
+        return _SPELL
+    with _SPELL_LOCK:
+        if not _SPELL_LOADED:
+            preload = os.getenv(KNOWN_WORDS_ENV)
+            if _KNOWN_WORDS is None and preload and Path(preload).exists():
+                load_known_words(preload)
+            if _KNOWN_WORDS is None:
+                try:
+                    from spellchecker import SpellChecker
+                    _SPELL = SpellChecker(language="en")
+                except Exception:
+                    _SPELL = None
+            _SPELL_LOADED = True
+    return _SPELL
+
+
+def spellcheck_available() -> bool:
+    _get_spell()
+    return _KNOWN_WORDS is not None or _SPELL is not None
+
+
+def load_known_words(path) -> int:
+    """
+    Load a gzip'd, newline-separated known-word list (written by dump_known_words)
+    and use it instead of pyspellchecker. Returns the number of words loaded.
+    """
+    global _KNOWN_WORDS, _KNOWN_WORDS_PATH, _LONGEST_KNOWN
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        words = frozenset(f.read().split("\n")) - {""}
+    _KNOWN_WORDS = words
+    _KNOWN_WORDS_PATH = Path(path)
+    _LONGEST_KNOWN = max((len(w) for w in words), default=0)
+    _is_unknown_word.cache_clear()
+    return len(words)
+
+
+def dump_known_words(path) -> int:
+    """
+    Write the pyspellchecker English dictionary as a compact known-word list.
+    Returns the number of words written.
+    """
     from spellchecker import SpellChecker
-    _SPELL = SpellChecker(language="en")
-except Exception:
-    _SPELL = None
+
+    words = sorted(SpellChecker(language="en").word_frequency.dictionary.keys())
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(words))
+    return len(words)
+
+
+@lru_cache(maxsize=SPELL_CACHE_SIZE)
+def _is_unknown_word(word: str) -> bool:
+    if _KNOWN_WORDS is not None:
+        # same length cutoff pyspellchecker applies before checking a word
+        if len(word) > _LONGEST_KNOWN + 3:
+            return False
+        return word not in _KNOWN_WORDS
+    spell = _get_spell()
+    if spell is None:
+        return False
+    return bool(spell.unknown([word]))
 
 
 def norm(s: str) -> str:
@@ -108,7 +203,7 @@ def has_spelling_issues(text: str) -> bool:
     if has_obvious_typos(text):
         return True
 
-    if _SPELL is None:
+    if not spellcheck_available():
         return False
 
     tokens = re.findall(r"[A-Za-z']+", text)
@@ -135,7 +230,7 @@ def has_spelling_issues(text: str) -> bool:
     if len(cleaned) < 8:
         return False
 
-    misspelled = _SPELL.unknown(cleaned)
+    misspelled = {w for w in set(cleaned) if _is_unknown_word(w)}
     return len(misspelled) >= 2
 
 
@@ -177,17 +272,46 @@ ENGLISH_MARKERS = [
 ]
 
 
-def is_non_english(comment: str) -> bool:
+# Language guardrail (language_id.py): comments confidently identified as
+# another language are removed too, not only Finnish caught by the markers.
+LANGID_ALLOWED = ["en"]
+LANGID_MIN_LETTERS = 20  # too little text to call the language reliably
+LANGID_MIN_MARGIN = 0.3  # mean log-prob margin over the runner-up language
+
+
+def detect_language(comment: str) -> Tuple[str, float]:
+    """
+    (language code, margin) from the character n-gram identifier.
+    """
+    from language_id import get_identifier  # numpy + model table, loaded on first use
+
+    return get_identifier().identify(comment)
+
+
+def is_foreign_language(comment: str, lang: Optional[Tuple[str, float]] = None) -> bool:
+    """
+    True if the identifier confidently says the comment isn't in LANGID_ALLOWED.
+    `lang` can be passed in when it was already computed for a whole batch.
+    """
+    if sum(ch.isalpha() for ch in comment or "") < LANGID_MIN_LETTERS:
+        return False
+    code, margin = lang if lang is not None else detect_language(comment)
+    return bool(code) and code not in LANGID_ALLOWED and margin >= LANGID_MIN_MARGIN
+
+
+def is_non_english(comment: str, lang: Optional[Tuple[str, float]] = None) -> bool:
     """
-    Lightweight language check without external libraries.
-    Flags if Finnish markers strongly outweigh English markers.
+    Flags if Finnish markers strongly outweigh English markers, or if the
+    language identifier is confident the comment is in another language.
     """
     t = norm(comment)
     if not t:
         return False
 
-    fin_hits = sum(1 for w in FINISH_MARKERS if re.search(rf"\b{re.escape(w)}\b", t))
-    eng_hits = sum(1 for w in ENGLISH_MARKERS if re.search(rf"\b{re.escape(w)}\b", t))
+    # whole-word marker hits (same as matching \bword\b for each marker)
+    words = set(re.findall(r"\w+", t))
+    fin_hits = len(words.intersection(FINISH_MARKERS))
+    eng_hits = len(words.intersection(ENGLISH_MARKERS))
 
     if fin_hits >= 3 and fin_hits >= eng_hits + 2:
         return True
@@ -195,7 +319,7 @@ def is_non_english(comment: str) -> bool:
     if sum(t.count(ch) for ch in ["ä", "ö", "å"]) >= 3 and eng_hits == 0:
         return True
 
-    return False
+    return is_foreign_language(comment, lang)
 
 
 MARKETING_WORDS = [
@@ -207,14 +331,24 @@ MARKETING_WORDS = [
 FIRST_PERSON = [" i ", " i'", " i'm", " my ", " we ", " our ", " us "]
 
 
+DISH_WORDS = [
+    "pizza", "pasta", "ramen", "sushi", "tartar", "herring", "steak",
+    "pancake", "dessert", "coffee", "wine", "beer", "cocktail", "cheese",
+    "bread", "dumpling", "noodle", "schnapps", "vorschmack",
+]
+
+
 def has_concrete_food(comment: str) -> bool:
     t = norm(comment)
-    dish_words = [
-        "pizza", "pasta", "ramen", "sushi", "tartar", "herring", "steak",
-        "pancake", "dessert", "coffee", "wine", "beer", "cocktail", "cheese",
-        "bread", "dumpling", "noodle", "schnapps", "vorschmack",
-    ]
-    return any(re.search(rf"\b{re.escape(w)}\b", t) for w in dish_words)
+    return any(re.search(rf"\b{re.escape(w)}\b", t) for w in DISH_WORDS)
+
+
+def has_first_person(tn: str) -> bool:
+    return any(fp in f" {tn} " for fp in FIRST_PERSON)
+
+
+def count_marketing_phrases(tn: str) -> int:
+    return sum(1 for w in MARKETING_WORDS if w in tn)
 
 
 def is_marketing_or_ai_copy(comment: str) -> bool:
@@ -226,10 +360,15 @@ def is_marketing_or_ai_copy(comment: str) -> bool:
     if not tn:
         return False
 
-    first_person = any(fp in f" {tn} " for fp in FIRST_PERSON)
-    marketing_hits = sum(1 for w in MARKETING_WORDS if w in tn)
+    first_person = has_first_person(tn)
+    marketing_hits = count_marketing_phrases(tn)
 
-    if len(tn) >= 140 and (not first_person) and marketing_hits >= 2 and (not has_concrete_food(tn)):
+    if (
+        len(tn) >= MARKETING_MIN_CHARS
+        and (not first_person)
+        and marketing_hits >= MARKETING_MIN_HITS
+        and (not has_concrete_food(tn))
+    ):
         return True
 
     return False
@@ -270,46 +409,52 @@ def uses_dashy_style(text: str) -> bool:
     return bullet_dashes >= 2 or inline_dashes >= 3
 
 
+GENERIC_PHRASES = [
+    "great place", "really good", "so good", "nice place", "love it",
+    "highly recommend", "amazing", "awesome", "pretty good", "must try",
+]
+
+
 def is_generic_comment(text: str) -> bool:
     tn = norm(text)
-    generic_phrases = [
-        "great place", "really good", "so good", "nice place", "love it",
-        "highly recommend", "amazing", "awesome", "pretty good", "must try",
-    ]
-    if len(tn) < MIN_CHARS and any(p in tn for p in generic_phrases):
+    if len(tn) < MIN_CHARS and any(p in tn for p in GENERIC_PHRASES):
         return True
     return False
 
 
+HYPE_WORDS = [
+    "best", "incredible", "perfect", "unreal", "life changing",
+    "insane", "mind blowing", "never had better", "10/10"
+]
+
+
 def overly_positive_hype(text: str) -> bool:
     tn = norm(text)
-    hype_words = [
-        "best", "incredible", "perfect", "unreal", "life changing",
-        "insane", "mind blowing", "never had better", "10/10"
-    ]
     exclamations = text.count("!")
-    hype_hits = sum(1 for w in hype_words if w in tn)
+    hype_hits = sum(1 for w in HYPE_WORDS if w in tn)
     return (hype_hits >= 2) or (exclamations >= 3)
 
 
+STRONG_NEGATIVE = [
+    "avoid", "don't go", "do not go", "never again", "waste of money",
+    "terrible", "awful", "horrible", "worst", "disgusting", "bad service",
+    "overpriced and bad", "not worth", "would not recommend"
+]
+
+POSITIVE_MARKERS = [
+    "recommend", "worth", "love", "great", "amazing", "must", "try",
+    "good", "favorite", "solid"
+]
+
+
 def is_negative_recommendation(text: str) -> bool:
     """
     WoM guideline: negative recommendations get deleted.
     """
     tn = norm(text)
 
-    strong_negative = [
-        "avoid", "don't go", "do not go", "never again", "waste of money",
-        "terrible", "awful", "horrible", "worst", "disgusting", "bad service",
-        "overpriced and bad", "not worth", "would not recommend"
-    ]
-    positive_markers = [
-        "recommend", "worth", "love", "great", "amazing", "must", "try",
-        "good", "favorite", "solid"
-    ]
-
-    has_strong_neg = any(p in tn for p in strong_negative)
-    has_pos = any(p in tn for p in positive_markers)
+    has_strong_neg = any(p in tn for p in STRONG_NEGATIVE)
+    has_pos = any(p in tn for p in POSITIVE_MARKERS)
 
     if "avoid" in tn or "don't go" in tn or "do not go" in tn or "would not recommend" in tn:
         return True
@@ -327,16 +472,18 @@ def looks_like_needs_edit(text: str) -> bool:
     return False
 
 
+SPECIFIC_SIGNALS = [
+    "dish", "menu", "wine", "beer", "cocktail", "tasting", "chef",
+    "atmosphere", "service", "interior", "music", "book", "walk in",
+    "order", "try",
+    "ramen", "pizza", "pasta", "tartar", "herring", "schnapps",
+    "steak", "dessert", "cheese", "bread", "coffee",
+]
+
+
 def has_specifics(text: str) -> bool:
     tn = norm(text)
-    signals = [
-        "dish", "menu", "wine", "beer", "cocktail", "tasting", "chef",
-        "atmosphere", "service", "interior", "music", "book", "walk in",
-        "order", "try",
-        "ramen", "pizza", "pasta", "tartar", "herring", "schnapps",
-        "steak", "dessert", "cheese", "bread", "coffee",
-    ]
-    return any(s in tn for s in signals)
+    return any(s in tn for s in SPECIFIC_SIGNALS)
 
 
 def is_ai_hype_template(text: str) -> bool:
@@ -345,6 +492,125 @@ def is_ai_hype_template(text: str) -> bool:
     return hits >= 3
 
 
+# --- rules fingerprint ---
+
+# Module settings that don't change labels and so stay out of the fingerprint.
+_FINGERPRINT_SKIP = {"SPELL_CACHE_SIZE", "KNOWN_WORDS_ENV", "PROFILED_CHECKS"}
+
+
+def _file_digest(path: Optional[Path]) -> str:
+    if path is None or not Path(path).exists():
+        return ""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def rules_fingerprint() -> str:
+    """
+    Stable hash of RULES_VERSION plus every rule lexicon and threshold
+    (module-level UPPER_CASE constants), the language-ID model and the
+    known-word list (if one is used). Changes whenever a rule input changes.
+    """
+    from language_id import LANGID_MODEL
+
+    parts = {}
+    for k, v in sorted(globals().items()):
+        if k.startswith("_") or not k.isupper() or k in _FINGERPRINT_SKIP:
+            continue
+        if isinstance(v, (set, frozenset)):
+            v = sorted(v)
+        if isinstance(v, (str, int, float, list, tuple)):
+            parts[k] = v
+    # model files decide labels too: rebuilding either must invalidate cached labels
+    parts["_langid_model"] = _file_digest(LANGID_MODEL)
+    known_words = _KNOWN_WORDS_PATH or (Path(os.environ[KNOWN_WORDS_ENV]) if os.getenv(KNOWN_WORDS_ENV) else None)
+    parts["_known_words"] = _file_digest(known_words)
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+# --- optional rule profiling ---
+# When enabled, the rule checks below are swapped for timed wrappers in this
+# module's namespace. When disabled, the original functions are restored, so
+# there is no overhead at all. Times are inclusive (a check that calls another
+# check, e.g. has_spelling_issues -> has_obvious_typos, includes its time).
+
+PROFILED_CHECKS = [
+    "is_chain_or_franchise",
+    "is_hotel",
+    "is_non_english",
+    "is_foreign_language",
+    "is_marketing_or_ai_copy",
+    "has_first_person",
+    "count_marketing_phrases",
+    "has_concrete_food",
+    "is_negative_recommendation",
+    "count_emojis",
+    "uses_dashy_style",
+    "is_ai_hype_template",
+    "overly_positive_hype",
+    "is_generic_comment",
+    "has_specifics",
+    "looks_like_needs_edit",
+    "has_spelling_issues",
+    "has_obvious_typos",
+]
+
+
+@dataclass
+class RuleStat:
+    name: str
+    calls: int = 0
+    fired: int = 0  # calls with a truthy result (for count_emojis: any emoji)
+    seconds: float = 0.0
+
+
+_RULE_STATS: Dict[str, RuleStat] = {}
+_ORIGINAL_CHECKS: Dict[str, Callable] = {}
+
+
+def _profiled(fn: Callable, stat: RuleStat) -> Callable:
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = perf_counter()
+        result = fn(*args, **kwargs)
+        stat.seconds += perf_counter() - t0
+        stat.calls += 1
+        if result:
+            stat.fired += 1
+        return result
+
+    return wrapper
+
+
+def enable_rule_profiling() -> None:
+    """
+    Start recording calls / fires / cumulative time per rule check.
+    Resets previously recorded stats.
+    """
+    g = globals()
+    if not _ORIGINAL_CHECKS:
+        for name in PROFILED_CHECKS:
+            _ORIGINAL_CHECKS[name] = g[name]
+    _RULE_STATS.clear()
+    for name in PROFILED_CHECKS:
+        _RULE_STATS[name] = RuleStat(name=name)
+        g[name] = _profiled(_ORIGINAL_CHECKS[name], _RULE_STATS[name])
+
+
+def disable_rule_profiling() -> None:
+    g = globals()
+    for name, fn in _ORIGINAL_CHECKS.items():
+        g[name] = fn
+    _ORIGINAL_CHECKS.clear()
+
+
+def rule_stats() -> List[RuleStat]:
+    """
+    Recorded stats, most expensive check first.
+    """
+    return sorted(_RULE_STATS.values(), key=lambda st: st.seconds, reverse=True)
+
+
 # --- main decision function ---
 
 def decision_rules(
@@ -434,13 +700,13 @@ def decision_rules(
     # Overly positive hype without specifics (softer case)
     if overly_positive_hype(text) and not has_specifics(text):
         reasons.append("overly_positive_without_specifics")
-        if len(tn) < 60:
+        if len(tn) < SHORT_HYPE_CHARS:
             reasons.append("short_hype")
             return (LABEL_REMOVE, "high", reasons)
         return (LABEL_NEEDS_INFO, "medium", reasons)
 
     # No image raises the bar
-    if img == "no" and len(tn) < 60 and not has_specifics(text):
+    if img == "no" and len(tn) < SHORT_HYPE_CHARS and not has_specifics(text):
         reasons.append("no_image_weak_text")
         return (LABEL_NEEDS_INFO, "medium", reasons)
 
@@ -450,7 +716,7 @@ def decision_rules(
         return (LABEL_NEEDS_EDIT, "medium", reasons)
 
     # Medium length but low specificity
-    if len(tn) < 120 and not has_specifics(text):
+    if len(tn) < LOW_SPECIFICITY_CHARS and not has_specifics(text):
         reasons.append("low_specificity")
         return (LABEL_NEEDS_INFO, "medium", reasons)
 
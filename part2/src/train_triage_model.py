@@ -0,0 +1,167 @@
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from rule_pipeline import DEFAULT_RULES_CONFIG, RulePipeline
+from review_queue import DEFAULT_DB
+from triage_model import GUARD_LABELS, MIN_PROB, TRIAGE_MODEL, TriagePipeline, is_model_label, train
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "bench"))  # seeded synthetic comments (bench/synth.py)
+
+LABELED_CSV = ROOT / "part2" / "output" / "recommendations_labeled.csv"
+THRESHOLDS = (0.8, 0.9, 0.95, 0.99)
+TIMING_REPEATS = 3
+ADVERSARIAL_ROWS = 5000
+
+Row = Tuple[str, str, str, str]
+
+
+def past_labels() -> Tuple[List[Row], List[str]]:
+    """
+    Rows and labels from earlier runs: the labeled CSV and the review queue, if
+    present. Rows the triage model labeled itself (--triage runs) are left out,
+    so the model never trains on its own output.
+    """
+    rows: List[Row] = []
+    labels: List[str] = []
+    if LABELED_CSV.exists():
+        df = pd.read_csv(LABELED_CSV).fillna("")
+        for _, r in df.iterrows():
+            if is_model_label(str(r.get("Reason codes", ""))):
+                continue
+            rows.append((str(r["Restaurant → Name"]), str(r["Comment"]), str(r["Image yes/no"]), str(r["Tags"])))
+            labels.append(str(r["Predicted decision"]))
+    if DEFAULT_DB.exists():
+        conn = sqlite3.connect(str(DEFAULT_DB))
+        for name, comment, image, tags, label, reason_codes in conn.execute(
+            "SELECT restaurant, comment, image, tags, label, reason_codes FROM labels"
+        ):
+            if is_model_label(reason_codes):
+                continue
+            rows.append((name, comment, image, tags))
+            labels.append(label)
+        conn.close()
+    return rows, labels
+
+
+def adversarial_report(pipeline: RulePipeline, triage: TriagePipeline, n: int, seed: int) -> None:
+    """
+    Triage against the full rule table on bench/differential.py's adversarial
+    corpus (typos, emoji runs, dashes, Finnish, chain names, cut-off lengths).
+    These rows are out of the training templates, so this is the number to trust.
+    """
+    import differential
+
+    rows = differential.corpus(random.Random(seed), n, differential.load_blocklist(differential.DEFAULT_BLOCKLIST))
+    expected = pipeline.decide_batch(rows)
+    got = triage.decide_batch(rows)
+    model = [i for i, (_, _, reasons) in enumerate(got) if reasons and is_model_label(reasons[0])]
+    wrong = sum(got[i][0] != expected[i][0] for i in model)
+    guarded = sum(got[i][0] in GUARD_LABELS for i in model)
+    print(
+        f"Adversarial corpus ({n} rows, seed {seed}): model decided {len(model) / n:.1%} of rows | "
+        f"disagreed with the rules on {wrong} of them ({wrong / max(len(model), 1):.1%}) | "
+        f"model-only {'/'.join(GUARD_LABELS)} labels: {guarded}"
+    )
+
+
+def best_of(repeats: int, fn):
+    """
+    (result, fastest wall time) over `repeats` calls.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the hashed linear triage model.")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=20000,
+        help="extra seeded synthetic comments, labeled by the rule table (0 = past output only)",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--adversarial",
+        type=int,
+        default=ADVERSARIAL_ROWS,
+        help="rows of bench/differential.py's adversarial corpus to check triage on (0 = skip)",
+    )
+    parser.add_argument("--min-prob", type=float, default=MIN_PROB)
+    parser.add_argument("--rules-config", type=Path, default=DEFAULT_RULES_CONFIG)
+    parser.add_argument("--out", type=Path, default=TRIAGE_MODEL)
+    args = parser.parse_args()
+
+    pipeline = RulePipeline.from_file(args.rules_config)
+    rows, labels = past_labels()
+    print(f"Past labeled rows: {len(rows)}")
+    if args.synthetic:
+        import synth
+
+        extra = synth.comments(random.Random(args.seed), args.synthetic)
+        rows += extra
+        labels += [d[0] for d in pipeline.decide_batch(extra)]
+        print(f"Synthetic rows labeled by the rule table: {len(extra)}")
+    if len(rows) < 20:
+        raise ValueError("Not enough labeled rows to train on; label a sheet first or use --synthetic")
+
+    order = list(range(len(rows)))
+    random.Random(args.seed).shuffle(order)
+    cut = int(len(order) * 0.8)
+    train_idx, test_idx = order[:cut], order[cut:]
+
+    t0 = time.perf_counter()
+    scorer = train([rows[i] for i in train_idx], [labels[i] for i in train_idx])
+    print(f"Trained on {len(train_idx)} rows in {time.perf_counter() - t0:.1f}s")
+
+    test_rows = [rows[i] for i in test_idx]
+    test_labels = np.array([labels[i] for i in test_idx])
+    pred, prob = scorer.predict(test_rows)
+    pred = np.array(pred)
+    # the labels come from the rule table itself (synthetic rows) or from earlier
+    # rule output, so these numbers are agreement with the rules, not accuracy
+    print(f"Held-out rows: {len(test_rows)} | model-only agreement with rules: {(pred == test_labels).mean():.1%}")
+    for th in THRESHOLDS:
+        sure = prob >= th
+        agree = (pred[sure] == test_labels[sure]).mean() if sure.any() else 0.0
+        print(f"  prob >= {th:.2f}: {sure.mean():6.1%} of rows, agreement {agree:.1%}")
+
+    # end to end: triage vs the full rule table on the held-out rows
+    triage = TriagePipeline(pipeline, scorer, args.min_prob)
+    pipeline.decide_batch(test_rows)  # untimed pass so dictionary loading and caches don't skew either side
+    expected, t_full = best_of(TIMING_REPEATS, lambda: pipeline.decide_batch(test_rows))
+    got, t_triage = best_of(TIMING_REPEATS, lambda: triage.decide_batch(test_rows))
+
+    agreement = np.mean([e[0] == g[0] for e, g in zip(expected, got)])
+    print(
+        f"Triage (min prob {args.min_prob}): model decided {triage.model_decided / len(test_rows):.1%} of rows | "
+        f"label agreement with full rules {agreement:.1%} (in-template rows labeled by the rules, not accuracy)"
+    )
+    print(
+        f"Full rules: {t_full / len(test_rows) * 1e6:.0f} us/row | triage: {t_triage / len(test_rows) * 1e6:.0f} us/row "
+        f"| speedup {t_full / t_triage:.2f}x"
+    )
+
+    if args.adversarial:
+        adversarial_report(pipeline, triage, args.adversarial, args.seed)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    scorer.save(args.out)
+    print(f"✅ Wrote {args.out} ({args.out.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
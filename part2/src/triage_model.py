@@ -0,0 +1,224 @@
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rule_pipeline import RuleContext, RulePipeline
+from rules import LABEL_REMOVE
+
+# Hashed bag-of-words linear triage scorer.
+#
+# Each comment becomes hashed word unigram/bigram counts (plus image and length
+# tokens) in a fixed-size vector; a batch is one (n, BUCKETS) matrix, and the
+# label scores are a single matrix product with the (BUCKETS, n_labels) weight
+# table. The model is trained offline (train_triage_model.py) on past labeled
+# output. TriagePipeline uses it to skip the expensive tail of the rule table
+# (spellcheck, format/specificity checks) for comments it is confident about.
+# Every Remove rule still runs for every comment, and the model never removes
+# a comment on its own.
+
+TRIAGE_MODEL = Path(__file__).resolve().parents[1] / "output" / "triage_model.npz"
+
+BUCKETS = 4096
+MIN_PROB = 0.9  # model label is used only when its probability is at least this
+HIGH_PROB = 0.99  # model labels at or above this get "high" confidence, the rest "medium"
+SCORE_CHUNK = 2048  # rows per matrix product, bounds memory for big sheets
+MODEL_REASON = "triage_model({prob:.2f})"
+MODEL_REASON_CODE = "triage_model"
+WORD_CACHE_SIZE = 1 << 16
+
+# rules with these labels always run before the model's label is used, and the
+# model may not give these labels itself: removing a comment always needs a rule
+# behind it (some look at inputs the model doesn't see, like the restaurant name)
+GUARD_LABELS = (LABEL_REMOVE,)
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_BIGRAM_MULT = np.uint64(1_000_003)
+_B = np.uint64(BUCKETS)
+
+
+def is_model_label(reason_codes: str) -> bool:
+    """
+    True if a row's reason codes say the triage model labeled it, not the rules.
+    """
+    return f"{MODEL_REASON_CODE}(" in (reason_codes or "")
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def _word_hash(word: str) -> int:
+    return zlib.crc32(word.encode("utf-8"))
+
+
+def _word_hashes(comment: str) -> List[int]:
+    return list(map(_word_hash, _WORD_RE.findall((comment or "").lower())))
+
+
+def _meta_tokens(comment: str, image_yes_no: str) -> List[str]:
+    text = (comment or "").strip()
+    return [f"__img_{(image_yes_no or '').strip().lower()}", f"__len_{min(len(text) // 40, 12)}"]
+
+
+def featurize(rows: Sequence[Tuple[str, str, str, str]]) -> np.ndarray:
+    """
+    (n, BUCKETS) float32 matrix for (restaurant_name, comment, image_yes_no, tags)
+    rows: log1p hashed counts of word unigrams, word bigrams and meta tokens,
+    each row L2-normalized.
+    """
+    n = len(rows)
+    hashes: List[int] = []
+    lengths: List[int] = []
+    meta: List[int] = []
+    for _, comment, image, _ in rows:
+        h = _word_hashes(comment)
+        hashes.extend(h)
+        lengths.append(len(h))
+        meta.extend(zlib.crc32(t.encode("utf-8")) for t in _meta_tokens(comment, image))
+
+    h = np.array(hashes, dtype=np.uint64)
+    doc = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    same_doc = doc[:-1] == doc[1:]
+    bigrams = (h[:-1] * _BIGRAM_MULT + h[1:])[same_doc]  # hash of (w_i, w_i+1), no strings built
+
+    buckets = np.concatenate([h % _B, (bigrams >> np.uint64(7)) % _B, np.array(meta, dtype=np.uint64) % _B])
+    docs = np.concatenate([doc, doc[:-1][same_doc], np.repeat(np.arange(n, dtype=np.int64), 2)])
+
+    # weight and normalize the non-zero cells only, then scatter into the dense matrix
+    cells, counts = np.unique(docs * BUCKETS + buckets.astype(np.int64), return_counts=True)
+    values = np.log1p(counts).astype(np.float32)
+    row_of = cells // BUCKETS
+    norms = np.sqrt(np.bincount(row_of, weights=values * values, minlength=n))
+    values /= np.maximum(norms[row_of], 1e-6).astype(np.float32)
+
+    X = np.zeros(n * BUCKETS, dtype=np.float32)
+    X[cells] = values
+    return X.reshape(n, BUCKETS)
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class TriageScorer:
+    def __init__(self, labels: List[str], weights: np.ndarray, bias: np.ndarray):
+        self.labels = list(labels)
+        self.weights = weights.astype(np.float32)  # (BUCKETS, n_labels)
+        self.bias = bias.astype(np.float32)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "TriageScorer":
+        data = np.load(path or TRIAGE_MODEL)
+        return cls([str(x) for x in data["labels"]], data["weights"], data["bias"])
+
+    def save(self, path: Optional[Path] = None) -> None:
+        np.savez_compressed(
+            path or TRIAGE_MODEL,
+            labels=np.array(self.labels, dtype=str),
+            weights=self.weights,
+            bias=self.bias,
+        )
+
+    def proba(self, rows: Sequence[Tuple[str, str, str, str]]) -> np.ndarray:
+        """
+        (n, n_labels) label probabilities.
+        """
+        out = np.empty((len(rows), len(self.labels)), dtype=np.float32)
+        for start in range(0, len(rows), SCORE_CHUNK):
+            X = featurize(rows[start:start + SCORE_CHUNK])
+            out[start:start + len(X)] = _softmax(X @ self.weights + self.bias)
+        return out
+
+    def predict(self, rows: Sequence[Tuple[str, str, str, str]]) -> Tuple[List[str], np.ndarray]:
+        """
+        Best label per row and its probability.
+        """
+        p = self.proba(rows)
+        best = p.argmax(axis=1)
+        return [self.labels[b] for b in best], p[np.arange(len(rows)), best]
+
+
+def train(
+    rows: Sequence[Tuple[str, str, str, str]],
+    labels: Sequence[str],
+    epochs: int = 60,
+    lr: float = 4.0,
+    l2: float = 1e-5,
+    batch_size: int = 512,
+    seed: int = 1,
+) -> TriageScorer:
+    """
+    Multinomial logistic regression with minibatch gradient descent.
+    """
+    classes = sorted(set(labels))
+    y = np.array([classes.index(l) for l in labels])
+    W = np.zeros((BUCKETS, len(classes)), dtype=np.float32)
+    b = np.zeros(len(classes), dtype=np.float32)
+    X_all = featurize(rows)
+    Y_all = np.eye(len(classes), dtype=np.float32)[y]
+    rng = np.random.RandomState(seed)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(rows))
+        for start in range(0, len(rows), batch_size):
+            idx = order[start:start + batch_size]
+            X, Y = X_all[idx], Y_all[idx]
+            G = (_softmax(X @ W + b) - Y) / len(idx)
+            W -= lr * (X.T @ G + l2 * W)
+            b -= lr * G.sum(axis=0)
+    return TriageScorer(classes, W, b)
+
+
+class TriagePipeline:
+    """
+    Model first, rules where they matter:
+    - comments the model is unsure about (prob < min_prob) get the full rule table
+    - confident comments still run every rule labeled with one of GUARD_LABELS;
+      if one fires, or the model itself says Remove, the full rule table decides
+    - otherwise the model's label is used, with reason code triage_model(<prob>)
+      and "high" confidence only when prob >= HIGH_PROB
+    Language ID runs once for the whole batch, as in RulePipeline.decide_batch.
+    """
+
+    def __init__(self, pipeline: RulePipeline, scorer: TriageScorer, min_prob: float = MIN_PROB):
+        self.pipeline = pipeline
+        self.scorer = scorer
+        self.min_prob = min_prob
+        self.guards = [r for r in pipeline.rules if r.label in GUARD_LABELS]
+        self.fingerprint = f"{pipeline.fingerprint}-triage{min_prob:g}-{self._model_hash()}"
+        self.model_decided = 0  # rows labeled by the model in the last decide_batch
+
+    def _model_hash(self) -> str:
+        blob = self.scorer.weights.tobytes() + self.scorer.bias.tobytes()
+        blob += "|".join(self.scorer.labels + [g.name for g in self.guards] + [f"{HIGH_PROB:g}"]).encode()
+        return f"{zlib.crc32(blob):08x}"
+
+    @classmethod
+    def from_files(
+        cls, rules_config: Optional[Path] = None, model_path: Optional[Path] = None, min_prob: float = MIN_PROB
+    ) -> "TriagePipeline":
+        path = Path(model_path) if model_path else TRIAGE_MODEL
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found; run part2/src/train_triage_model.py first")
+        return cls(RulePipeline.from_file(rules_config), TriageScorer.load(path), min_prob)
+
+    def decide_batch(self, rows: Sequence[Tuple[str, str, str, str]]) -> List[Tuple[str, str, List[str]]]:
+        from language_id import get_identifier
+
+        rows = list(rows)
+        labels, probs = self.scorer.predict(rows)
+        langs, margins = get_identifier().identify_batch([(r[1] or "").strip() for r in rows])
+        out: List[Tuple[str, str, List[str]]] = []
+        self.model_decided = 0
+        for (name, comment, image, _), label, prob, code, margin in zip(rows, labels, probs, langs, margins):
+            ctx = RuleContext(name, comment, image, lang=(code, float(margin)))
+            if prob < self.min_prob or label in GUARD_LABELS or any(g.matches(ctx) for g in self.guards):
+                out.append(self.pipeline.match(ctx).outcome(ctx))  # reuses the features the guards computed
+                continue
+            confidence = "high" if prob >= HIGH_PROB else "medium"
+            out.append((label, confidence, [MODEL_REASON.format(prob=float(prob))]))
+            self.model_decided += 1
+        return out
@@ -0,0 +1,51 @@
+from pathlib import Path
+from typing import Iterable, List
+import re
+
+
+DEFAULT_BLOCKLIST = Path(__file__).resolve().parents[1] / "config" / "blocklist.txt"
+
+
+def norm(s: str) -> str:
+    s = (s or "").lower()
+    s = re.sub(r"[^\w\s]", " ", s)  # remove punctuation
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def is_blocked(venue_name: str, blocked_list: list[str]) -> bool:
+    v = norm(venue_name)
+    for b in blocked_list:
+        bn = norm(b)
+        if not bn:
+            continue
+        if v == bn or v.startswith(bn + " ") or v.startswith(bn):
+            return True
+    return False
+
+
+class BlocklistMatcher:
+    """
+    is_blocked() with the blocklist normalized once up front. A name is blocked
+    when its normalized form starts with a normalized entry, so each call is one
+    set lookup per distinct entry length instead of a scan of the whole list.
+    """
+
+    def __init__(self, blocked_list: Iterable[str]):
+        self.entries = {bn for bn in map(norm, blocked_list) if bn}
+        self.lengths = sorted({len(bn) for bn in self.entries})
+
+    def __call__(self, venue_name: str) -> bool:
+        v = norm(venue_name)
+        for n in self.lengths:
+            if n > len(v):
+                break
+            if v[:n] in self.entries:
+                return True
+        return False
+
+
+def load_blocklist(path: Path = DEFAULT_BLOCKLIST) -> List[str]:
+    if not path.exists():
+        return []
+    return [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
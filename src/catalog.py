@@ -0,0 +1,226 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import csv
+import hashlib
+import os
+import re
+import time
+
+
+# In-memory catalog over the discovery output and the labeled recommendations.
+#
+# Every record gets an integer id; each index maps a value (tag, city, label,
+# source) to a bitmap of ids held in a Python int. A combined filter is a few
+# big-int ANDs, so queries stay well under a millisecond for tens of
+# thousands of records. refresh() only re-reads files that changed and only
+# adds/retires the rows that differ.
+
+SOURCE_DISCOVERY = "discovery"
+SOURCE_RECOMMENDATION = "recommendation"
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SOURCES = {
+    SOURCE_DISCOVERY: ROOT / "data" / "helsinki_new_openings.csv",
+    SOURCE_RECOMMENDATION: ROOT / "part2" / "output" / "recommendations_labeled.csv",
+}
+
+
+@dataclass
+class CatalogRecord:
+    source: str
+    name: str
+    address: str = ""
+    city: str = ""
+    tags: List[str] = field(default_factory=list)
+    label: str = ""
+    confidence: str = ""
+    row: Dict[str, str] = field(default_factory=dict)
+
+
+def _key(value: str) -> str:
+    return (value or "").strip().lower()
+
+
+def parse_city(address: str) -> str:
+    # Finnish addresses: "Street 1, 00100 Helsinki, Finland"
+    m = re.search(r"\b\d{5}\s+([^\W\d_][\w\- ]*?)(?:,|$)", address or "")
+    return m.group(1).strip() if m else ""
+
+
+def parse_tags(raw: str) -> List[str]:
+    """
+    Tags as written by main.py ("a, b") or by the recommendations sheet ('{a,"b c"}').
+    """
+    raw = (raw or "").strip()
+    if not raw or raw.lower() == "nan":
+        return []
+    if raw.startswith("{") and raw.endswith("}"):
+        return [t.strip().strip('"') for t in next(csv.reader([raw[1:-1]])) if t.strip().strip('"')]
+    return [t.strip() for t in raw.split(",") if t.strip()]
+
+
+def _bitmap_ids(bitmap: int) -> List[int]:
+    # bit positions via the binary string (str.find runs in C); much faster than
+    # peeling bits off a big int one by one
+    bits = bin(bitmap)[:1:-1]  # least significant bit first
+    out = []
+    i = bits.find("1")
+    while i != -1:
+        out.append(i)
+        i = bits.find("1", i + 1)
+    return out
+
+
+def _row_hash(source: str, row: Dict[str, str]) -> str:
+    blob = "\x1f".join([source] + [f"{k}={row.get(k, '')}" for k in sorted(row)])
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _record_from_row(source: str, row: Dict[str, str]) -> CatalogRecord:
+    if source == SOURCE_DISCOVERY:
+        address = row.get("full_address", "")
+        return CatalogRecord(
+            source=source,
+            name=row.get("name", ""),
+            address=address,
+            city=parse_city(address),
+            tags=parse_tags(row.get("tags", "")),
+            row=row,
+        )
+    return CatalogRecord(
+        source=source,
+        name=row.get("Restaurant → Name", ""),
+        tags=parse_tags(row.get("Tags", "")),
+        label=row.get("Predicted decision", ""),
+        confidence=row.get("Confidence", ""),
+        row=row,
+    )
+
+
+class Catalog:
+    def __init__(self, sources: Optional[Dict[str, Path]] = None):
+        self.sources = dict(sources or DEFAULT_SOURCES)
+        self.records: List[CatalogRecord] = []
+        self.alive = 0  # bitmap of current (not retired) record ids
+        self.by_tag: Dict[str, int] = {}
+        self.by_city: Dict[str, int] = {}
+        self.by_label: Dict[str, int] = {}
+        self.by_source: Dict[str, int] = {}
+        self._ids_by_hash: Dict[str, int] = {}
+        self._file_state: Dict[str, Tuple[float, int]] = {}
+
+    def __len__(self) -> int:
+        return bin(self.alive).count("1")
+
+    def _add(self, rec: CatalogRecord, row_hash: str) -> None:
+        rid = len(self.records)
+        bit = 1 << rid
+        self.records.append(rec)
+        self._ids_by_hash[row_hash] = rid
+        self.alive |= bit
+        self.by_source[rec.source] = self.by_source.get(rec.source, 0) | bit
+        for t in rec.tags:
+            self.by_tag[_key(t)] = self.by_tag.get(_key(t), 0) | bit
+        if rec.city:
+            self.by_city[_key(rec.city)] = self.by_city.get(_key(rec.city), 0) | bit
+        if rec.label:
+            self.by_label[_key(rec.label)] = self.by_label.get(_key(rec.label), 0) | bit
+
+    def load_rows(self, source: str, rows: Iterable[Dict[str, str]]) -> Tuple[int, int]:
+        """
+        Sync one source to `rows`: add rows not seen before and retire rows that
+        are gone. Unchanged rows keep their ids. Returns (added, retired).
+        """
+        seen = set()
+        added = 0
+        for row in rows:
+            h = _row_hash(source, row)
+            seen.add(h)
+            if h not in self._ids_by_hash:
+                self._add(_record_from_row(source, row), h)
+                added += 1
+
+        retired = 0
+        source_bits = self.by_source.get(source, 0)
+        for h, rid in list(self._ids_by_hash.items()):
+            if h in seen or not (source_bits >> rid) & 1:
+                continue
+            self.alive &= ~(1 << rid)
+            del self._ids_by_hash[h]
+            retired += 1
+        return added, retired
+
+    def refresh(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Re-read source files whose mtime/size changed since the last refresh.
+        """
+        changes = {}
+        for source, path in self.sources.items():
+            if not Path(path).exists():
+                continue
+            st = os.stat(path)
+            state = (st.st_mtime, st.st_size)
+            if self._file_state.get(source) == state:
+                continue
+            with open(path, newline="", encoding="utf-8") as f:
+                changes[source] = self.load_rows(source, csv.DictReader(f))
+            self._file_state[source] = state
+        return changes
+
+    def match_bitmap(
+        self,
+        tags: Iterable[str] = (),
+        city: Optional[str] = None,
+        label: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> int:
+        """
+        Bitmap of live records matching every given filter (all tags must be present).
+        """
+        bitmap = self.alive
+        for t in tags:
+            bitmap &= self.by_tag.get(_key(t), 0)
+        if city:
+            bitmap &= self.by_city.get(_key(city), 0)
+        if label:
+            bitmap &= self.by_label.get(_key(label), 0)
+        if source:
+            bitmap &= self.by_source.get(source, 0)
+        return bitmap
+
+    def query_ids(self, **filters) -> List[int]:
+        return _bitmap_ids(self.match_bitmap(**filters))
+
+    def count(self, **filters) -> int:
+        return bin(self.match_bitmap(**filters)).count("1")
+
+    def query(self, **filters) -> List[CatalogRecord]:
+        return [self.records[i] for i in self.query_ids(**filters)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query discovered venues and labeled recommendations.")
+    parser.add_argument("--tag", action="append", default=[], help="required tag (repeatable)")
+    parser.add_argument("--city")
+    parser.add_argument("--label", help='e.g. "Keep"')
+    parser.add_argument("--source", choices=[SOURCE_DISCOVERY, SOURCE_RECOMMENDATION])
+    args = parser.parse_args()
+
+    catalog = Catalog()
+    catalog.refresh()
+    print(f"Catalog: {len(catalog)} records")
+
+    t0 = time.perf_counter()
+    hits = catalog.query(tags=args.tag, city=args.city, label=args.label, source=args.source)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    for r in hits:
+        extra = f" | {r.label} ({r.confidence})" if r.label else f" | {r.address}"
+        print(f"- [{r.source}] {r.name}{extra} | {', '.join(r.tags)}")
+    print(f"{len(hits)} matches in {elapsed_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
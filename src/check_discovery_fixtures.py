@@ -0,0 +1,90 @@
+import sys
+import time
+from pathlib import Path
+
+from wolt_scrape import (
+    WOLT_LISTING_URL,
+    PAGE_PARAM,
+    iter_listing_venues,
+    page_url,
+    parse_listing_page,
+    parse_newest_venues_html,
+)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "wolt"
+
+
+def fixture_fetcher(pages: dict):
+    """
+    fetch() stand-in that serves fixture files by URL and records what was requested.
+    """
+    requested = []
+
+    def fetch(url: str) -> str:
+        requested.append(url)
+        if url not in pages:
+            raise KeyError(f"no fixture for {url}")
+        return pages[url].read_text(encoding="utf-8")
+
+    return fetch, requested
+
+
+def main():
+    failures = []
+
+    def check(ok: bool, what: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    pages = {WOLT_LISTING_URL: FIXTURES / "newest_venues_p1.html"}
+    for p in (2, 3):
+        pages[page_url(WOLT_LISTING_URL, p)] = FIXTURES / f"newest_venues_p{p}.html"
+
+    # HTML backend only ever sees the first server-rendered page
+    html_p1 = pages[WOLT_LISTING_URL].read_text(encoding="utf-8")
+    html_venues = parse_newest_venues_html(html_p1)
+    check(len(html_venues) == 5, f"html backend: 5 venues on page 1 (got {len(html_venues)})")
+
+    # JSON backend: all pages, de-duplicated, with ids and metadata
+    fetch, requested = fixture_fetcher(pages)
+    venues = list(iter_listing_venues(fetch=fetch))
+    check(len(requested) == 3, f"json backend: fetched 3 pages via ?{PAGE_PARAM}=N (got {len(requested)})")
+    check(len(venues) == 12, f"json backend: 12 unique venues across pages (got {len(venues)})")
+    check(len({v.venue_id for v in venues}) == len(venues), "json backend: venue ids are unique")
+    check(all(v.venue_id and v.address and v.tags for v in venues), "json backend: every venue has id, address, tags")
+    check(
+        [v.url for v in venues[:5]] == [v.url for v in html_venues],
+        "json backend: page-1 URLs match the html backend",
+    )
+    check(not any(v.slug in ("pizza", "asian") for v in venues), "json backend: category items are not venues")
+
+    fetch, requested = fixture_fetcher(pages)
+    limited = list(iter_listing_venues(fetch=fetch, limit=3))
+    check(len(limited) == 3 and len(requested) == 1, "json backend: limit within page 1 fetches only page 1")
+
+    api_venues, total = parse_listing_page((FIXTURES / "listing_api.json").read_text(encoding="utf-8"))
+    check(
+        [v.name for v in api_venues] == ["Cafe Alppila", "Lauttasaaren Grilli"] and total is None,
+        "json endpoint: localized names resolved, no pagination",
+    )
+
+    # parse speed, page 1 fixture
+    n = 200
+    t0 = time.perf_counter()
+    for _ in range(n):
+        parse_newest_venues_html(html_p1)
+    t_soup = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    for _ in range(n):
+        parse_listing_page(html_p1)
+    t_json = (time.perf_counter() - t0) / n
+    print(f"Parse page 1: html/soup {t_soup * 1e6:.0f} us | embedded json {t_json * 1e6:.0f} us")
+
+    if failures:
+        sys.exit(1)
+    print("✅ Discovery backends behave as expected on the fixtures")
+
+
+if __name__ == "__main__":
+    main()
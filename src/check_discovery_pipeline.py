@@ -0,0 +1,187 @@
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from check_discovery_fixtures import FIXTURES, fixture_fetcher
+from discovery_pipeline import run_pipeline
+from main import MAX_REVIEWS, final_rows, run_sequential
+from places_enrich import PlacesResult, tags_to_mask
+from wolt_scrape import WOLT_LISTING_URL, WoltVenue, iter_listing_venues, page_url
+from wolt_venue_page import VenueDetails
+
+# Runs the async discovery pipeline against the Wolt fixtures with stand-ins for
+# the network calls (fixed sleeps instead of HTTP), and checks it against
+# main.run_sequential() on the same input. Also checks that a failing stage
+# stops the run and raises instead of hanging.
+
+LISTING_DELAY = 0.03  # per listing page / per synthetic venue batch
+PLACES_DELAY = 0.02
+PAGE_DELAY = 0.02
+FAILURE_TIMEOUT_S = 3.0  # a failed run must be back well before the listing would have finished
+
+
+def fake_enrich(name: str) -> Optional[PlacesResult]:
+    """
+    Deterministic Places stand-in: some venues unmatched, some without an
+    address, some over the review cap.
+    """
+    time.sleep(PLACES_DELAY)
+    h = zlib.crc32(name.encode("utf-8")) % 20
+    if h < 2:
+        return None
+    return PlacesResult(
+        name=name,
+        formatted_address="" if h < 5 else f"{name} street {h}, Helsinki",
+        description="",
+        tag_mask=tags_to_mask(["New opening"]),
+        user_ratings_total=MAX_REVIEWS + 1 if h >= 17 else h,
+        lat=60.17 + h / 1000,
+        lng=24.94 + h / 1000,
+    )
+
+
+def fake_details(url: str) -> Optional[VenueDetails]:
+    time.sleep(PAGE_DELAY)
+    return VenueDetails(address=f"{url.rsplit('/', 1)[-1]} 1, Helsinki", description="")
+
+
+def failing_enrich(name: str) -> Optional[PlacesResult]:
+    if name == "Venue 19":
+        raise RuntimeError("Places quota exceeded")
+    return fake_enrich(name)
+
+
+def is_blocked_name(name: str) -> bool:
+    return name.lower().startswith(("hesburger", "rax"))
+
+
+def slow_listing(n: int, per_batch: int = 10, delay: float = LISTING_DELAY):
+    for i in range(n):
+        if i % per_batch == 0:
+            time.sleep(delay)
+        yield WoltVenue(name=f"Venue {i}", url=f"https://wolt.com/en/fin/helsinki/restaurant/venue-{i}")
+
+
+def run(venues, tmp: Path, enrich=fake_enrich, **kwargs):
+    return asyncio.run(
+        run_pipeline(venues, enrich, is_blocked_name, tmp / "out.csv", tmp / "debug.csv", log=lambda s: None, **kwargs)
+    )
+
+
+def sequential(venues, fetch_details=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows, debug_rows = run_sequential(list(venues), fake_enrich, is_blocked_name, fetch_details)
+    return final_rows(rows), debug_rows
+
+
+def run_failing(tmp: Path) -> dict:
+    """
+    Run a 100-venue listing (0.5s per 10 venues) whose Places lookup fails on
+    the 20th venue, in a thread so a hang shows up as a timeout.
+    """
+    result = {"closed": False}
+
+    def listing():
+        try:
+            yield from slow_listing(100, per_batch=10, delay=0.5)
+        finally:
+            result["closed"] = True
+
+    def target():
+        try:
+            run(listing(), tmp, enrich=failing_enrich, fetch_details=fake_details, queue_size=4)
+        except Exception as e:
+            result["error"] = e
+
+    t0 = time.perf_counter()
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(FAILURE_TIMEOUT_S)
+    result["hung"] = worker.is_alive()
+    result["s"] = time.perf_counter() - t0
+    return result
+
+
+def main():
+    failures = []
+
+    def check(ok: bool, what: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    pages = {WOLT_LISTING_URL: FIXTURES / "newest_venues_p1.html"}
+    for p in (2, 3):
+        pages[page_url(WOLT_LISTING_URL, p)] = FIXTURES / f"newest_venues_p{p}.html"
+
+    def fixture_venues():
+        fetch, _ = fixture_fetcher(pages)
+        return iter_listing_venues(fetch=fetch)
+
+    def key(rows):
+        return Counter(tuple(sorted(r.items())) for r in rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # same decisions as the sequential loop when the fallback is off
+        seq_final, seq_debug = sequential(fixture_venues())
+        stats = run(fixture_venues(), tmp, fetch_details=None)
+        check(key(stats.debug_rows) == key(seq_debug), "fixtures: debug rows match run_sequential")
+        check(key(stats.final_rows) == key(seq_final), "fixtures: output rows match run_sequential")
+        written = (tmp / "debug.csv").read_text(encoding="utf-8").count("\n") - 1
+        check(written == len(seq_debug), f"fixtures: debug CSV has {len(seq_debug)} rows (got {written})")
+
+        # with the fallback, listing addresses fill in what Places was missing, in both modes
+        missing = sum(r["reason"] == "missing_address" for r in seq_debug)
+        seq_final, seq_debug = sequential(fixture_venues(), fake_details)
+        stats = run(fixture_venues(), tmp, fetch_details=fake_details)
+        check(
+            stats.fallback_addresses == missing and not any(r["reason"] == "missing_address" for r in stats.debug_rows),
+            f"fixtures: {missing} missing addresses recovered by the fallback (got {stats.fallback_addresses})",
+        )
+        check(key(stats.debug_rows) == key(seq_debug), "fixtures + fallback: debug rows match run_sequential")
+        check(key(stats.final_rows) == key(seq_final), "fixtures + fallback: output rows match run_sequential")
+
+        # long listing: bounded queues, overlap, and speedup over the sequential loop
+        n, size = 300, 4
+        t0 = time.perf_counter()
+        seq_final, seq_debug = sequential(slow_listing(n))
+        t_seq = time.perf_counter() - t0
+        stats = run(slow_listing(n), tmp, fetch_details=fake_details, queue_size=size)
+        check(stats.listed == n and len(stats.debug_rows) == n, f"long listing: all {n} venues written")
+        check(
+            all(d <= size for d in stats.max_depth.values()),
+            f"long listing: no queue above {size} ({stats.max_depth})",
+        )
+        check(
+            stats.first_row_s < stats.listing_done_s,
+            f"long listing: first row after {stats.first_row_s:.2f}s, before the listing finished "
+            f"({stats.listing_done_s:.2f}s)",
+        )
+        check(stats.wall_s < t_seq * 0.6, f"long listing: async {stats.wall_s:.2f}s vs sequential {t_seq:.2f}s")
+
+        # a failing stage stops the listing and comes back as an error
+        failed = run_failing(tmp)
+        check(not failed["hung"], f"failing stage: run returned within {FAILURE_TIMEOUT_S:.0f}s ({failed['s']:.2f}s)")
+        check(
+            isinstance(failed.get("error"), RuntimeError),
+            f"failing stage: Places error re-raised ({failed.get('error')!r})",
+        )
+        check(failed["closed"], "failing stage: listing generator closed")
+
+    if failures:
+        sys.exit(1)
+    print("✅ Async discovery pipeline matches the sequential loop on the fixtures")
+
+
+if __name__ == "__main__":
+    main()
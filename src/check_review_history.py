@@ -0,0 +1,157 @@
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from review_history import ReviewHistory, day_date, day_number
+
+# Builds years of synthetic daily runs, checks ReviewHistory queries against a
+# dense (day x place) snapshot matrix, and reports the file size next to what
+# one snapshot row per venue per run would take.
+
+PLACES = 5000
+DAYS = 3 * 365
+SNAPSHOT_ROW_BYTES = 48  # place_id, ISO date and count as a CSV row
+
+
+def synthetic_runs(seed: int = 5):
+    """
+    (place_ids, counts matrix (DAYS, PLACES), -1 where the place isn't in that run).
+    Places open at different times, drop out of some runs, and grow at rates
+    spread over two orders of magnitude.
+    """
+    rng = np.random.RandomState(seed)
+    r = random.Random(seed)
+    ids = ["ChIJ" + "".join(r.choices(string.ascii_letters + string.digits, k=23)) for _ in range(PLACES)]
+    opened = rng.randint(0, DAYS * 2 // 3, size=PLACES)
+    rate = rng.lognormal(mean=-2.5, sigma=1.2, size=PLACES)  # reviews per day
+    new_reviews = rng.poisson(np.broadcast_to(rate, (DAYS, PLACES)))
+    counts = np.cumsum(new_reviews * (np.arange(DAYS)[:, None] >= opened), axis=0).astype(np.int32)
+    seen = (np.arange(DAYS)[:, None] >= opened) & (rng.random_sample((DAYS, PLACES)) < 0.9)
+    return ids, np.where(seen, counts, -1)
+
+
+def carried_forward(m: np.ndarray) -> np.ndarray:
+    """
+    Each place's latest seen value on or before every day (-1 before its first run).
+    """
+    rows = np.where(m >= 0, np.arange(len(m))[:, None], 0)
+    last = np.maximum.accumulate(rows, axis=0)
+    out = m[last, np.arange(m.shape[1])]
+    first = np.argmax(m >= 0, axis=0)
+    return np.where(np.arange(len(m))[:, None] >= first, out, -1)
+
+
+def main():
+    failures = []
+
+    def check(ok: bool, what: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    ids, runs = synthetic_runs()
+    expected = carried_forward(runs)
+
+    history = ReviewHistory()
+    t0 = time.perf_counter()
+    for d in range(DAYS):
+        seen = np.flatnonzero(runs[d] >= 0)
+        history.append_run(day_date(d), [ids[i] for i in seen], runs[d, seen])
+    t_append = time.perf_counter() - t0
+    print(f"Appended {DAYS} daily runs for {PLACES} places in {t_append:.1f}s ({t_append / DAYS * 1000:.1f} ms/run)")
+
+    # ReviewHistory orders places by first appearance; map them back to the matrix columns
+    col = np.array([ids.index(p) for p in history.place_ids])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "review_history.npz"
+        history.save(path)
+        history.save(path)  # over an existing file
+        size = path.stat().st_size
+        loaded = ReviewHistory.load(path)
+        leftovers = [p.name for p in Path(tmp).iterdir() if p != path]
+    check(not leftovers, f"save leaves no temp files behind ({leftovers})")
+
+    snapshot_rows = int((runs >= 0).sum())
+    print(
+        f"Points stored: {history.points} of {snapshot_rows} snapshots | file {size / 1024 / 1024:.2f} MB "
+        f"vs ~{snapshot_rows * SNAPSHOT_ROW_BYTES / 1024 / 1024:.0f} MB as one row per venue per run"
+    )
+    check(size < 5 * 1024 * 1024, "three years of daily history fits in a few MB")
+    check(
+        loaded.place_ids == history.place_ids
+        and np.array_equal(loaded.offsets, history.offsets)
+        and np.array_equal(loaded.point_day, history.point_day)
+        and np.array_equal(loaded.point_count, history.point_count),
+        "save/load round trip is exact",
+    )
+    check(loaded.last_run == history.last_run == day_date(DAYS - 1), "save/load keeps the last run day")
+
+    rng = random.Random(1)
+    days = sorted(rng.sample(range(DAYS), 20))
+    check(
+        all(np.array_equal(loaded.counts_on(day_date(d)), expected[d, col]) for d in days),
+        f"counts_on matches the snapshot matrix on {len(days)} sampled days",
+    )
+
+    last = DAYS - 1
+    t0 = time.perf_counter()
+    idx, growth = loaded.growth(30)
+    t_growth = time.perf_counter() - t0
+    start, end = expected[last - 30, col], expected[last, col]
+    first_seen = runs[np.argmax(runs >= 0, axis=0), np.arange(PLACES)][col]
+    start = np.where(start >= 0, start, first_seen)  # opened inside the window: growth since first seen
+    ref_idx = np.flatnonzero(end >= 0)
+    check(
+        np.array_equal(idx, ref_idx) and np.array_equal(growth, end[ref_idx] - start[ref_idx]),
+        f"growth over the last 30 days matches ({t_growth * 1000:.1f} ms for {len(loaded)} places)",
+    )
+
+    top = loaded.fastest_growing(30, top=5)
+    check(
+        [g for _, g, _ in top] == sorted((end[ref_idx] - start[ref_idx]).tolist(), reverse=True)[:5],
+        "fastest_growing returns the biggest growth first",
+    )
+
+    # same-day re-run overwrites, earlier days are refused
+    final_day = day_date(last)
+    p = loaded.place_ids[int(np.argmax(loaded.point_day[loaded.offsets[1:] - 1] == day_number(final_day)))]
+    before = loaded.points
+    loaded.append_run(final_day, [p], [10_000])
+    check(loaded.series(p)[-1] == (final_day, 10_000) and loaded.points == before, "same-day re-run overwrites")
+    try:
+        loaded.append_run(final_day - timedelta(days=1), [p], [1])
+        check(False, "appending an earlier day is refused")
+    except ValueError:
+        check(True, "appending an earlier day is refused")
+
+    # counts that stop changing: quiet runs add no points, but still move "now"
+    flat = ReviewHistory()
+    d = date(2026, 1, 1)
+    while d <= date(2026, 2, 28):
+        flat.append_run(d, ["a", "b"], [10 if d < date(2026, 1, 20) else 40, 5])
+        d += timedelta(days=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "review_history.npz"
+        flat.save(path)
+        flat = ReviewHistory.load(path)
+    check(flat.last_run == date(2026, 2, 28), f"last run is the latest run, not the last change ({flat.last_run})")
+    check(
+        flat.fastest_growing(30) == [] and flat.growth(30)[1].tolist() == [0, 0],
+        f"no growth in the last 30 days after the counts went flat ({flat.fastest_growing(30)})",
+    )
+    check(flat.fastest_growing(45) == [("a", 30, 40)], "growth from before the change is still counted")
+
+    if failures:
+        sys.exit(1)
+    print("✅ Review history matches the snapshot reference")
+
+
+if __name__ == "__main__":
+    main()
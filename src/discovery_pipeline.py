@@ -0,0 +1,228 @@
+# src/discovery_pipeline.py
+import asyncio
+import concurrent.futures
+import csv
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from main import DEBUG_FIELDS, OUT_FIELDS, debug_row, fallback_address, final_rows, output_row, place_reason, write_csv
+from places_enrich import PlacesResult
+from wolt_scrape import WoltVenue
+from wolt_venue_page import VenueDetails, fetch_venue_details
+
+# Async discovery: the same steps as main.run_sequential(), with the same
+# output, as stages connected by bounded queues:
+#
+#   Wolt listing -> blocklist -> Places (PLACES_WORKERS) -> venue-page fallback
+#   (FALLBACK_WORKERS) -> writer
+#
+# The HTTP calls are blocking (requests), so each one runs in a worker thread
+# via asyncio.to_thread. Several Places lookups are then in flight at once, and
+# they overlap the listing fetch. The writer streams debug rows as soon as the
+# first venues are decided. Every queue holds at most QUEUE_SIZE jobs: when the
+# Places stage falls behind, the listing thread blocks on put() and stops
+# fetching, so memory stays bounded however long the listing is.
+#
+# The venue-page fallback is main.fallback_address(), the same one the
+# sequential loop uses, so both modes make the same decisions.
+#
+# If any stage fails, the others are cancelled and the listing thread is told
+# to stop (it checks between puts and while waiting for queue space), so the
+# error comes back to the caller instead of the run hanging on a full queue.
+#
+# Debug rows are written in completion order, not listing order.
+
+QUEUE_SIZE = 16
+PLACES_WORKERS = 4
+FALLBACK_WORKERS = 2
+PUT_POLL_S = 0.1  # how often the listing thread, waiting for queue space, checks for a stop
+
+_DONE = object()  # end of stream; each stage passes one down when all its workers are done
+
+
+@dataclass(slots=True)
+class Job:
+    venue: WoltVenue
+    enriched: Optional[PlacesResult] = None
+    reason: str = ""  # set once the venue is decided; later stages pass it through
+
+
+@dataclass
+class PipelineStats:
+    listed: int = 0
+    fallback_addresses: int = 0
+    max_depth: Dict[str, int] = field(default_factory=dict)  # queue name -> most jobs waiting at once
+    first_row_s: Optional[float] = None
+    listing_done_s: Optional[float] = None
+    wall_s: float = 0.0
+    debug_rows: List[dict] = field(default_factory=list)
+    final_rows: List[dict] = field(default_factory=list)
+
+    def summary(self) -> str:
+        depths = ", ".join(f"{name} {depth}" for name, depth in self.max_depth.items())
+        return (
+            f"Async pipeline: {self.wall_s:.1f}s | first row after {self.first_row_s or 0:.1f}s, "
+            f"listing done after {self.listing_done_s or 0:.1f}s | address fallbacks: {self.fallback_addresses} "
+            f"| max queue depth: {depths}"
+        )
+
+
+class _Queue(asyncio.Queue):
+    """
+    Bounded queue that records its deepest point in the stats.
+    """
+
+    def __init__(self, name: str, maxsize: int, stats: PipelineStats):
+        super().__init__(maxsize)
+        self.name = name
+        self.stats = stats
+        stats.max_depth[name] = 0
+
+    async def put(self, item) -> None:
+        await super().put(item)
+        if item is not _DONE:
+            self.stats.max_depth[self.name] = max(self.stats.max_depth[self.name], self.qsize())
+
+
+async def _listing(
+    venues: Iterable[WoltVenue], out: _Queue, stats: PipelineStats, t0: float, stop: threading.Event
+) -> None:
+    loop = asyncio.get_running_loop()
+
+    def put(job: Job) -> bool:
+        # waits for queue space, which is what applies the backpressure; gives
+        # up once `stop` is set, since nothing will drain the queue any more
+        fut = asyncio.run_coroutine_threadsafe(out.put(job), loop)
+        while True:
+            try:
+                fut.result(timeout=PUT_POLL_S)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stop.is_set():
+                    fut.cancel()
+                    return False
+
+    def produce() -> None:
+        # runs in a thread, so a slow listing page doesn't block the event loop
+        try:
+            for v in venues:
+                if stop.is_set() or not put(Job(v)):
+                    return
+                stats.listed += 1
+        finally:
+            close = getattr(venues, "close", None)  # a generator stops fetching pages
+            if close is not None:
+                close()
+
+    await asyncio.to_thread(produce)
+    stats.listing_done_s = time.perf_counter() - t0
+    await out.put(_DONE)
+
+
+async def _stage(inq: _Queue, outq: _Queue, workers: int, handle: Callable[[Job], Awaitable[None]]) -> None:
+    """
+    Run `handle` on undecided jobs with `workers` concurrent workers, passing every job on.
+    """
+
+    async def worker() -> None:
+        while True:
+            job = await inq.get()
+            if job is _DONE:
+                await inq.put(_DONE)  # so the other workers of this stage stop too
+                return
+            if not job.reason:
+                await handle(job)
+            await outq.put(job)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    await outq.put(_DONE)
+
+
+async def _writer(inq: _Queue, debug_csv: Path, stats: PipelineStats, t0: float) -> List[dict]:
+    kept = []
+    with open(debug_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=DEBUG_FIELDS)
+        w.writeheader()
+        while True:
+            job = await inq.get()
+            if job is _DONE:
+                break
+            row = debug_row(job.venue, job.reason, job.enriched)
+            w.writerow(row)
+            stats.debug_rows.append(row)
+            if stats.first_row_s is None:
+                stats.first_row_s = time.perf_counter() - t0
+            if job.reason == "kept":
+                kept.append(output_row(job.enriched))
+    return kept
+
+
+async def run_pipeline(
+    venues: Iterable[WoltVenue],
+    enrich: Callable[[str], Optional[PlacesResult]],
+    is_blocked_name: Callable[[str], bool],
+    out_csv: Path,
+    debug_csv: Path,
+    fetch_details: Optional[Callable[[str], Optional[VenueDetails]]] = fetch_venue_details,
+    places_workers: int = PLACES_WORKERS,
+    fallback_workers: int = FALLBACK_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+    log: Callable[[str], None] = print,
+) -> PipelineStats:
+    """
+    Discover, filter, enrich and write venues with all stages running at once.
+    `venues` is consumed lazily (e.g. wolt_scrape.iter_venues). Pass
+    fetch_details=None to skip the venue-page fallback. An error in any stage
+    stops the run and is re-raised.
+    """
+    stats = PipelineStats()
+    t0 = time.perf_counter()
+    stop = threading.Event()
+
+    async def blocklist(job: Job) -> None:
+        if is_blocked_name(job.venue.name):
+            job.reason = "blocked_brand"
+
+    async def places(job: Job) -> None:
+        log(f"Enriching: {job.venue.name}")
+        job.enriched = await asyncio.to_thread(enrich, job.venue.name)
+        if not job.enriched:
+            job.reason = "no_places_match"
+
+    async def fallback(job: Job) -> None:
+        e = job.enriched
+        if not e.formatted_address and fetch_details is not None:
+            address = await asyncio.to_thread(fallback_address, job.venue, fetch_details)
+            if address:
+                e.formatted_address = address
+                stats.fallback_addresses += 1
+        job.reason = place_reason(e)
+
+    listed = _Queue("listed", queue_size, stats)
+    allowed = _Queue("allowed", queue_size, stats)
+    enriched = _Queue("enriched", queue_size, stats)
+    decided = _Queue("decided", queue_size, stats)
+
+    tasks = [
+        asyncio.create_task(_listing(venues, listed, stats, t0, stop)),
+        asyncio.create_task(_stage(listed, allowed, 1, blocklist)),
+        asyncio.create_task(_stage(allowed, enriched, places_workers, places)),
+        asyncio.create_task(_stage(enriched, decided, fallback_workers, fallback)),
+        asyncio.create_task(_writer(decided, debug_csv, stats, t0)),
+    ]
+    try:
+        kept = (await asyncio.gather(*tasks))[-1]
+    except BaseException:
+        stop.set()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    stats.final_rows = final_rows(kept)
+    write_csv(out_csv, OUT_FIELDS, stats.final_rows)
+    stats.wall_s = time.perf_counter() - t0
+    return stats
@@ -1,182 +1,182 @@
 # src/main.py
+from functools import partial
 from pathlib import Path
-import re
+from typing import Callable, List, Optional, Tuple
+import argparse
 import csv
 import os
 
 from dotenv import load_dotenv
 
-from wolt_scrape import fetch_newest_venues
-from places_enrich import enrich_place
+from blocklist import DEFAULT_BLOCKLIST, BlocklistMatcher, is_blocked, load_blocklist, norm
+from wolt_scrape import DEFAULT_BACKEND, WoltVenue, discover_venues, iter_venues
+from places_enrich import PlacesResult, enrich_place
+from review_history import DEFAULT_HISTORY, record_run
+from venue_index import VenueGridIndex
+from wolt_venue_page import VenueDetails, fetch_venue_details
 
 
 MAX_REVIEWS = 100  # your rule/this means a restaurant can not have more than this amount of reviews to be kept. 
+DEDUPE_RADIUS_M = 75  # same name within this distance = same venue (addresses can be formatted differently)
 
+OUT_FIELDS = ["name", "full_address", "description", "tags", "lat", "lng"]
+DEBUG_FIELDS = [
+    "wolt_name", "wolt_url", "places_name", "place_id", "full_address", "lat", "lng", "reviews_total", "tags", "reason",
+]
+PIPELINES = ("sequential", "async")
 
-def norm(s: str) -> str:
-    s = (s or "").lower()
-    s = re.sub(r"[^\w\s]", " ", s)  # remove punctuation
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
 
+def _coord(v) -> object:
+    return v if v is not None else ""
 
-def is_blocked(venue_name: str, blocked_list: list[str]) -> bool:
-    v = norm(venue_name)
-    for b in blocked_list:
-        bn = norm(b)
-        if not bn:
-            continue
-        if v == bn or v.startswith(bn + " ") or v.startswith(bn):
-            return True
-    return False
-
-
-def main():
-    load_dotenv()
-
-    api_key = os.getenv("GOOGLE_PLACES_API_KEY")
-    if not api_key:
-        raise RuntimeError("Missing GOOGLE_PLACES_API_KEY. Add it to your .env file.")
-
-    root = Path(__file__).resolve().parents[1]
-    blocklist_path = root / "config" / "blocklist.txt"
-
-    out_csv = root / "data" / "helsinki_new_openings.csv"
-    debug_csv = root / "data" / "helsinki_new_openings_debug.csv"
-    out_csv.parent.mkdir(exist_ok=True)
-
-    blocked = []
-    if blocklist_path.exists():
-        blocked = [
-            ln.strip()
-            for ln in blocklist_path.read_text(encoding="utf-8").splitlines()
-            if ln.strip()
-        ]
-
-    venues = fetch_newest_venues(limit=30)
-
-    print(f"Loaded {len(blocked)} blocked brands")
-    print(f"Wolt venues: {len(venues)} (see debug CSV for kept/blocked breakdown)")
 
+def dedupe_by_proximity(rows: list[dict]) -> list[dict]:
+    """
+    Drop rows whose normalized name matches an earlier row within DEDUPE_RADIUS_M.
+    Rows without coordinates are kept as they are.
+    """
+    grid = VenueGridIndex()
+    out = []
+    for r in rows:
+        lat, lng = r.get("lat"), r.get("lng")
+        if lat == "" or lng == "" or lat is None or lng is None:
+            out.append(r)
+            continue
+        name = norm(r["name"])
+        if any(norm(other["name"]) == name for _, other in grid.within(lat, lng, DEDUPE_RADIUS_M)):
+            continue
+        grid.add(lat, lng, r)
+        out.append(r)
+    return out
+
+
+def place_reason(enriched: PlacesResult) -> str:
+    """
+    Reason code for a venue that has a Places match.
+    """
+    if not enriched.formatted_address:
+        return "missing_address"
+    if enriched.user_ratings_total > MAX_REVIEWS:
+        return f"too_many_reviews(>{MAX_REVIEWS})"
+    return "kept"
+
+
+def _details_or_none(fetch_details: Callable[[str], Optional[VenueDetails]], url: str) -> Optional[VenueDetails]:
+    try:
+        return fetch_details(url)
+    except Exception:
+        return None  # the fallback is best effort; the venue stays missing_address
+
+
+def fallback_address(v: WoltVenue, fetch_details: Callable[[str], Optional[VenueDetails]]) -> str:
+    """
+    Address for a venue Places matched without one: the listing's (json backend
+    already has it), else the one on its Wolt venue page. "" if neither has one.
+    """
+    if v.address:
+        return v.address
+    details = _details_or_none(fetch_details, v.url)
+    return details.address if details else ""
+
+
+def debug_row(v: WoltVenue, reason: str, enriched: Optional[PlacesResult] = None) -> dict:
+    if enriched is None:
+        return {
+            "wolt_name": v.name,
+            "wolt_url": v.url,
+            "places_name": "",
+            "full_address": "",
+            "reviews_total": "",
+            "tags": "",
+            "reason": reason,
+        }
+    return {
+        "wolt_name": v.name,
+        "wolt_url": v.url,
+        "places_name": enriched.name,
+        "place_id": enriched.place_id,
+        "full_address": enriched.formatted_address,
+        "lat": _coord(enriched.lat),
+        "lng": _coord(enriched.lng),
+        "reviews_total": enriched.user_ratings_total,
+        "tags": ", ".join(enriched.tags),
+        "reason": reason,
+    }
+
+
+def output_row(enriched: PlacesResult) -> dict:
+    return {
+        "name": enriched.name,
+        "full_address": enriched.formatted_address,
+        "description": enriched.description,
+        "tags": ", ".join(enriched.tags),
+        "lat": _coord(enriched.lat),
+        "lng": _coord(enriched.lng),
+    }
+
+
+def run_sequential(
+    venues: List[WoltVenue],
+    enrich: Callable[[str], Optional[PlacesResult]],
+    is_blocked_name: Callable[[str], bool],
+    fetch_details: Optional[Callable[[str], Optional[VenueDetails]]] = fetch_venue_details,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    One venue at a time: blocklist, then Places, then the address/review filters.
+    Returns (kept output rows, debug rows). Pass fetch_details=None to skip the
+    venue-page fallback for matches without an address.
+    """
     rows = []
     debug_rows = []
 
     for i, v in enumerate(venues, start=1):
         # 1) blocklist filter
-        if is_blocked(v.name, blocked):
-            debug_rows.append(
-                {
-                    "wolt_name": v.name,
-                    "wolt_url": v.url,
-                    "places_name": "",
-                    "full_address": "",
-                    "reviews_total": "",
-                    "tags": "",
-                    "reason": "blocked_brand",
-                }
-            )
+        if is_blocked_name(v.name):
+            debug_rows.append(debug_row(v, "blocked_brand"))
             continue
 
         # 2) Places enrichment
         print(f"[{i}/{len(venues)}] Enriching: {v.name}")
-        enriched = enrich_place(api_key, v.name, city="Helsinki")
+        enriched = enrich(v.name)
         if not enriched:
-            debug_rows.append(
-                {
-                    "wolt_name": v.name,
-                    "wolt_url": v.url,
-                    "places_name": "",
-                    "full_address": "",
-                    "reviews_total": "",
-                    "tags": "",
-                    "reason": "no_places_match",
-                }
-            )
+            debug_rows.append(debug_row(v, "no_places_match"))
             continue
 
-        if not enriched.formatted_address:
-            debug_rows.append(
-                {
-                    "wolt_name": v.name,
-                    "wolt_url": v.url,
-                    "places_name": enriched.name,
-                    "full_address": "",
-                    "reviews_total": enriched.user_ratings_total,
-                    "tags": ", ".join(enriched.tags),
-                    "reason": "missing_address",
-                }
-            )
-            continue
+        # 3) address fallback, then the address + review-count filters
+        if not enriched.formatted_address and fetch_details is not None:
+            enriched.formatted_address = fallback_address(v, fetch_details)
+        reason = place_reason(enriched)
+        debug_rows.append(debug_row(v, reason, enriched))
+        if reason == "kept":
+            rows.append(output_row(enriched))
 
-        # 3) review-count filter
-        if enriched.user_ratings_total > MAX_REVIEWS:
-            debug_rows.append(
-                {
-                    "wolt_name": v.name,
-                    "wolt_url": v.url,
-                    "places_name": enriched.name,
-                    "full_address": enriched.formatted_address,
-                    "reviews_total": enriched.user_ratings_total,
-                    "tags": ", ".join(enriched.tags),
-                    "reason": f"too_many_reviews(>{MAX_REVIEWS})",
-                }
-            )
-            continue
+    return rows, debug_rows
 
-        # keep
-        rows.append(
-            {
-                "name": enriched.name,
-                "full_address": enriched.formatted_address,
-                "description": enriched.description,
-                "tags": ", ".join(enriched.tags),
-            }
-        )
-        debug_rows.append(
-            {
-                "wolt_name": v.name,
-                "wolt_url": v.url,
-                "places_name": enriched.name,
-                "full_address": enriched.formatted_address,
-                "reviews_total": enriched.user_ratings_total,
-                "tags": ", ".join(enriched.tags),
-                "reason": "kept",
-            }
-        )
 
-    # de-dupe final output by (name, address)
+def final_rows(rows: List[dict]) -> List[dict]:
+    """
+    De-dupe kept rows by (name, address), then by name + proximity.
+    """
     uniq = {}
     for r in rows:
         key = (r["name"].lower(), r["full_address"].lower())
         uniq[key] = r
-    final_rows = list(uniq.values())
+    return dedupe_by_proximity(list(uniq.values()))
 
-    with open(out_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=["name", "full_address", "description", "tags"])
-        w.writeheader()
-        w.writerows(final_rows)
-
-    with open(debug_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=[
-                "wolt_name",
-                "wolt_url",
-                "places_name",
-                "full_address",
-                "reviews_total",
-                "tags",
-                "reason",
-            ],
-        )
+
+def write_csv(path: Path, fieldnames: List[str], rows: List[dict]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames)
         w.writeheader()
-        w.writerows(debug_rows)
+        w.writerows(rows)
 
+
+def print_summary(final: List[dict], debug_rows: List[dict], out_csv: Path, debug_csv: Path) -> None:
     kept_count = sum(1 for r in debug_rows if r["reason"] == "kept")
     blocked_count = sum(1 for r in debug_rows if r["reason"] == "blocked_brand")
     not_kept_count = len(debug_rows) - kept_count
 
-    print(f"Wrote {len(final_rows)} rows -> {out_csv}")
+    print(f"Wrote {len(final)} rows -> {out_csv}")
     print(
         f"Debug rows: {len(debug_rows)} | Kept: {kept_count} | "
         f"Blocked: {blocked_count} | Not kept: {not_kept_count} -> {debug_csv}"
@@ -184,5 +184,62 @@ def main():
     print("Debug output includes blocked venues + reason codes -> data/helsinki_new_openings_debug.csv")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Discover new Helsinki venues on Wolt and enrich them via Places.")
+    parser.add_argument(
+        "--pipeline",
+        choices=PIPELINES,
+        default="sequential",
+        help="async overlaps listing, Places lookups and writing (see discovery_pipeline.py)",
+    )
+    parser.add_argument("--limit", type=int, default=30, help="venues to take from the listing")
+    parser.add_argument(
+        "--history", type=Path, default=DEFAULT_HISTORY, help="review-count history to append this run to"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    api_key = os.getenv("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing GOOGLE_PLACES_API_KEY. Add it to your .env file.")
+
+    root = Path(__file__).resolve().parents[1]
+
+    out_csv = root / "data" / "helsinki_new_openings.csv"
+    debug_csv = root / "data" / "helsinki_new_openings_debug.csv"
+    out_csv.parent.mkdir(exist_ok=True)
+
+    blocked = load_blocklist(DEFAULT_BLOCKLIST)
+    is_blocked_name = BlocklistMatcher(blocked)
+    enrich = partial(enrich_place, api_key, city="Helsinki")
+    backend = os.getenv("WOLT_DISCOVERY_BACKEND", DEFAULT_BACKEND)
+    print(f"Loaded {len(blocked)} blocked brands")
+
+    if args.pipeline == "async":
+        import asyncio
+
+        from discovery_pipeline import run_pipeline
+
+        stats = asyncio.run(
+            run_pipeline(iter_venues(backend, limit=args.limit), enrich, is_blocked_name, out_csv, debug_csv)
+        )
+        print(f"Wolt venues ({backend} backend, async pipeline): {stats.listed}")
+        print(stats.summary())
+        print_summary(stats.final_rows, stats.debug_rows, out_csv, debug_csv)
+        print(f"Review counts recorded for {record_run(stats.debug_rows, args.history)} places -> {args.history}")
+        return
+
+    venues = discover_venues(backend, limit=args.limit)
+    print(f"Wolt venues ({backend} backend): {len(venues)} (see debug CSV for kept/blocked breakdown)")
+
+    rows, debug_rows = run_sequential(venues, enrich, is_blocked_name)
+    final = final_rows(rows)
+    write_csv(out_csv, OUT_FIELDS, final)
+    write_csv(debug_csv, DEBUG_FIELDS, debug_rows)
+    print_summary(final, debug_rows, out_csv, debug_csv)
+    print(f"Review counts recorded for {record_run(debug_rows, args.history)} places -> {args.history}")
+
+
 if __name__ == "__main__":
     main()
@@ -1,11 +1,13 @@
 # src/places_enrich.py
 from dataclasses import dataclass
-from typing import Optional, List, Set
+from typing import Iterable, List, Optional
 import re
 import requests
 
 
-ALLOWED_TAGS = {
+# Tag vocabulary. A tag's position is its bit in a tag mask, so this tuple is
+# append-only: never reorder or remove entries, only add new ones at the end.
+TAG_VOCABULARY = (
     # your original tags
     "street food", "asian", "chicken", "gyros", "american", "mexican", "wings", "bbq",
     "mediterranean", "falafel", "fish", "meat & fish", "japanese", "fine dining", "nordic",
@@ -16,7 +18,9 @@ ALLOWED_TAGS = {
 
     # added tags
     "Cocktail bar", "Craft beer", "Desserts", "Middle Eastern", "Korean", "Date night",
-}
+)
+ALLOWED_TAGS = set(TAG_VOCABULARY)
+TAG_IDS = {tag: i for i, tag in enumerate(TAG_VOCABULARY)}
 
 # Map Google place "types" -> your tags
 TYPE_TO_TAGS = {
@@ -56,13 +60,56 @@ KEYWORD_TO_TAGS = [
 ]
 
 
-@dataclass
+# --- Tag masks ---
+# A set of tags is an int with bit TAG_IDS[tag] set, so union / intersection /
+# "has all of these" over many venues are plain integer operations.
+
+# bits in sorted-name order, so decoded tag lists come out sorted like before
+_BITS_BY_NAME = [(1 << TAG_IDS[t], t) for t in sorted(TAG_VOCABULARY)]
+
+
+def tags_to_mask(tags: Iterable[str]) -> int:
+    """
+    Tags outside the vocabulary are dropped.
+    """
+    mask = 0
+    for t in tags:
+        i = TAG_IDS.get(t)
+        if i is not None:
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_tags(mask: int) -> List[str]:
+    return [t for bit, t in _BITS_BY_NAME if mask & bit]
+
+
+def has_tags(mask: int, required: int) -> bool:
+    return mask & required == required
+
+
+TYPE_TO_MASK = {t: tags_to_mask(tags) for t, tags in TYPE_TO_TAGS.items()}
+KEYWORD_TO_MASK = [(re.compile(pattern), tags_to_mask(tags)) for pattern, tags in KEYWORD_TO_TAGS]
+
+_NEW_OPENING = tags_to_mask(["New opening"])
+_CAFE_AND_BAKERY = tags_to_mask(["cafe", "bakery"])
+_CAFE_BAKERY_COMBINED = tags_to_mask(["Café & bakery"])
+
+
+@dataclass(slots=True)
 class PlacesResult:
     name: str
     formatted_address: str
     description: str
-    tags: List[str]
+    tag_mask: int
     user_ratings_total: int
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    place_id: str = ""
+
+    @property
+    def tags(self) -> List[str]:
+        return mask_to_tags(self.tag_mask)
 
 
 def find_place_id(api_key: str, query: str) -> Optional[str]:
@@ -87,7 +134,7 @@ def get_place_details(api_key: str, place_id: str) -> Optional[dict]:
     params = {
         "key": api_key,
         "place_id": place_id,
-        "fields": "name,formatted_address,types,editorial_summary,user_ratings_total",
+        "fields": "name,formatted_address,geometry,types,editorial_summary,user_ratings_total",
     }
     r = requests.get(url, params=params, timeout=30)
     r.raise_for_status()
@@ -95,24 +142,25 @@ def get_place_details(api_key: str, place_id: str) -> Optional[dict]:
     return data.get("result")
 
 
-def _infer_tags(name: str, types: List[str]) -> List[str]:
-    tags: Set[str] = set()
-    tags.add("New opening")
+def infer_tag_mask(name: str, types: List[str]) -> int:
+    mask = _NEW_OPENING
 
     for t in (types or []):
-        tags.update(TYPE_TO_TAGS.get(t, set()))
+        mask |= TYPE_TO_MASK.get(t, 0)
 
     low = (name or "").lower()
-    for pattern, mapped_tags in KEYWORD_TO_TAGS:
-        if re.search(pattern, low):
-            tags.update(mapped_tags)
+    for pattern, mapped in KEYWORD_TO_MASK:
+        if pattern.search(low):
+            mask |= mapped
 
-    if "cafe" in tags and "bakery" in tags:
-        tags.discard("cafe")
-        tags.discard("bakery")
-        tags.add("Café & bakery")
+    if has_tags(mask, _CAFE_AND_BAKERY):
+        mask = (mask & ~_CAFE_AND_BAKERY) | _CAFE_BAKERY_COMBINED
 
-    return [t for t in sorted(tags) if t in ALLOWED_TAGS]
+    return mask
+
+
+def _infer_tags(name: str, types: List[str]) -> List[str]:
+    return mask_to_tags(infer_tag_mask(name, types))
 
 
 def enrich_place(api_key: str, venue_name: str, city: str = "Helsinki") -> Optional[PlacesResult]:
@@ -135,14 +183,21 @@ def enrich_place(api_key: str, venue_name: str, city: str = "Helsinki") -> Optio
         desc = "New venue in Helsinki (via Wolt discovery)."
 
     types = d.get("types") or []
-    tags = _infer_tags(name=name, types=types)
+    tag_mask = infer_tag_mask(name=name, types=types)
 
     urt = int(d.get("user_ratings_total") or 0)
 
+    loc = (d.get("geometry") or {}).get("location") or {}
+    lat = loc.get("lat")
+    lng = loc.get("lng")
+
     return PlacesResult(
         name=name,
         formatted_address=addr,
         description=desc,
-        tags=tags,
+        tag_mask=tag_mask,
         user_ratings_total=urt,
+        lat=float(lat) if lat is not None else None,
+        lng=float(lng) if lng is not None else None,
+        place_id=place_id,
     )
@@ -0,0 +1,279 @@
+# src/review_history.py
+import argparse
+import os
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Review-count history per Google place_id, for spotting venues whose reviews
+# grow quickly (MAX_REVIEWS in main.py only sees one snapshot).
+#
+# Each place has a series of (day, user_ratings_total) points. A point is only
+# stored when the count changed since the previous run, and the count carries
+# forward between points, so a quiet venue costs nothing per run. In memory
+# the series of all places live in three flat arrays, CSR style: offsets,
+# point_day, point_count. That makes "count on day X" or "growth over the last
+# N days" one vectorized pass over every place.
+#
+# On disk every series is delta-encoded (first point absolute, then differences
+# of day and count), narrowed to the smallest integer type that fits, and
+# zlib-compressed by np.savez_compressed. Daily deltas are tiny, so years of
+# history for thousands of venues stay in a few MB. The file also keeps the
+# day of the latest run: a quiet run adds no points, so the newest point is
+# not necessarily the latest run.
+
+DEFAULT_HISTORY = Path(__file__).resolve().parents[1] / "data" / "review_history.npz"
+EPOCH = date(2020, 1, 1)  # day numbers are days since EPOCH
+FORMAT_VERSION = 2  # 2: adds last_run; version 1 files are still read
+
+
+def day_number(d: date) -> int:
+    return (d - EPOCH).days
+
+
+def day_date(n: int) -> date:
+    return EPOCH + timedelta(days=int(n))
+
+
+def _narrow(a: np.ndarray) -> np.ndarray:
+    """
+    `a` as the smallest signed integer type that holds all its values.
+    """
+    if a.size == 0:
+        return a.astype(np.int8)
+    lo, hi = int(a.min()), int(a.max())
+    for dt in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dt)
+        if info.min <= lo and hi <= info.max:
+            return a.astype(dt)
+    return a.astype(np.int64)
+
+
+def _segment_starts(offsets: np.ndarray) -> np.ndarray:
+    return offsets[:-1]
+
+
+def delta_encode(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Per-segment deltas: the first value of each segment stays absolute.
+    """
+    d = np.diff(values.astype(np.int64), prepend=0)
+    starts = _segment_starts(offsets)
+    d[starts] = values[starts]
+    return _narrow(d)
+
+
+def delta_decode(deltas: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Inverse of delta_encode: a cumulative sum that restarts at each segment.
+    """
+    if deltas.size == 0:
+        return np.zeros(0, dtype=np.int32)
+    d = deltas.astype(np.int64)
+    cs = np.cumsum(d)
+    starts = _segment_starts(offsets)
+    base = cs[starts] - d[starts]  # running total before each segment
+    return (cs - np.repeat(base, np.diff(offsets))).astype(np.int32)
+
+
+class ReviewHistory:
+    def __init__(self):
+        self.place_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)  # place i owns points offsets[i]:offsets[i+1]
+        self.point_day = np.zeros(0, dtype=np.int32)
+        self.point_count = np.zeros(0, dtype=np.int32)
+        self.last_run: Optional[date] = None  # day of the latest append_run, changed or not
+
+    def __len__(self) -> int:
+        return len(self.place_ids)
+
+    @property
+    def points(self) -> int:
+        return int(self.offsets[-1])
+
+    # --- storage ---
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_HISTORY) -> "ReviewHistory":
+        h = cls()
+        if not Path(path).exists():
+            return h
+        with np.load(path) as data:
+            version = int(data["version"])
+            if version not in (1, FORMAT_VERSION):
+                raise ValueError(f"{path}: unsupported review history format {version}")
+            h.place_ids = [str(p) for p in data["place_ids"]]
+            h.offsets = np.concatenate([[0], np.cumsum(data["lengths"], dtype=np.int64)])
+            h.point_day = delta_decode(data["day_deltas"], h.offsets)
+            h.point_count = delta_decode(data["count_deltas"], h.offsets)
+            if version >= 2 and int(data["last_run"]) >= 0:
+                h.last_run = day_date(int(data["last_run"]))
+            elif h.points:
+                h.last_run = day_date(h.point_day.max())  # best guess for version 1 files
+        h.index = {p: i for i, p in enumerate(h.place_ids)}
+        return h
+
+    def save(self, path: Path = DEFAULT_HISTORY) -> None:
+        """
+        Write to a temp file next to `path`, then rename it over `path`, so an
+        interrupted save never leaves a truncated history behind.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    version=np.int8(FORMAT_VERSION),
+                    last_run=np.int32(day_number(self.last_run) if self.last_run else -1),
+                    place_ids=np.array(self.place_ids, dtype=str),
+                    lengths=_narrow(np.diff(self.offsets)),
+                    day_deltas=delta_encode(self.point_day, self.offsets),
+                    count_deltas=delta_encode(self.point_count, self.offsets),
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    # --- appends ---
+
+    def append_run(self, day: date, place_ids: Sequence[str], counts: Sequence[int]) -> int:
+        """
+        Record one run's review counts. Places seen for the first time get a
+        first point; known places get a point only if their count changed.
+        Re-running the same day overwrites that day's point. Returns the
+        number of points added.
+        """
+        d = day_number(day)
+        latest = {}
+        for pid, c in zip(place_ids, counts):
+            if pid:
+                latest[pid] = int(c)  # last one wins if a place appears twice
+
+        known = [(self.index[p], c) for p, c in latest.items() if p in self.index]
+        new = [(p, c) for p, c in latest.items() if p not in self.index]
+
+        if known:
+            idx = np.array([i for i, _ in known], dtype=np.int64)
+            cnt = np.array([c for _, c in known], dtype=np.int32)
+            last = self.offsets[idx + 1] - 1
+            last_day = self.point_day[last]
+            if (last_day > d).any():
+                raise ValueError(f"{day} is before this place's latest point; append runs in date order")
+
+            same_day = last_day == d
+            self.point_count[last[same_day]] = cnt[same_day]
+
+            grow = ~same_day & (self.point_count[last] != cnt)
+            at = last[grow] + 1
+            self.point_day = np.insert(self.point_day, at, d)
+            self.point_count = np.insert(self.point_count, at, cnt[grow])
+            added = np.zeros(len(self.place_ids), dtype=np.int64)
+            added[idx[grow]] = 1
+            self.offsets[1:] += np.cumsum(added)
+            n_added = int(grow.sum())
+        else:
+            n_added = 0
+
+        if new:
+            for p, _ in new:
+                self.index[p] = len(self.place_ids)
+                self.place_ids.append(p)
+            self.point_day = np.concatenate([self.point_day, np.full(len(new), d, dtype=np.int32)])
+            self.point_count = np.concatenate([self.point_count, np.array([c for _, c in new], dtype=np.int32)])
+            self.offsets = np.concatenate([self.offsets, self.offsets[-1] + np.arange(1, len(new) + 1)])
+            n_added += len(new)
+
+        if self.last_run is None or day > self.last_run:
+            self.last_run = day
+        return n_added
+
+    # --- queries ---
+
+    def counts_on(self, day: date) -> np.ndarray:
+        """
+        Review count of every place as of `day` (its latest point on or before
+        that day), -1 where the place hadn't been seen yet. Indexed like place_ids.
+        """
+        if not self.place_ids:
+            return np.zeros(0, dtype=np.int32)
+        seen = (self.point_day <= day_number(day)).astype(np.int64)
+        n_seen = np.add.reduceat(seen, _segment_starts(self.offsets))  # days are sorted within a place
+        at = self.offsets[:-1] + n_seen - 1
+        return np.where(n_seen > 0, self.point_count[np.maximum(at, 0)], -1).astype(np.int32)
+
+    def growth(self, days: int, as_of: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (place indexes, review growth) over the `days` days up to `as_of`
+        (default: the latest run, last_run), for places seen by `as_of`. A place
+        first seen inside the window grows from its first recorded count.
+        """
+        as_of = as_of or self.last_run
+        if as_of is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        end = self.counts_on(as_of)
+        start = self.counts_on(as_of - timedelta(days=days))
+        start = np.where(start >= 0, start, self.point_count[_segment_starts(self.offsets)])
+        idx = np.flatnonzero(end >= 0)
+        return idx, end[idx] - start[idx]
+
+    def fastest_growing(
+        self, days: int, top: int = 20, min_growth: int = 1, as_of: Optional[date] = None
+    ) -> List[Tuple[str, int, int]]:
+        """
+        [(place_id, growth, current count)], biggest growth first.
+        """
+        idx, g = self.growth(days, as_of)
+        keep = g >= min_growth
+        idx, g = idx[keep], g[keep]
+        order = np.argsort(-g, kind="stable")[:top]
+        now = self.counts_on(as_of or self.last_run)
+        return [(self.place_ids[idx[o]], int(g[o]), int(now[idx[o]])) for o in order]
+
+    def series(self, place_id: str) -> List[Tuple[date, int]]:
+        i = self.index[place_id]
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return [(day_date(d), int(c)) for d, c in zip(self.point_day[lo:hi], self.point_count[lo:hi])]
+
+
+def record_run(rows: Sequence[dict], path: Path = DEFAULT_HISTORY, day: Optional[date] = None) -> int:
+    """
+    Append the Places review counts from one discovery run's debug rows.
+    Returns the number of places recorded.
+    """
+    found = [r for r in rows if r.get("place_id")]
+    if not found:
+        return 0
+    history = ReviewHistory.load(path)
+    history.append_run(day or date.today(), [r["place_id"] for r in found], [r["reviews_total"] for r in found])
+    history.save(path)
+    return len(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Venues whose Google review count grows fastest.")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--min-growth", type=int, default=1)
+    args = parser.parse_args()
+
+    if not args.history.exists():
+        raise FileNotFoundError(f"{args.history} not found; run src/main.py first")
+
+    history = ReviewHistory.load(args.history)
+    size_kb = args.history.stat().st_size / 1024
+    print(f"{len(history)} places, {history.points} points, last run {history.last_run} ({size_kb:.0f} KB)")
+    print(f"Fastest growing over the last {args.days} days:")
+    for place_id, growth, now in history.fastest_growing(args.days, args.top, args.min_growth):
+        print(f"  +{growth:<5} now {now:<5} {place_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import argparse
+import csv
+import math
+
+
+EARTH_RADIUS_M = 6_371_000.0
+DEFAULT_CELL_M = 250.0
+HELSINKI_LAT = 60.17  # reference latitude for the grid projection
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class VenueGridIndex:
+    """
+    Uniform grid over lat/lng (equirectangular projection around ref_lat).
+    A radius query only looks at the cells the circle can touch and then
+    checks exact haversine distance, so it costs O(venues nearby), not O(all venues).
+    """
+
+    def __init__(self, cell_m: float = DEFAULT_CELL_M, ref_lat: float = HELSINKI_LAT):
+        self.cell_m = cell_m
+        self.ref_lat = ref_lat
+        self._m_per_deg_lat = math.pi * EARTH_RADIUS_M / 180.0
+        self._m_per_deg_lng = self._m_per_deg_lat * math.cos(math.radians(ref_lat))
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self.points: List[Tuple[float, float]] = []
+        self.items: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (
+            math.floor(lat * self._m_per_deg_lat / self.cell_m),
+            math.floor(lng * self._m_per_deg_lng / self.cell_m),
+        )
+
+    def _lng_reach(self, lat: float, radius_m: float) -> int:
+        """
+        Longitude cells a radius_m circle around latitude `lat` can span. Cells
+        are sized at ref_lat, so poleward of it they are narrower than cell_m;
+        use the circle's poleward edge, where they are narrowest.
+        """
+        edge = min(abs(lat) + radius_m / self._m_per_deg_lat, 89.9)
+        cell_w = self.cell_m * math.cos(math.radians(edge)) / math.cos(math.radians(self.ref_lat))
+        return int(math.ceil(radius_m / cell_w))
+
+    def add(self, lat: float, lng: float, item: Any = None) -> int:
+        pos = len(self.points)
+        self.points.append((lat, lng))
+        self.items.append(item)
+        self._cells.setdefault(self._cell(lat, lng), []).append(pos)
+        return pos
+
+    def add_many(self, rows: Iterable[Tuple[float, float, Any]]) -> None:
+        for lat, lng, item in rows:
+            self.add(lat, lng, item)
+
+    def within(self, lat: float, lng: float, radius_m: float) -> List[Tuple[float, Any]]:
+        """
+        (distance_m, item) for every venue within radius_m, nearest first.
+        """
+        cy, cx = self._cell(lat, lng)
+        reach = int(math.ceil(radius_m / self.cell_m))
+        reach_x = self._lng_reach(lat, radius_m)
+        out = []
+        for dy in range(-reach, reach + 1):
+            for dx in range(-reach_x, reach_x + 1):
+                for pos in self._cells.get((cy + dy, cx + dx), ()):
+                    plat, plng = self.points[pos]
+                    d = haversine_m(lat, lng, plat, plng)
+                    if d <= radius_m:
+                        out.append((d, self.items[pos]))
+        out.sort(key=lambda di: di[0])
+        return out
+
+    def colocated(self, max_m: float) -> List[Tuple[Any, Any, float]]:
+        """
+        Pairs of venues at most max_m apart (each pair once). Only neighbouring
+        cells are compared, so this stays near-linear for city-scale data.
+        """
+        if max_m < self.cell_m / 2:
+            # tight radius: regrid with smaller cells so each cell holds only a few venues
+            fine = VenueGridIndex(cell_m=max(max_m, 1.0), ref_lat=self.ref_lat)
+            fine.add_many((lat, lng, item) for (lat, lng), item in zip(self.points, self.items))
+            return fine.colocated(max_m)
+
+        reach = int(math.ceil(max_m / self.cell_m))
+        reach_x: Dict[int, int] = {}  # per cell row, from the row's poleward edge
+        pairs = []
+        for (cy, cx), members in self._cells.items():
+            if cy not in reach_x:
+                row_lat = max(abs(cy), abs(cy + 1)) * self.cell_m / self._m_per_deg_lat
+                reach_x[cy] = self._lng_reach(row_lat, max_m)
+            for dy in range(-reach, reach + 1):
+                for dx in range(-reach_x[cy], reach_x[cy] + 1):
+                    others = self._cells.get((cy + dy, cx + dx))
+                    if not others:
+                        continue
+                    for a in members:
+                        alat, alng = self.points[a]
+                        for b in others:
+                            if b <= a:
+                                continue
+                            blat, blng = self.points[b]
+                            d = haversine_m(alat, alng, blat, blng)
+                            if d <= max_m:
+                                pairs.append((self.items[a], self.items[b], d))
+        pairs.sort(key=lambda p: p[2])
+        return pairs
+
+
+def _to_float(v: Any) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_venues_csv(path: Path, cell_m: float = DEFAULT_CELL_M) -> VenueGridIndex:
+    """
+    Index every row with lat/lng from a discovery CSV (rows without coordinates are skipped).
+    """
+    index = VenueGridIndex(cell_m=cell_m)
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            lat, lng = _to_float(row.get("lat")), _to_float(row.get("lng"))
+            if lat is None or lng is None:
+                continue
+            index.add(lat, lng, row)
+    return index
+
+
+def main():
+    root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(description="Proximity queries over discovered venues.")
+    parser.add_argument("--csv", type=Path, default=root / "data" / "helsinki_new_openings.csv")
+    parser.add_argument("--near", help="lat,lng to search around, e.g. 60.1699,24.9384")
+    parser.add_argument("--radius-km", type=float, default=1.0)
+    parser.add_argument("--colocated-m", type=float, help="list venue pairs at most this many meters apart")
+    args = parser.parse_args()
+
+    index = load_venues_csv(args.csv)
+    print(f"Indexed {len(index)} venues with coordinates from {args.csv}")
+
+    if args.near:
+        lat, lng = (float(x) for x in args.near.split(","))
+        hits = index.within(lat, lng, args.radius_km * 1000)
+        print(f"{len(hits)} venues within {args.radius_km} km of {lat},{lng}:")
+        for d, row in hits:
+            print(f"  {d:7.0f} m  {row.get('name')} | {row.get('full_address')}")
+
+    if args.colocated_m is not None:
+        pairs = index.colocated(args.colocated_m)
+        print(f"{len(pairs)} venue pairs within {args.colocated_m:.0f} m:")
+        for a, b, d in pairs:
+            print(f"  {d:5.0f} m  {a.get('name')}  <->  {b.get('name')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List
-from urllib.parse import urljoin
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+import json
+import re
 import requests
 from bs4 import BeautifulSoup
 
 # This version returns actual HTML venue names (server-rendered)
 WOLT_NEWEST_URL = "https://wolt.com/en/fin/helsinki/newest-venues?srsltid=AfmBOopGqbrOIW8EQnDKEZrjaizPsC9xYEdDc25SX57vFcOFspXHMn3-"
 BASE = "https://wolt.com"
+VENUE_PATH = "/en/fin/helsinki/restaurant/"
 
-@dataclass
+# JSON backend: the listing data embedded in the page (or a JSON listing endpoint
+# returning the same shape). Page N is fetched by setting PAGE_PARAM=N on the URL.
+WOLT_LISTING_URL = "https://wolt.com/en/fin/helsinki/newest-venues"
+PAGE_PARAM = "page"
+MAX_PAGES = 20
+PAGE_WORKERS = 4
+
+HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"}
+
+@dataclass(slots=True)
 class WoltVenue:
     name: str
     url: str
+    venue_id: str = ""
+    slug: str = ""
+    address: str = ""
+    short_description: str = ""
+    tags: Tuple[str, ...] = ()
 
-def fetch_newest_venues(limit: int = 50) -> List[WoltVenue]:
-    r = requests.get(
-        WOLT_NEWEST_URL,
-        timeout=30,
-        headers={"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"},
-    )
+
+def _http_get(url: str) -> str:
+    r = requests.get(url, timeout=30, headers=HEADERS)
     r.raise_for_status()
+    return r.text
+
+
+# --- HTML backend (first server-rendered page only) ---
 
-    soup = BeautifulSoup(r.text, "html.parser")
+def parse_newest_venues_html(html: str) -> List[WoltVenue]:
+    soup = BeautifulSoup(html, "html.parser")
     venues: List[WoltVenue] = []
 
     for a in soup.select('a[href*="/helsinki/restaurant/"]'):
@@ -41,4 +61,196 @@ def fetch_newest_venues(limit: int = 50) -> List[WoltVenue]:
             seen.add(v.url)
             out.append(v)
 
-    return out[:limit]
+    return out
+
+
+def fetch_newest_venues(limit: int = 50, fetch: Callable[[str], str] = _http_get) -> List[WoltVenue]:
+    return parse_newest_venues_html(fetch(WOLT_NEWEST_URL))[:limit]
+
+
+# --- JSON backend (embedded listing data, all pages) ---
+
+_JSON_SCRIPT_RE = re.compile(r"<script\b[^>]*type=[\"']application/json[\"'][^>]*>(.*?)</script>", re.S | re.I)
+
+
+def page_url(base_url: str, page: int) -> str:
+    parts = urlparse(base_url)
+    query = dict(parse_qsl(parts.query))
+    query[PAGE_PARAM] = str(page)
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def embedded_json(text: str) -> List[Any]:
+    """
+    JSON documents in a response: the body itself for a JSON endpoint, otherwise
+    every <script type="application/json"> block (e.g. __NEXT_DATA__). A regex is
+    enough here; there is no need to build a DOM.
+    """
+    stripped = text.lstrip()
+    if stripped.startswith(("{", "[")):
+        try:
+            return [json.loads(stripped)]
+        except ValueError:
+            return []
+
+    docs = []
+    for m in _JSON_SCRIPT_RE.finditer(text):
+        try:
+            docs.append(json.loads(m.group(1)))
+        except ValueError:
+            continue
+    return docs
+
+
+def _text(v: Any) -> str:
+    # plain string, or a localized list like [{"lang": "en", "value": "..."}]
+    if isinstance(v, str):
+        return v.strip()
+    if isinstance(v, list):
+        values = {str(x.get("lang")): x.get("value") for x in v if isinstance(x, dict)}
+        for lang in ("en", "fi", "sv"):
+            if isinstance(values.get(lang), str):
+                return values[lang].strip()
+        for x in values.values():
+            if isinstance(x, str):
+                return x.strip()
+    return ""
+
+
+def _venue_from_dict(d: Dict[str, Any]) -> Optional[WoltVenue]:
+    # venues have a slug, a name and a place; category/filter items have only the first two
+    slug = d.get("slug")
+    name = _text(d.get("name"))
+    if not isinstance(slug, str) or not slug or not name:
+        return None
+    if "address" not in d and "location" not in d:
+        return None
+    tags = d.get("tags") or []
+    return WoltVenue(
+        name=name,
+        url=urljoin(BASE, VENUE_PATH + slug),
+        venue_id=str(d.get("id") or ""),
+        slug=slug,
+        address=_text(d.get("address")),
+        short_description=_text(d.get("short_description")),
+        tags=tuple(_text(t) for t in tags if _text(t)),
+    )
+
+
+def _walk_venues(obj: Any, out: List[WoltVenue]) -> None:
+    if isinstance(obj, dict):
+        v = _venue_from_dict(obj)
+        if v is not None:
+            out.append(v)
+            return
+        for x in obj.values():
+            _walk_venues(x, out)
+    elif isinstance(obj, list):
+        for x in obj:
+            _walk_venues(x, out)
+
+
+def _walk_total_pages(obj: Any) -> Optional[int]:
+    if isinstance(obj, dict):
+        for k in ("total_pages", "totalPages"):
+            if isinstance(obj.get(k), int):
+                return obj[k]
+        children = obj.values()
+    elif isinstance(obj, list):
+        children = obj
+    else:
+        return None
+    for x in children:
+        found = _walk_total_pages(x)
+        if found is not None:
+            return found
+    return None
+
+
+def parse_listing_page(text: str) -> Tuple[List[WoltVenue], Optional[int]]:
+    """
+    (venues in page order, total page count if the page says so).
+    """
+    venues: List[WoltVenue] = []
+    total = None
+    for doc in embedded_json(text):
+        _walk_venues(doc, venues)
+        if total is None:
+            total = _walk_total_pages(doc)
+    return venues, total
+
+
+def iter_listing_venues(
+    base_url: str = WOLT_LISTING_URL,
+    limit: Optional[int] = None,
+    fetch: Callable[[str], str] = _http_get,
+    max_pages: int = MAX_PAGES,
+    workers: int = PAGE_WORKERS,
+) -> Iterator[WoltVenue]:
+    """
+    Stream venues from every listing page, de-duplicated by venue id (or URL).
+    Page 1 tells us how many pages there are; the rest are fetched in parallel
+    and yielded in page order as soon as each page is in.
+    """
+    first, total = parse_listing_page(fetch(base_url))
+    seen = set()
+    emitted = 0
+
+    def take(venues: List[WoltVenue]) -> Iterator[WoltVenue]:
+        nonlocal emitted
+        for v in venues:
+            key = v.venue_id or v.url
+            if key in seen:
+                continue
+            seen.add(key)
+            emitted += 1
+            yield v
+            if limit is not None and emitted >= limit:
+                return
+
+    yield from take(first)
+    pages = min(total or 1, max_pages)
+    if pages <= 1 or (limit is not None and emitted >= limit):
+        return
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(fetch, page_url(base_url, p)) for p in range(2, pages + 1)]
+        for fut in futures:
+            venues, _ = parse_listing_page(fut.result())
+            yield from take(venues)
+            if limit is not None and emitted >= limit:
+                return
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_listing_venues(limit: int = 50, fetch: Callable[[str], str] = _http_get) -> List[WoltVenue]:
+    return list(iter_listing_venues(limit=limit, fetch=fetch))
+
+
+# --- backend selection ---
+
+DISCOVERY_BACKENDS: Dict[str, Callable[..., List[WoltVenue]]] = {
+    "html": fetch_newest_venues,
+    "json": fetch_listing_venues,
+}
+DEFAULT_BACKEND = "html"
+
+
+def discover_venues(backend: str = DEFAULT_BACKEND, limit: int = 50) -> List[WoltVenue]:
+    if backend not in DISCOVERY_BACKENDS:
+        raise ValueError(f"Unknown discovery backend {backend!r} (choose from {', '.join(DISCOVERY_BACKENDS)})")
+    return DISCOVERY_BACKENDS[backend](limit=limit)
+
+
+def iter_venues(backend: str = DEFAULT_BACKEND, limit: int = 50) -> Iterator[WoltVenue]:
+    """
+    discover_venues() as a stream: the json backend yields venues as each listing
+    page arrives, the html backend yields its single page. Nothing is fetched
+    until the first venue is asked for.
+    """
+    if backend == "json":
+        yield from iter_listing_venues(limit=limit)
+    else:
+        yield from discover_venues(backend, limit=limit)
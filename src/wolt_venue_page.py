@@ -8,7 +8,7 @@ import requests
 from bs4 import BeautifulSoup
 
 
-@dataclass
+@dataclass(slots=True)
 class VenueDetails:
     address: str
     description: str